@@ -2,10 +2,13 @@ import streamlit as st
 import pandas as pd
 import datetime
 import logging
+import time
 from typing import Optional
 
 from src.data_collector import DataCollector
 from src.config import Config
+from src.window_report import Window, WindowReportEngine
+from src.identity import author_display_names, drop_excluded_authors
 
 logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
 logger = logging.getLogger(__name__)
@@ -19,10 +22,156 @@ st.title(f"{Config.APP_NAME} - Análise de Commits por Repositório")
 
 @st.cache_resource
 def get_data_collector():
-    return DataCollector()
+    collector = DataCollector()
+    if Config.SNAPSHOT_WATCH_ENABLED:
+        # Pré-carrega em segundo plano os snapshots publicados pelo scheduler
+        collector.start_snapshot_watcher()
+    return collector
 
 collector = get_data_collector()
 
+# Linhas exibidas por tabela nos resultados da busca
+SEARCH_RESULTS_LIMIT = 500
+
+def plotly_express():
+    """plotly.express é carregado só na primeira vez que um gráfico é exibido"""
+    import plotly.express as px
+    return px
+
+# Resultados derivados dos snapshots (imutáveis) ficam em cache entre reruns e sessões,
+# pela chave (snapshot, tipo, janela, autores excluídos); limitados em quantidade e tempo
+cache_derivado = st.cache_data(max_entries=Config.DASHBOARD_CACHE_MAX_ENTRIES,
+                               ttl=Config.DASHBOARD_CACHE_TTL, show_spinner=False)
+
+# Commits filtrados e o motor de janelas são lidos (nunca alterados) por vários resultados:
+# cache_resource evita a cópia que o cache_data faz a cada leitura
+@st.cache_resource(max_entries=Config.DASHBOARD_CACHE_MAX_ENTRIES, ttl=Config.DASHBOARD_CACHE_TTL,
+                   show_spinner=False)
+def commits_do_filtro(snapshot_id: str, filtro_tipo: str, excluded_authors: tuple) -> dict:
+    df_commits = get_data_collector().load_snapshot(snapshot_id)['commits']
+    if filtro_tipo in ("INTERNO", "PUBLICO"):
+        df_commits = df_commits[df_commits['repo_name'].str.contains(f'-{filtro_tipo}', na=False)]
+    else:
+        df_commits = df_commits[
+            (df_commits['repo_name'].str.contains('-INTERNO', na=False)) |
+            (df_commits['repo_name'].str.contains('-PUBLICO', na=False))
+        ]
+    df_commits = df_commits.assign(date_dt=pd.to_datetime(df_commits['date'], errors='coerce', utc=True))
+    return {
+        'repositorios': df_commits['repo_name'].unique().tolist(),
+        # Sem os autores excluídos (todas as variantes de nome/e-mail quando o snapshot tem author_id)
+        'filtrados': drop_excluded_authors(df_commits, excluded_authors),
+        # Nome exibido de cada author_id
+        'nomes': author_display_names(df_commits),
+        # Contagens por repositório em uma passada vetorizada (mesmo motor do scripts/window_report.py)
+        'motor': WindowReportEngine(df_commits, filtro_tipo, excluded_authors),
+    }
+
+@cache_derivado
+def resumo_janela(snapshot_id: str, filtro_tipo: str, excluded_authors: tuple,
+                  start_datetime: str, end_datetime: str) -> dict:
+    """Tudo o que as abas 1 a 3 exibem para a janela"""
+    base = commits_do_filtro(snapshot_id, filtro_tipo, excluded_authors)
+    df_commits_filtered = base['filtrados']
+    start_dt = pd.to_datetime(start_datetime, utc=True)
+    end_dt = pd.to_datetime(end_datetime, utc=True)
+
+    janela = Window.from_values('Janela', start_dt, end_dt)
+    commits_por_repo = base['motor'].counts([janela]).set_index('repo_name')['commits_in_window']
+    relatorios_janela = base['motor'].reports([janela])
+
+    # Distribuição de atividade e atividade por track
+    activity_buckets = {"Sem commits": 0, "1-5 commits": 0, "6-15 commits": 0, "16+ commits": 0}
+    track_activity = {"T01 (CC)": 0, "T02 (EC)": 0, "T03 (SI)": 0}
+    for repo in base['repositorios']:
+        commits_count = int(commits_por_repo.get(repo, 0))
+
+        if commits_count == 0:
+            activity_buckets["Sem commits"] += 1
+        elif commits_count <= 5:
+            activity_buckets["1-5 commits"] += 1
+        elif commits_count <= 15:
+            activity_buckets["6-15 commits"] += 1
+        else:
+            activity_buckets["16+ commits"] += 1
+
+        if "T01" in repo:
+            track_activity["T01 (CC)"] += commits_count
+        elif "T02" in repo:
+            track_activity["T02 (EC)"] += commits_count
+        elif "T03" in repo:
+            track_activity["T03 (SI)"] += commits_count
+
+    # Commits por dia e top autores na janela
+    commits_in_window = df_commits_filtered[
+        (df_commits_filtered['date_dt'] >= start_dt) &
+        (df_commits_filtered['date_dt'] <= end_dt)
+    ]
+    daily_commits = commits_in_window.groupby(commits_in_window['date_dt'].dt.date).size().reset_index()
+    daily_commits.columns = ['Data', 'Commits']
+    if 'author_id' in commits_in_window.columns:
+        # Agrupa as variantes do mesmo autor pelo id inteiro
+        top_ids = commits_in_window['author_id'].value_counts().head(10)
+        top_authors = pd.Series(top_ids.to_numpy(), index=base['nomes'].reindex(top_ids.index).to_numpy())
+    else:
+        top_authors = commits_in_window['author'].value_counts().head(10)
+
+    return {
+        'total_commits': len(df_commits_filtered),
+        'commits_na_janela': len(commits_in_window),
+        'activity_buckets': activity_buckets,
+        'track_activity': track_activity,
+        'daily_commits': daily_commits,
+        'top_authors': pd.DataFrame({'Autor': top_authors.index, 'Commits': top_authors.values}),
+        'sem_janela': relatorios_janela['no_commits_in_window'].drop(columns=['Janela', 'Início', 'Fim']),
+        'sem_janela_com_apos': relatorios_janela['commits_only_after_window'].drop(columns=['Janela', 'Início', 'Fim']),
+    }
+
+@cache_derivado
+def detalhe_repositorio(snapshot_id: str, filtro_tipo: str, excluded_authors: tuple, repo: str) -> tuple:
+    """Commits do repositório (aba 4) e contagem por dia"""
+    df_commits_filtered = commits_do_filtro(snapshot_id, filtro_tipo, excluded_authors)['filtrados']
+    repo_commits = df_commits_filtered[df_commits_filtered['repo_name'] == repo]
+    df_detalhe = repo_commits[['author', 'date', 'message']].sort_values('date')
+    df_agrupada = repo_commits.groupby(repo_commits['date_dt'].dt.date).size().reset_index()
+    df_agrupada.columns = ['dia', 'total_commits']
+    return df_detalhe, df_agrupada
+
+@cache_derivado
+def commits_via_pr(snapshot_id: str, filtro_tipo: str, excluded_authors: tuple) -> pd.DataFrame:
+    """Fração dos commits de cada repositório que entrou por um PR (tabela de links SHA -> PR)"""
+    df_commits_filtered = commits_do_filtro(snapshot_id, filtro_tipo, excluded_authors)['filtrados']
+    share = get_data_collector().pr_share_by_repo(snapshot_id, df_commits_filtered)
+    share = share.assign(pr_share=(share['pr_share'] * 100).round(1))
+    return share.rename(columns={'repo_name': 'Repositório', 'commits': 'Commits',
+                                 'commits_in_prs': 'Commits via PR', 'pr_share': '% via PR'})
+
+@cache_derivado
+def diferencas(base_snapshot: str, snapshot_id: str, filtro_tipo: str) -> dict:
+    """Diferenças entre snapshots (aba 5), já restritas ao tipo de repositório"""
+    diff = get_data_collector().diff_snapshots(base_snapshot, snapshot_id)
+    resumo = diff['repositories']
+    if filtro_tipo != "Todos":
+        resumo = resumo[resumo['repo_name'].str.contains(f"-{filtro_tipo}", na=False)]
+    repos_resumo = set(resumo['repo_name'])
+    return {
+        'resumo': resumo,
+        'commits_added': diff['commits_added'][diff['commits_added']['repo_name'].isin(repos_resumo)],
+        'pull_requests_added': diff['pull_requests_added'][diff['pull_requests_added']['repo_name'].isin(repos_resumo)]
+            .drop(columns='digest'),
+        'pull_requests_changed': diff['pull_requests_changed'][diff['pull_requests_changed']['repo_name'].isin(repos_resumo)],
+    }
+
+@cache_derivado
+def historico(repo: str, latest_snapshot_id: str) -> pd.DataFrame:
+    """Série do repositório (aba 6); o último snapshot na chave invalida o cache quando chega um novo"""
+    series = get_data_collector().load_series([repo])
+    if series.empty:
+        return series
+    series = series.sort_values('timestamp')
+    series['Snapshot'] = pd.to_datetime(series['timestamp'], format="%Y-%m-%d_%H-%M-%S")
+    return series
+
 # Main controls in organized sections
 st.header("⚙️ Controles do Sistema")
 
@@ -78,6 +227,11 @@ with col1:
     # Snapshot selection - always show latest by default
     snapshots = collector.get_snapshots_summary()
     if snapshots:
+        latest_snapshot_id = snapshots[0]['snapshot_id']
+        if st.session_state.get('latest_seen_snapshot') not in (None, latest_snapshot_id):
+            st.toast(f"🆕 Novo snapshot disponível: {latest_snapshot_id}")
+        st.session_state['latest_seen_snapshot'] = latest_snapshot_id
+
         # Create snapshot options for selectbox
         snapshot_options = []
         snapshot_mapping = {}
@@ -133,96 +287,42 @@ end_datetime = f"{end_date} {end_time}"
 # Configuration info
 with st.expander("ℹ️ Configuração do Sistema"):
     col_info1, col_info2, col_info3 = st.columns(3)
+    # Inclui os descobertos por REPOSITORY_PATTERNS (tipo pelo sufixo do nome, como nos filtros)
+    configured_repos = Config.get_all_repositories()
     with col_info1:
-        st.metric("Repositórios Configurados", len(Config.get_all_repositories()))
+        st.metric("Repositórios Configurados", len(configured_repos))
     with col_info2:
-        st.metric("Repositórios Internos", len(Config.INTERNAL_REPOSITORIES))
+        st.metric("Repositórios Internos", sum('-INTERNO' in name for name in configured_repos))
     with col_info3:
-        st.metric("Repositórios Públicos", len(Config.PUBLIC_REPOSITORIES))
+        st.metric("Repositórios Públicos", sum('-PUBLICO' in name for name in configured_repos))
 
 if not snapshot_id:
     st.warning("⚠️ Nenhum snapshot selecionado. Use o botão 'Atualizar' acima para coletar dados.")
     st.stop()
 
+
 # Load data from selected snapshot
+excluded_authors = tuple(Config.EXCLUDED_AUTHORS)
 try:
     data = collector.load_snapshot(snapshot_id)
     if not data or 'commits' not in data:
         st.error("❌ Não foi possível carregar os dados do snapshot selecionado.")
         st.stop()
+    repositorios = commits_do_filtro(snapshot_id, filtro_tipo, excluded_authors)['repositorios']
+    resumo = resumo_janela(snapshot_id, filtro_tipo, excluded_authors, start_datetime, end_datetime)
 except Exception as e:
     st.error(f"❌ Erro ao carregar snapshot: {str(e)}")
     st.stop()
 
-
-# Get commits data
-df_commits = data['commits']
-
-# Apply repository type filter
-if filtro_tipo == "INTERNO":
-    df_commits = df_commits[df_commits['repo_name'].str.contains('-INTERNO', na=False)]
-elif filtro_tipo == "PUBLICO":
-    df_commits = df_commits[df_commits['repo_name'].str.contains('-PUBLICO', na=False)]
-else:
-    df_commits = df_commits[
-        (df_commits['repo_name'].str.contains('-INTERNO', na=False)) |
-        (df_commits['repo_name'].str.contains('-PUBLICO', na=False))
-    ]
-
-repositorios = df_commits['repo_name'].unique().tolist()
-
-tab1, tab2, tab3, tab4 = st.tabs([
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
     "📊 Overview",
     "❌ Repositórios SEM commits na janela",
     "⚠️ Repositórios SEM commits na janela MAS COM commits após",
-    "🔍 Detalhar commits por projeto"
+    "🔍 Detalhar commits por projeto",
+    "🆚 Diferenças entre snapshots",
+    "📈 Histórico do repositório"
 ])
 
-# Convert date column to datetime and handle timezone issues
-df_commits['date_dt'] = pd.to_datetime(df_commits['date'], errors='coerce', utc=True)
-start_dt = pd.to_datetime(start_datetime, utc=True)
-end_dt = pd.to_datetime(end_datetime, utc=True)
-
-# Exclude unwanted authors
-excluded_authors = ['Inteli Hub', 'José Romualdo']
-df_commits_filtered = df_commits[~df_commits['author'].isin(excluded_authors)]
-
-registros_sem_janela = []
-registros_sem_janela_com_apos = []
-
-for repo in repositorios:
-    repo_commits = df_commits_filtered[df_commits_filtered['repo_name'] == repo]
-    
-    # Check commits in the time window
-    commits_na_janela = len(repo_commits[
-        (repo_commits['date_dt'] >= start_dt) & 
-        (repo_commits['date_dt'] <= end_dt)
-    ])
-    
-    if commits_na_janela == 0:
-        # Get authors for this repo
-        authors_list = repo_commits['author'].unique().tolist()
-        authors_str = ", ".join(authors_list) if authors_list else "Nenhum author registrado"
-        
-        registros_sem_janela.append({
-            'Repositório': repo,
-            'Commits na Janela?': 'Não',
-            'Authors': authors_str
-        })
-        
-        # Check commits after the window
-        commits_apos = len(repo_commits[repo_commits['date_dt'] > end_dt])
-        
-        if commits_apos > 0:
-            authors_apos = repo_commits[repo_commits['date_dt'] > end_dt]['author'].unique().tolist()
-            authors_str_apos = ", ".join(authors_apos) if authors_apos else "Nenhum author registrado"
-            
-            registros_sem_janela_com_apos.append({
-                'Repositório': repo,
-                'Commits após a Janela': commits_apos,
-                'Authors': authors_str_apos
-            })
-
 # TAB 1 - Overview
 with tab1:
     st.header("📊 Visão Geral dos Dados")
@@ -230,19 +330,14 @@ with tab1:
     # Main metrics
     col1, col2, col3, col4 = st.columns(4)
     
-    commits_na_janela_total = len(df_commits_filtered[
-        (df_commits_filtered['date_dt'] >= start_dt) & 
-        (df_commits_filtered['date_dt'] <= end_dt)
-    ])
-    
     with col1:
         st.metric("Repositórios Analisados", len(repositorios))
     
     with col2:
-        st.metric("Total de Commits", len(df_commits_filtered))
+        st.metric("Total de Commits", resumo['total_commits'])
     
     with col3:
-        st.metric("Commits na Janela", commits_na_janela_total)
+        st.metric("Commits na Janela", resumo['commits_na_janela'])
     
     with col4:
         st.metric("Snapshots Disponíveis", len(snapshots))
@@ -255,57 +350,19 @@ with tab1:
     with col_left:
         st.subheader("📈 Distribuição de Atividade")
         
-        # Activity buckets
-        activity_buckets = {"Sem commits": 0, "1-5 commits": 0, "6-15 commits": 0, "16+ commits": 0}
-        
-        for repo in repositorios:
-            repo_commits = df_commits_filtered[df_commits_filtered['repo_name'] == repo]
-            commits_count = len(repo_commits[
-                (repo_commits['date_dt'] >= start_dt) & 
-                (repo_commits['date_dt'] <= end_dt)
-            ])
-            
-            if commits_count == 0:
-                activity_buckets["Sem commits"] += 1
-            elif commits_count <= 5:
-                activity_buckets["1-5 commits"] += 1
-            elif commits_count <= 15:
-                activity_buckets["6-15 commits"] += 1
-            else:
-                activity_buckets["16+ commits"] += 1
-        
-        # Create pie chart data
-        activity_df = pd.DataFrame(list(activity_buckets.items()), columns=['Categoria', 'Quantidade'])
-        
-        if not activity_df.empty and activity_df['Quantidade'].sum() > 0:
+        activity_buckets = resumo['activity_buckets']
+        if sum(activity_buckets.values()) > 0:
             # Color coding
             colors = {"Sem commits": "🔴", "1-5 commits": "🟡", "6-15 commits": "🟢", "16+ commits": "🔵"}
-            for _, row in activity_df.iterrows():
-                emoji = colors.get(row['Categoria'], '⚪')
-                st.write(f"{emoji} **{row['Categoria']}**: {row['Quantidade']} repositórios")
+            for categoria, quantidade in activity_buckets.items():
+                emoji = colors.get(categoria, '⚪')
+                st.write(f"{emoji} **{categoria}**: {quantidade} repositórios")
     
     with col_right:
         st.subheader("📅 Atividade por Track")
         
-        # Group by track
-        track_activity = {"T01 (CC)": 0, "T02 (EC)": 0, "T03 (SI)": 0}
-        
-        for repo in repositorios:
-            repo_commits = df_commits_filtered[df_commits_filtered['repo_name'] == repo]
-            commits_count = len(repo_commits[
-                (repo_commits['date_dt'] >= start_dt) & 
-                (repo_commits['date_dt'] <= end_dt)
-            ])
-            
-            if "T01" in repo:
-                track_activity["T01 (CC)"] += commits_count
-            elif "T02" in repo:
-                track_activity["T02 (EC)"] += commits_count
-            elif "T03" in repo:
-                track_activity["T03 (SI)"] += commits_count
-        
         # Display track metrics
-        for track, commits in track_activity.items():
+        for track, commits in resumo['track_activity'].items():
             st.metric(track, f"{commits} commits")
     
     st.divider()
@@ -313,43 +370,38 @@ with tab1:
     # Timeline analysis
     st.subheader("📊 Evolução dos Commits na Janela")
     
-    # Group commits by day in the window
-    commits_in_window = df_commits_filtered[
-        (df_commits_filtered['date_dt'] >= start_dt) & 
-        (df_commits_filtered['date_dt'] <= end_dt)
-    ].copy()
-    
-    if not commits_in_window.empty:
-        commits_in_window['dia'] = commits_in_window['date_dt'].dt.date
-        daily_commits = commits_in_window.groupby('dia').size().reset_index()
-        daily_commits.columns = ['Data', 'Commits']
-        
-        st.line_chart(daily_commits.set_index('Data'))
+    if resumo['commits_na_janela']:
+        st.line_chart(resumo['daily_commits'].set_index('Data'))
         
         # Show top authors
         st.subheader("🏆 Top 10 Autores na Janela")
-        if not commits_in_window.empty:
-            top_authors = commits_in_window['author'].value_counts().head(10)
-            
-            # Create a DataFrame for better formatting
-            authors_df = pd.DataFrame({
-                'Autor': top_authors.index,
-                'Commits': top_authors.values
-            })
-            
-            # Display as chart
-            import plotly.express as px
-            fig = px.bar(authors_df, x='Autor', y='Commits', 
-                        title="Top 10 Autores por Número de Commits")
-            fig.update_layout(xaxis_tickangle=-45)
-            st.plotly_chart(fig, use_container_width=True)
+        fig = plotly_express().bar(resumo['top_authors'], x='Autor', y='Commits', 
+                    title="Top 10 Autores por Número de Commits")
+        fig.update_layout(xaxis_tickangle=-45)
+        st.plotly_chart(fig, use_container_width=True)
     else:
         st.info("Nenhum commit encontrado na janela selecionada.")
 
+    st.divider()
+
+    st.subheader("🔀 Commits via Pull Request")
+    via_pr = commits_via_pr(snapshot_id, filtro_tipo, excluded_authors)
+    if not via_pr.empty:
+        total_via_pr = int(via_pr['Commits via PR'].sum())
+        st.metric("Commits que passaram por PR",
+                  f"{total_via_pr / max(int(via_pr['Commits'].sum()), 1):.0%}",
+                  help="Commits (no snapshot todo) que aparecem na lista de commits de algum PR do repositório")
+        fig = plotly_express().bar(via_pr, x='Repositório', y='% via PR', title="% dos commits via PR por repositório")
+        fig.update_layout(xaxis_tickangle=-45, yaxis_range=[0, 100])
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(via_pr, use_container_width=True, hide_index=True)
+    else:
+        st.info("Nenhum commit no snapshot para os filtros selecionados.")
+
 # TAB 2 - SEM commits na janela
 with tab2:
     st.header("Repositórios SEM commits na janela selecionada")
-    df_sem_janela = pd.DataFrame(registros_sem_janela)
+    df_sem_janela = resumo['sem_janela']
     if not df_sem_janela.empty:
         st.dataframe(df_sem_janela, use_container_width=True)
         st.error(f"{len(df_sem_janela)} repositórios NÃO fizeram commits na janela.")
@@ -359,41 +411,65 @@ with tab2:
 # TAB 3 - SEM commits na janela MAS COM commits após
 with tab3:
     st.header("Repositórios SEM commits na janela MAS COM commits após a janela")
-    df_sem_janela_com_apos = pd.DataFrame(registros_sem_janela_com_apos)
+    df_sem_janela_com_apos = resumo['sem_janela_com_apos']
     if not df_sem_janela_com_apos.empty:
         st.dataframe(df_sem_janela_com_apos, use_container_width=True)
         st.warning(f"{len(df_sem_janela_com_apos)} repositórios NÃO fizeram commits na janela mas fizeram APÓS.")
     else:
         st.success("Nenhum repositório fez commit após a janela sem ter feito na janela!")
 
+# Abas 4 a 6 são fragments: busca e seleções dentro delas reexecutam só a própria aba
+
 # TAB 4 - Detalhamento por projeto
-with tab4:
+@st.fragment
+def aba_detalhamento(snapshot_id: str, filtro_tipo: str, excluded_authors: tuple, repositorios: list):
     st.header("Detalhamento de commits por repositório")
 
+    # Busca em todos os repositórios do filtro atual (índice invertido do snapshot)
+    busca = st.text_input("🔎 Buscar em mensagens de commit e títulos de PR",
+                          placeholder="ex.: correção login", key="search_query")
+    if busca.strip():
+        try:
+            inicio_busca = time.perf_counter()
+            resultados = collector.search_snapshot(snapshot_id, busca, repo_names=repositorios)
+            tempo_busca = (time.perf_counter() - inicio_busca) * 1000
+            commits_encontrados = resultados['commits']
+            prs_encontrados = resultados['pull_requests']
+            st.caption(f"{len(commits_encontrados)} commits e {len(prs_encontrados)} PRs em {tempo_busca:.0f} ms")
+            if not commits_encontrados.empty:
+                st.dataframe(
+                    commits_encontrados[['repo_name', 'author', 'date', 'message']]
+                    .sort_values('date', ascending=False).head(SEARCH_RESULTS_LIMIT),
+                    use_container_width=True
+                )
+            if not prs_encontrados.empty:
+                st.write("**Pull requests**")
+                st.dataframe(
+                    prs_encontrados[['repo_name', 'number', 'title', 'author', 'state', 'created_at']]
+                    .sort_values('created_at', ascending=False).head(SEARCH_RESULTS_LIMIT),
+                    use_container_width=True
+                )
+            if commits_encontrados.empty and prs_encontrados.empty:
+                st.info("Nenhum commit ou PR encontrado para a busca.")
+        except Exception as e:
+            st.error(f"❌ Erro na busca: {str(e)}")
+        st.divider()
+
     if repositorios:
         selected_repo = st.selectbox("Selecione o repositório para detalhar", repositorios, key="repo_select")
 
         # Get detailed commits for selected repo
-        df_detalhe = df_commits_filtered[
-            df_commits_filtered['repo_name'] == selected_repo
-        ][['author', 'date', 'message']].sort_values('date')
+        df_detalhe, df_agrupada = detalhe_repositorio(snapshot_id, filtro_tipo, excluded_authors, selected_repo)
 
         if not df_detalhe.empty:
             st.dataframe(df_detalhe, use_container_width=True)
             st.success(f"Total de {len(df_detalhe)} commits encontrados para {selected_repo}.")
 
-            # Group commits by day
-            repo_commits_detail = df_commits_filtered[df_commits_filtered['repo_name'] == selected_repo].copy()
-            repo_commits_detail['dia'] = pd.to_datetime(repo_commits_detail['date'], utc=True).dt.date
-            df_agrupada = repo_commits_detail.groupby('dia').size().reset_index()
-            df_agrupada.columns = ['dia', 'total_commits']
-
             if not df_agrupada.empty:
                 st.subheader("📈 Commits por dia")
                 
                 # Use plotly for better visualization
-                import plotly.express as px
-                fig = px.bar(df_agrupada, x='dia', y='total_commits', 
+                fig = plotly_express().bar(df_agrupada, x='dia', y='total_commits', 
                             title=f"Commits por dia - {selected_repo}")
                 st.plotly_chart(fig, use_container_width=True)
             else:
@@ -401,4 +477,96 @@ with tab4:
         else:
             st.warning(f"Nenhum commit encontrado para {selected_repo}.")
     else:
-        st.info("Nenhum repositório encontrado para o filtro atual.")
\ No newline at end of file
+        st.info("Nenhum repositório encontrado para o filtro atual.")
+
+with tab4:
+    aba_detalhamento(snapshot_id, filtro_tipo, excluded_authors, repositorios)
+
+# TAB 5 - Diferenças entre snapshots
+@st.fragment
+def aba_diferencas(snapshot_id: str, filtro_tipo: str, snapshots: list):
+    st.header("Diferenças entre snapshots")
+
+    other_snapshots = [snap['snapshot_id'] for snap in snapshots if snap['snapshot_id'] != snapshot_id]
+    if other_snapshots:
+        # Por padrão compara com o snapshot imediatamente anterior ao selecionado
+        current_index = next(i for i, snap in enumerate(snapshots) if snap['snapshot_id'] == snapshot_id)
+        default_base = snapshots[current_index + 1]['snapshot_id'] if current_index + 1 < len(snapshots) else other_snapshots[0]
+        base_snapshot = st.selectbox(
+            "Comparar com o snapshot:",
+            other_snapshots,
+            index=other_snapshots.index(default_base),
+            key="diff_base_snapshot"
+        )
+
+        diff = diferencas(base_snapshot, snapshot_id, filtro_tipo)
+        resumo = diff['resumo']
+
+        col_d1, col_d2, col_d3, col_d4 = st.columns(4)
+        with col_d1:
+            st.metric("Commits novos", int(resumo['commits_added'].sum()))
+        with col_d2:
+            st.metric("PRs abertos", int(resumo['prs_opened'].sum()))
+        with col_d3:
+            st.metric("PRs fechados", int(resumo['prs_closed'].sum()))
+        with col_d4:
+            st.metric("Repositórios sem atividade", int(resumo['quiet'].sum()))
+
+        st.subheader("Resumo por repositório")
+        st.dataframe(resumo.rename(columns={
+            'repo_name': 'Repositório',
+            'commits_added': 'Commits novos',
+            'commits_removed': 'Commits removidos',
+            'prs_opened': 'PRs abertos',
+            'prs_closed': 'PRs fechados',
+            'prs_changed': 'PRs alterados',
+            'quiet': 'Sem atividade'
+        }), use_container_width=True)
+
+        st.subheader("Commits novos")
+        st.dataframe(diff['commits_added'], use_container_width=True)
+        st.subheader("PRs novos")
+        st.dataframe(diff['pull_requests_added'], use_container_width=True)
+        st.subheader("PRs alterados")
+        st.dataframe(diff['pull_requests_changed'], use_container_width=True)
+    else:
+        st.info("É necessário ao menos dois snapshots para comparar.")
+
+with tab5:
+    aba_diferencas(snapshot_id, filtro_tipo, snapshots)
+
+# TAB 6 - Histórico do repositório ao longo dos snapshots
+@st.fragment
+def aba_historico(repositorios: list, latest_snapshot_id: str):
+    st.header("Histórico do repositório ao longo dos snapshots")
+
+    if repositorios:
+        history_repo = st.selectbox("Selecione o repositório", repositorios, key="history_repo_select")
+        series = historico(history_repo, latest_snapshot_id)
+
+        if not series.empty:
+            metric_labels = {
+                'commits_count': 'Commits',
+                'authors_count': 'Autores',
+                'pull_requests_count': 'PRs',
+                'open_prs': 'PRs abertos',
+                'closed_prs': 'PRs fechados'
+            }
+            selected_metrics = st.multiselect(
+                "Métricas",
+                list(metric_labels.keys()),
+                default=['commits_count', 'open_prs'],
+                format_func=metric_labels.get,
+                key="history_metrics"
+            )
+            if selected_metrics:
+                chart_df = series.set_index('Snapshot')[selected_metrics].rename(columns=metric_labels)
+                st.line_chart(chart_df)
+            st.caption(f"{len(series)} snapshots com dados para {history_repo}.")
+        else:
+            st.info("Nenhum histórico disponível. Execute `python scripts/rebuild_series.py` para gerar a partir dos snapshots existentes.")
+    else:
+        st.info("Nenhum repositório encontrado para o filtro atual.")
+
+with tab6:
+    aba_historico(repositorios, snapshots[0]['snapshot_id'])
@@ -0,0 +1,93 @@
+"""Compara a coleta sequencial, com concorrência fixa e com o controle AIMD.
+
+O stand-in responde 403 + Retry-After (limite secundário) quando recebe
+mais de --max-concurrent requisições simultâneas e, opcionalmente, um 502 a
+cada --error-every. Cada cenário roda o DataCollector completo (repositórios
+em paralelo) contra um datalake temporário:
+
+    python scripts/benchmark_concurrency.py --repos 12 --max-concurrent 4 --latency 0.02
+    python scripts/benchmark_concurrency.py --error-every 97
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_standin import GitHubStandIn  # noqa: E402
+from src.config import Config  # noqa: E402
+from src.data_collector import DataCollector  # noqa: E402
+from src.exceptions import CircuitBreakerError  # noqa: E402
+
+# (nome, mínimo, máximo, inicial)
+SCENARIOS = [
+    ('sequencial', 1, 1, 1),
+    ('fixa 8', 8, 8, 8),
+    ('adaptativa 1-8', 1, 8, 2),
+]
+
+
+def run(name: str, min_limit: int, max_limit: int, initial: int, args) -> dict:
+    with GitHubStandIn(repos=args.repos, commits=args.commits, pulls=args.pulls, latency=args.latency,
+                       max_concurrent=args.max_concurrent, retry_after=args.retry_after,
+                       error_every=args.error_every) as standin, tempfile.TemporaryDirectory() as datalake:
+        Config.GITHUB_API_URL = standin.base_url
+        Config.GITHUB_TOKEN, Config.GITHUB_TOKENS, Config.GITHUB_APP_ID = 'bench-token', [], None
+        Config.INTERNAL_REPOSITORIES, Config.PUBLIC_REPOSITORIES = standin.full_names, []
+        Config.DATALAKE_PATH = datalake
+        Config.SNAPSHOTS_PATH = os.path.join(datalake, 'snapshots')
+        Config.STORAGE_BACKEND = 'local'
+        Config.SKIP_UNCHANGED_REPOS = Config.INCREMENTAL_PULL_REQUESTS = Config.COMMIT_DETAILS_ENABLED = False
+        Config.SHARD_COUNT, Config.SHARD_INDEX = 1, 0
+        Config.COLLECTOR_MIN_CONCURRENCY, Config.COLLECTOR_MAX_CONCURRENCY = min_limit, max_limit
+        Config.COLLECTOR_INITIAL_CONCURRENCY = initial
+
+        messages = []
+        collector = DataCollector()
+        started = time.perf_counter()
+        status = 'ok'
+        try:
+            collector.collect_all_data(lambda current, total, message: messages.append(message))
+        except CircuitBreakerError as e:
+            status = f"breaker: {e}"
+        elapsed = time.perf_counter() - started
+        state = collector.github_client.concurrency.state()
+        return {
+            'scenario': name,
+            'seconds': elapsed,
+            'requests': standin.total_requests,
+            'secondary_limited': standin.secondary_limited,
+            'server_errors': standin.server_errors,
+            'peak_in_flight': standin.peak_in_flight,
+            'final_concurrency': state['concurrency'],
+            'status': status,
+            'last_progress': messages[-2] if len(messages) > 1 else '',
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repos', type=int, default=12)
+    parser.add_argument('--commits', type=int, default=300)
+    parser.add_argument('--pulls', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--max-concurrent', type=int, default=4)
+    parser.add_argument('--retry-after', type=float, default=0.5)
+    parser.add_argument('--error-every', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "ERROR"))
+    print(f"{'scenario':>16} {'seconds':>8} {'requests':>8} {'403':>5} {'5xx':>5} {'peak':>5} {'final':>5}  status")
+    for scenario in SCENARIOS:
+        result = run(*scenario, args)
+        print(f"{result['scenario']:>16} {result['seconds']:>8.2f} {result['requests']:>8} "
+              f"{result['secondary_limited']:>5} {result['server_errors']:>5} {result['peak_in_flight']:>5} "
+              f"{result['final_concurrency']:>5}  {result['status']}")
+        print(f"{'':>16} progresso: {result['last_progress']}")
+
+
+if __name__ == '__main__':
+    main()
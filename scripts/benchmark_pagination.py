@@ -0,0 +1,84 @@
+"""Mede o efeito do tamanho de página nas listagens do GitHubClient.
+
+Coleta commits e PRs de cada repositório do stand-in, um repositório por
+vez, com páginas de 30 (padrão do PyGithub) e de 100 (GITHUB_PAGE_SIZE):
+
+    python scripts/benchmark_pagination.py --repos 4 --commits 1000 --pulls 150 --latency 0.03
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github import Auth  # noqa: E402
+
+from github_standin import GitHubStandIn  # noqa: E402
+from src.concurrency import AdaptiveConcurrency  # noqa: E402
+from src.github_client import GitHubClient  # noqa: E402
+from src.token_pool import TokenPool  # noqa: E402
+
+# (nome, itens por página)
+SCENARIOS = [
+    ('30', 30),
+    ('100', 100),
+]
+
+
+def run(name: str, page_size: int, args) -> dict:
+    with GitHubStandIn(repos=args.repos, commits=args.commits, pulls=args.pulls, latency=args.latency) as standin:
+        pool = TokenPool([Auth.Token('bench-token')], base_url=standin.base_url, per_page=page_size)
+        concurrency = AdaptiveConcurrency(min_limit=args.concurrency, max_limit=args.concurrency)
+        client = GitHubClient(pool=pool, concurrency=concurrency)
+
+        commits_seconds = pulls_seconds = 0.0
+        commits = pulls = 0
+        for repo_name in standin.full_names:
+            started = time.perf_counter()
+            repo_commits = client.get_commits_from_repo(repo_name)
+            commits_seconds += time.perf_counter() - started
+            started = time.perf_counter()
+            pulls += len(client.get_pull_requests_from_repo(repo_name, repo_commits))
+            pulls_seconds += time.perf_counter() - started
+            commits += len(repo_commits)
+
+        listings = {'commits': 0, 'pulls': 0}
+        for path, count in standin.requests_by_path.items():
+            if path.endswith('/commits') and '/pulls/' not in path:
+                listings['commits'] += count
+            elif path.endswith('/pulls'):
+                listings['pulls'] += count
+        return {
+            'scenario': name,
+            'commits_seconds': commits_seconds,
+            'pulls_seconds': pulls_seconds,
+            'commit_pages': listings['commits'] / args.repos,
+            'pull_pages': listings['pulls'] / args.repos,
+            'requests': standin.total_requests,
+            'rows': (commits, pulls),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repos', type=int, default=4)
+    parser.add_argument('--commits', type=int, default=1000)
+    parser.add_argument('--pulls', type=int, default=150)
+    parser.add_argument('--latency', type=float, default=0.03)
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "ERROR"))
+    print(f"{'scenario':>15} {'commits s':>9} {'pulls s':>8} {'commit pages/repo':>17} "
+          f"{'PR pages/repo':>13} {'requests':>8}  rows")
+    for scenario in SCENARIOS:
+        result = run(*scenario, args)
+        print(f"{result['scenario']:>15} {result['commits_seconds']:>9.2f} {result['pulls_seconds']:>8.2f} "
+              f"{result['commit_pages']:>17.1f} {result['pull_pages']:>13.1f} {result['requests']:>8}  "
+              f"{result['rows'][0]} commits, {result['rows'][1]} PRs")
+
+
+if __name__ == '__main__':
+    main()
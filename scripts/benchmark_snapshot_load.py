@@ -0,0 +1,103 @@
+"""Compara a leitura de um snapshot via Parquet e via cópia Arrow IPC mapeada em memória.
+
+Gera um snapshot sintético em um diretório temporário (backend local) e mede
+`DataLake.load_snapshot_data` nos dois modos, cada leitura em um processo novo
+como um worker do Streamlit recém-iniciado.
+
+    python scripts/benchmark_snapshot_load.py --commits 500000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Memória privada (residente - compartilhada): páginas mapeadas do arquivo ficam no page cache
+PROBE = """
+import json, os, time
+from src.datalake import DataLake
+from src.config import Config
+
+def private_mb():
+    with open('/proc/self/statm') as f:
+        _, resident, shared = (int(v) for v in f.read().split()[:3])
+    return (resident - shared) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+Config.SNAPSHOT_ARROW_IPC = {arrow}
+datalake = DataLake()
+before = private_mb()
+start = time.perf_counter()
+data = datalake.load_snapshot_data({snapshot_id!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'private_mb': private_mb() - before,
+                   'rows': sum(len(df) for df in data.values())}}))
+"""
+
+
+def build_snapshot(commits: int, repos: int) -> str:
+    from src.datalake import DataLake
+    from src.models import Commit, PullRequest, Repository
+
+    repo_names = [f"Org/2025-1A-T0{r % 3 + 1}-G{r:02d}-{'INTERNO' if r % 2 else 'PUBLICO'}" for r in range(repos)]
+    repositories = [Repository(repo_name=name, last_updated='2025-05-01') for name in repo_names]
+    commit_rows = [
+        Commit(sha=f"{i:040x}", message=f"feat: ajuste {i % 997}", author=f"Aluno {i % 40}",
+               email=f"aluno{i % 40}@example.com", date=f"2025-05-{1 + i % 28:02d}T{i % 24:02d}:00:00+00:00",
+               url=f"https://github.com/{repo_names[i % repos]}/commit/{i:040x}", repo_name=repo_names[i % repos])
+        for i in range(commits)
+    ]
+    pull_requests = [
+        PullRequest(number=str(i), title=f"PR {i}", author=f"aluno{i % 40}", email='',
+                    created_at='2025-05-02T00:00:00+00:00', state='open' if i % 3 else 'closed',
+                    comments='0', review_comments='0', commits='[]',
+                    url=f"https://github.com/{repo_names[i % repos]}/pull/{i}", repo_name=repo_names[i % repos])
+        for i in range(commits // 20)
+    ]
+    return DataLake().create_snapshot(repositories, commit_rows, pull_requests)
+
+
+def measure(snapshot_id: str, arrow: bool, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE.format(arrow=arrow, snapshot_id=snapshot_id)],
+            cwd=ROOT, env=os.environ, capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {
+        'seconds': statistics.median(s['seconds'] for s in samples),
+        'private_mb': statistics.median(s['private_mb'] for s in samples),
+        'rows': samples[-1]['rows'],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--commits', type=int, default=200000)
+    parser.add_argument('--repos', type=int, default=80)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update(STORAGE_BACKEND='local', DATALAKE_PATH=tmp,
+                          SNAPSHOTS_PATH=str(Path(tmp) / 'snapshots'), SNAPSHOT_ARROW_IPC='true')
+        sys.path.insert(0, str(ROOT))
+        snapshot_id = build_snapshot(args.commits, args.repos)
+        snapshot_dir = Path(tmp) / 'snapshots' / snapshot_id
+
+        print(f"{'format':<10}{'seconds':>9}{'private MB':>11}{'disk MB':>9}{'rows':>10}")
+        for label, arrow, suffix in (('parquet', False, '.parquet'), ('arrow', True, '.arrow')):
+            result = measure(snapshot_id, arrow, args.runs)
+            files = [snapshot_dir / f"{table}{suffix}" for table in ('repositories', 'commits', 'pull_requests')]
+            disk_mb = sum(f.stat().st_size for f in files) / 1024 / 1024
+            print(f"{label:<10}{result['seconds']:>9.3f}{result['private_mb']:>11.1f}{disk_mb:>9.1f}{result['rows']:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
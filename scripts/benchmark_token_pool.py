@@ -0,0 +1,71 @@
+"""Mede a vazão do coletor com 1, 2, 4... tokens contra o stand-in local.
+
+O stand-in dá a cada token um orçamento pequeno por janela, então a coleta
+fica limitada por rate limit e a vazão deve crescer com o número de tokens:
+
+    python scripts/benchmark_token_pool.py --tokens 1 2 4 --rate-limit 30 --rate-window 2
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github import Auth  # noqa: E402
+
+from github_standin import GitHubStandIn  # noqa: E402
+from src.github_client import GitHubClient  # noqa: E402
+from src.token_pool import TokenPool  # noqa: E402
+
+
+def run(token_count: int, args) -> dict:
+    with GitHubStandIn(repos=args.repos, commits=args.commits, pulls=args.pulls,
+                       rate_limit=args.rate_limit, rate_window=args.rate_window) as standin:
+        pool = TokenPool([Auth.Token(f"bench-token-{i}") for i in range(token_count)],
+                         base_url=standin.base_url, seconds_between_requests=None)
+        client = GitHubClient(pool=pool)
+
+        started = time.perf_counter()
+        commits = prs = 0
+        for repo_name in standin.full_names:
+            repo_commits = client.get_commits_from_repo(repo_name)
+            commits += len(repo_commits)
+            prs += len(client.get_pull_requests_from_repo(repo_name, repo_commits))
+        elapsed = time.perf_counter() - started
+
+        return {
+            'tokens': token_count,
+            'seconds': elapsed,
+            'requests': standin.total_requests,
+            'requests_per_second': standin.total_requests / elapsed,
+            'per_token': dict(standin.requests_by_token),
+            'commits': commits,
+            'pull_requests': prs,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tokens', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--repos', type=int, default=6)
+    parser.add_argument('--commits', type=int, default=120)
+    parser.add_argument('--pulls', type=int, default=15)
+    parser.add_argument('--rate-limit', type=int, default=30)
+    parser.add_argument('--rate-window', type=float, default=2.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "ERROR"))
+    baseline = None
+    print(f"{'tokens':>6} {'seconds':>8} {'requests':>8} {'req/s':>7} {'speedup':>7}  commits/PRs  per-token")
+    for token_count in args.tokens:
+        result = run(token_count, args)
+        baseline = baseline or result['requests_per_second']
+        print(f"{result['tokens']:>6} {result['seconds']:>8.2f} {result['requests']:>8} "
+              f"{result['requests_per_second']:>7.1f} {result['requests_per_second'] / baseline:>6.2f}x"
+              f"  {result['commits']}/{result['pull_requests']}  {sorted(result['per_token'].values())}")
+
+
+if __name__ == '__main__':
+    main()
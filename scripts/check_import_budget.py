@@ -0,0 +1,83 @@
+"""Mede o custo de import (tempo e RSS) dos pontos de entrada e compara com um orçamento.
+
+Cada alvo é importado em um processo Python novo, como no cron do coletor,
+repetido algumas vezes; o resultado usa a mediana do tempo e o pico de RSS.
+Também lista módulos pesados que não deveriam ser carregados no cold start.
+
+    python scripts/check_import_budget.py
+    python scripts/check_import_budget.py --runs 10 --max-seconds 1.0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Alvo -> módulos que não podem ser importados por ele
+TARGETS = {
+    'src.datalake': ['supabase', 'github', 'plotly', 'duckdb'],
+    'src.data_collector': ['supabase', 'github', 'plotly', 'duckdb'],
+}
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+__import__({module!r})
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    'seconds': elapsed,
+    'rss_mb': rss_kb / 1024,
+    'modules': sorted({{name.split('.')[0] for name in sys.modules}}),
+}}))
+"""
+
+
+def measure(module: str, runs: int) -> dict:
+    env = dict(os.environ, STORAGE_BACKEND='local', PYTHONDONTWRITEBYTECODE='1')
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE.format(module=module)],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {
+        'seconds': statistics.median(s['seconds'] for s in samples),
+        'rss_mb': max(s['rss_mb'] for s in samples),
+        'modules': set(samples[-1]['modules']),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=0.8)
+    parser.add_argument('--max-rss-mb', type=float, default=120)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<22}{'seconds':>9}{'rss MB':>9}  status")
+    for module, forbidden in TARGETS.items():
+        result = measure(module, args.runs)
+        loaded = sorted(set(forbidden) & result['modules'])
+        problems = []
+        if result['seconds'] > args.max_seconds:
+            problems.append(f"import > {args.max_seconds}s")
+        if result['rss_mb'] > args.max_rss_mb:
+            problems.append(f"RSS > {args.max_rss_mb} MB")
+        if loaded:
+            problems.append(f"loads {', '.join(loaded)}")
+        failed = failed or bool(problems)
+        status = '; '.join(problems) or 'ok'
+        print(f"{module:<22}{result['seconds']:>9.3f}{result['rss_mb']:>9.1f}  {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
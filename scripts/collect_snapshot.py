@@ -5,6 +5,7 @@ from dotenv import load_dotenv
 # Ensure project modules are importable when invoked directly
 try:
     from src.data_collector import DataCollector
+    from src.sharding import SHARDS_DIR
 except Exception as e:
     print(f"Failed to import project modules: {e}", file=sys.stderr)
     sys.exit(1)
@@ -22,6 +23,9 @@ def main() -> int:
     try:
         collector = DataCollector()
         snapshot_id = collector.collect_all_data()
+        if snapshot_id and snapshot_id.startswith('shard_'):
+            logger.info(f"Shard snapshot written to {SHARDS_DIR}/{snapshot_id}, waiting for the other shards to merge")
+            return 0
         if snapshot_id:
             logger.info(f"Snapshot created successfully: {snapshot_id}")
             return 0
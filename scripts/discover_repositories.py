@@ -0,0 +1,61 @@
+"""Revalida a descoberta de repositórios por organização (REPOSITORY_PATTERNS).
+
+A coleta já revalida as listagens vencidas (REPOSITORY_DISCOVERY_INTERVAL);
+este script serve para forçar a revalidação depois de criar repositórios ou
+para conferir quais repositórios os padrões selecionam. Páginas inalteradas
+voltam 304 e não consomem rate limit.
+
+    python scripts/discover_repositories.py
+    python scripts/discover_repositories.py --force
+    python scripts/discover_repositories.py --cached   # só o cache, sem rede
+    python scripts/discover_repositories.py --pattern 'Inteli-College/2025-1A-T0\\d-G\\d+-(INTERNO|PUBLICO)'
+"""
+import argparse
+import logging
+import sys
+
+from dotenv import load_dotenv
+
+try:
+    from src.config import Config
+    from src.repo_discovery import RepositoryDiscovery
+except Exception as e:
+    print(f"Failed to import project modules: {e}", file=sys.stderr)
+    sys.exit(1)
+
+
+def main() -> int:
+    load_dotenv(override=True)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pattern', action='append',
+                        help="Padrão Org/regex (repetível; padrão: REPOSITORY_PATTERNS)")
+    parser.add_argument('--force', action='store_true', help="Revalida mesmo dentro do intervalo")
+    parser.add_argument('--cached', action='store_true', help="Só lista o que está no cache")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    logger = logging.getLogger("discover_repositories")
+
+    discovery = RepositoryDiscovery(patterns=args.pattern or Config.REPOSITORY_PATTERNS)
+    if not discovery.patterns:
+        parser.error("no patterns (use --pattern or set REPOSITORY_PATTERNS)")
+
+    if args.cached:
+        repositories = discovery.cached_repositories()
+    else:
+        try:
+            repositories = discovery.refresh(force=args.force)
+        except Exception as e:
+            logger.exception(f"Repository discovery failed: {e}")
+            return 1
+    for name in repositories:
+        print(name)
+    logger.info(f"{len(repositories)} repositories match {len(discovery.patterns)} patterns")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,467 @@
+"""Stand-in local da API REST do GitHub para testes e benchmarks offline.
+
+Serve o subconjunto de endpoints usado pelo coletor (repositório, branches,
+commits, pull requests, usuários, listagem da organização e /rate_limit)
+com dados sintéticos, paginação via cabeçalho Link, ETag/304 na listagem
+da organização e orçamento de rate limit por token com os cabeçalhos
+X-RateLimit-*. Também simula o limite secundário (403 com
+Retry-After quando há requisições simultâneas demais) e erros 5xx. Uso
+standalone:
+
+    python scripts/github_standin.py --repos 5 --commits 300 --port 8765
+    python scripts/github_standin.py --max-concurrent 4 --retry-after 1 --error-every 50
+"""
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+BASE_DATE = datetime(2025, 5, 1, tzinfo=timezone.utc)
+
+
+def _stable_int(value: str) -> int:
+    return int(hashlib.sha1(value.encode('utf-8')).hexdigest()[:8], 16)
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class _Bucket:
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.reset = time.time() + window
+
+    def take(self) -> bool:
+        now = time.time()
+        if now >= self.reset:
+            self.remaining = self.limit
+            self.reset = now + self.window
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+class GitHubStandIn:
+    """Servidor HTTP que imita a API do GitHub com dados determinísticos"""
+
+    def __init__(self, repos: int = 3, commits: int = 120, pulls: int = 20,
+                 owner: str = 'Org', rate_limit: int = 5000, rate_window: float = 3600,
+                 latency: float = 0.0, host: str = '127.0.0.1', port: int = 0,
+                 max_concurrent: int = 0, retry_after: float = 1.0, error_every: int = 0,
+                 pr_commits: int = 3):
+        self.owner = owner
+        # Commits por PR (consecutivos, a partir de uma posição que depende do número do PR)
+        self.pr_commits = pr_commits
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.latency = latency
+        # Limite secundário: acima de max_concurrent requisições simultâneas responde 403 + Retry-After
+        self.max_concurrent = max_concurrent
+        self.retry_after = retry_after
+        # A cada error_every requisições uma responde 502
+        self.error_every = error_every
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.secondary_limited = 0
+        self.server_errors = 0
+        # Respostas 304 (If-None-Match), que como no GitHub não consomem rate limit
+        self.not_modified = 0
+        self.repo_names = []
+        self.commits: Dict[str, List[dict]] = {}
+        self.pulls: Dict[str, List[dict]] = {}
+        self.add_repos(repos, commits, pulls)
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+        self.requests_by_token: Counter = Counter()
+        self.requests_by_path: Counter = Counter()
+
+        handler = type('Handler', (_Handler,), {'standin': self})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def full_names(self) -> List[str]:
+        return [f"{self.owner}/{name}" for name in self.repo_names]
+
+    def start(self) -> 'GitHubStandIn':
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests_by_token.values())
+
+    def add_repos(self, count: int, commits: int = 120, pulls: int = 20) -> List[str]:
+        """Cria repositórios novos no fim da listagem da organização (ordem de criação)"""
+        start = len(self.repo_names) + 1
+        names = [f"2025-1A-T01-G{i:02d}-INTERNO" for i in range(start, start + count)]
+        for name in names:
+            self.commits[name] = self._make_commits(name, commits)
+            self.pulls[name] = self._make_pulls(name, pulls)
+        self.repo_names.extend(names)
+        return [f"{self.owner}/{name}" for name in names]
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests_by_token.clear()
+            self.requests_by_path.clear()
+            self.peak_in_flight = 0
+            self.secondary_limited = 0
+            self.server_errors = 0
+            self.not_modified = 0
+
+    def _make_commits(self, name: str, count: int) -> List[dict]:
+        commits = []
+        for i in range(count):
+            date = BASE_DATE + timedelta(hours=i)
+            sha = hashlib.sha1(f"{name}:{i}".encode('utf-8')).hexdigest()
+            commits.append({
+                'sha': sha,
+                'message': f"feat: change {i} in {name}",
+                'author': f"Aluno {i % 5}",
+                'email': f"aluno{i % 5}@example.com",
+                'date': _iso(date),
+            })
+        commits.reverse()  # mais recente primeiro, como na API
+        return commits
+
+    def _make_pulls(self, name: str, count: int) -> List[dict]:
+        pulls = []
+        for number in range(1, count + 1):
+            created = BASE_DATE + timedelta(hours=number * 3)
+            pulls.append({
+                'number': number,
+                'title': f"PR {number} de {name}",
+                'login': f"aluno{number % 5}",
+                'state': 'open' if number % 3 == 0 else 'closed',
+                'created_at': _iso(created),
+                'updated_at': _iso(created + timedelta(hours=1)),
+                'comments': number % 4,
+                'review_comments': number % 2,
+            })
+        return pulls
+
+    def _take(self, token: str) -> Optional[_Bucket]:
+        with self._lock:
+            bucket = self._buckets.get(token)
+            if bucket is None:
+                bucket = self._buckets[token] = _Bucket(self.rate_limit, self.rate_window)
+            ok = bucket.take()
+            return bucket if ok else None
+
+    def _bucket(self, token: str) -> _Bucket:
+        with self._lock:
+            bucket = self._buckets.get(token)
+            if bucket is None:
+                bucket = self._buckets[token] = _Bucket(self.rate_limit, self.rate_window)
+            return bucket
+
+
+class _Handler(BaseHTTPRequestHandler):
+    standin: GitHubStandIn = None
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalhos e corpo saem em writes separados; sem isso cada resposta pega ~40ms de Nagle
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    # --- helpers -----------------------------------------------------------
+
+    def _token(self) -> str:
+        auth = self.headers.get('Authorization', '')
+        return auth.split(' ', 1)[1] if ' ' in auth else 'anonymous'
+
+    def _rate_headers(self, bucket: _Bucket) -> Dict[str, str]:
+        return {
+            'X-RateLimit-Limit': str(bucket.limit),
+            'X-RateLimit-Remaining': str(max(bucket.remaining, 0)),
+            'X-RateLimit-Reset': str(int(bucket.reset) + 1),
+            'X-RateLimit-Used': str(bucket.limit - max(bucket.remaining, 0)),
+            'X-RateLimit-Resource': 'core',
+        }
+
+    def _send(self, status: int, payload, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _paginate(self, items: list, query: dict) -> tuple:
+        per_page = min(int(query.get('per_page', ['30'])[0]), 100)
+        page = int(query.get('page', ['1'])[0])
+        start = (page - 1) * per_page
+        chunk = items[start:start + per_page]
+        headers = {}
+        if start + per_page < len(items):
+            parsed = urlparse(self.path)
+            params = {k: v[0] for k, v in query.items()}
+            params.update({'per_page': str(per_page), 'page': str(page + 1)})
+            query_string = '&'.join(f"{k}={v}" for k, v in params.items())
+            last = dict(params, page=str((len(items) + per_page - 1) // per_page))
+            last_query = '&'.join(f"{k}={v}" for k, v in last.items())
+            headers['Link'] = (f'<{self.standin.base_url}{parsed.path}?{query_string}>; rel="next", '
+                               f'<{self.standin.base_url}{parsed.path}?{last_query}>; rel="last"')
+        return chunk, headers
+
+    # --- JSON builders -----------------------------------------------------
+
+    def _repo_url(self, name: str) -> str:
+        return f"{self.standin.base_url}/repos/{self.standin.owner}/{name}"
+
+    def _user(self, login: str) -> dict:
+        return {'login': login, 'id': _stable_int(login) % 100000,
+                'url': f"{self.standin.base_url}/users/{login}", 'type': 'User'}
+
+    def _repo_json(self, name: str) -> dict:
+        commits = self.standin.commits[name]
+        return {
+            'id': _stable_int(name) % 1000000,
+            'name': name,
+            'full_name': f"{self.standin.owner}/{name}",
+            'owner': self._user(self.standin.owner),
+            'private': False,
+            'default_branch': 'main',
+            'pushed_at': commits[0]['date'] if commits else _iso(BASE_DATE),
+            'updated_at': commits[0]['date'] if commits else _iso(BASE_DATE),
+            'url': self._repo_url(name),
+            'html_url': f"https://github.com/{self.standin.owner}/{name}",
+        }
+
+    def _commit_json(self, name: str, commit: dict, detail: bool = False) -> dict:
+        payload = {
+            'sha': commit['sha'],
+            'url': f"{self._repo_url(name)}/commits/{commit['sha']}",
+            'html_url': f"https://github.com/{self.standin.owner}/{name}/commit/{commit['sha']}",
+            'commit': {
+                'message': commit['message'],
+                'author': {'name': commit['author'], 'email': commit['email'], 'date': commit['date']},
+                'committer': {'name': commit['author'], 'email': commit['email'], 'date': commit['date']},
+            },
+            'author': self._user(commit['email'].split('@')[0]),
+        }
+        if detail:
+            size = int(commit['sha'][:2], 16)
+            payload['stats'] = {'additions': size, 'deletions': size // 3, 'total': size + size // 3}
+            payload['files'] = [{'filename': f"src/file_{i}.py", 'additions': 1, 'deletions': 0}
+                                for i in range(1 + size % 4)]
+        return payload
+
+    def _pull_json(self, name: str, pull: dict, detail: bool = False) -> dict:
+        payload = {
+            'number': pull['number'],
+            'title': pull['title'],
+            'user': self._user(pull['login']),
+            'state': pull['state'],
+            'created_at': pull['created_at'],
+            'updated_at': pull['updated_at'],
+            'url': f"{self._repo_url(name)}/pulls/{pull['number']}",
+            'html_url': f"https://github.com/{self.standin.owner}/{name}/pull/{pull['number']}",
+        }
+        if detail:
+            payload['comments'] = pull['comments']
+            payload['review_comments'] = pull['review_comments']
+        return payload
+
+    # --- routing -----------------------------------------------------------
+
+    def do_GET(self):
+        standin = self.standin
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        path = parsed.path.rstrip('/')
+        token = self._token()
+
+        if path == '/rate_limit':
+            bucket = standin._bucket(token)
+            core = {'limit': bucket.limit, 'remaining': max(bucket.remaining, 0),
+                    'reset': int(bucket.reset) + 1, 'used': bucket.limit - max(bucket.remaining, 0)}
+            self._send(200, {'resources': {'core': core, 'search': core}, 'rate': core}, self._rate_headers(bucket))
+            return
+
+        with standin._lock:
+            standin.in_flight += 1
+            standin.peak_in_flight = max(standin.peak_in_flight, standin.in_flight)
+            too_many = bool(standin.max_concurrent) and standin.in_flight > standin.max_concurrent
+            served = sum(standin.requests_by_token.values()) + 1
+        try:
+            if standin.latency:
+                time.sleep(standin.latency)
+            if too_many:
+                with standin._lock:
+                    standin.secondary_limited += 1
+                self._send(403, {'message': "You have exceeded a secondary rate limit. "
+                                            "Please wait a few minutes before you try again."},
+                           {'Retry-After': f"{standin.retry_after:g}"})
+                return
+            if standin.error_every and served % standin.error_every == 0:
+                with standin._lock:
+                    standin.server_errors += 1
+                    standin.requests_by_token[token] += 1
+                self._send(502, {'message': 'Server Error'})
+                return
+            self._route(token, path, query)
+        finally:
+            with standin._lock:
+                standin.in_flight -= 1
+
+    def _org_repos(self, path: str, query: dict) -> bool:
+        """Listagem da organização com ETag; If-None-Match igual responde 304 sem gastar orçamento"""
+        standin = self.standin
+        if path != f"/orgs/{standin.owner}/repos":
+            return False
+        chunk, link = self._paginate(list(standin.repo_names), query)
+        payload = [self._repo_json(name) for name in chunk]
+        etag = '"' + hashlib.sha1(json.dumps([payload, link], sort_keys=True).encode('utf-8')).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            with standin._lock:
+                standin.not_modified += 1
+                standin.requests_by_path[path + ' (304)'] += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return True
+        token = self._token()
+        bucket = standin._take(token)
+        with standin._lock:
+            standin.requests_by_token[token] += 1
+            standin.requests_by_path[path] += 1
+        if bucket is None:
+            self._send(403, {'message': f"API rate limit exceeded for token {token}."},
+                       self._rate_headers(standin._bucket(token)))
+        else:
+            self._send(200, payload, {**self._rate_headers(bucket), **link, 'ETag': etag})
+        return True
+
+    def _route(self, token: str, path: str, query: dict):
+        standin = self.standin
+        if self._org_repos(path, query):
+            return
+        bucket = standin._take(token)
+        with standin._lock:
+            standin.requests_by_token[token] += 1
+            standin.requests_by_path[re.sub(r'/[0-9a-f]{40}|/\d+', '/:id', path)] += 1
+        if bucket is None:
+            bucket = standin._bucket(token)
+            self._send(403, {'message': f"API rate limit exceeded for token {token}."}, self._rate_headers(bucket))
+            return
+        headers = self._rate_headers(bucket)
+
+        if path == '/user':
+            self._send(200, self._user('standin'), headers)
+            return
+
+        match = re.match(r'^/users/([^/]+)$', path)
+        if match:
+            self._send(200, {**self._user(match.group(1)), 'email': None, 'name': match.group(1)}, headers)
+            return
+
+        match = re.match(r'^/repos/([^/]+)/([^/]+)(/.*)?$', path)
+        if not match or match.group(1) != standin.owner or match.group(2) not in standin.commits:
+            self._send(404, {'message': 'Not Found'}, headers)
+            return
+
+        name, rest = match.group(2), match.group(3) or ''
+        commits = standin.commits[name]
+        pulls = standin.pulls[name]
+
+        if rest == '':
+            self._send(200, self._repo_json(name), headers)
+        elif rest.startswith('/branches/'):
+            self._send(200, {'name': rest.split('/', 2)[2],
+                             'commit': self._commit_json(name, commits[0]) if commits else None}, headers)
+        elif rest == '/commits':
+            chunk, link = self._paginate(commits, query)
+            self._send(200, [self._commit_json(name, c) for c in chunk], {**headers, **link})
+        elif rest.startswith('/commits/'):
+            sha = rest.split('/', 2)[2]
+            commit = next((c for c in commits if c['sha'] == sha), None)
+            if commit is None:
+                self._send(422, {'message': 'No commit found for SHA'}, headers)
+            else:
+                self._send(200, self._commit_json(name, commit, detail=True), headers)
+        elif rest == '/pulls':
+            state = query.get('state', ['open'])[0]
+            sort = query.get('sort', ['created'])[0]
+            items = [p for p in pulls if state == 'all' or p['state'] == state]
+            key = 'updated_at' if sort == 'updated' else 'created_at'
+            items = sorted(items, key=lambda p: p[key], reverse=query.get('direction', ['desc'])[0] == 'desc')
+            chunk, link = self._paginate(items, query)
+            self._send(200, [self._pull_json(name, p) for p in chunk], {**headers, **link})
+        elif re.match(r'^/pulls/\d+(/commits)?$', rest):
+            number = int(rest.split('/')[2])
+            pull = next((p for p in pulls if p['number'] == number), None)
+            if pull is None:
+                self._send(404, {'message': 'Not Found'}, headers)
+            elif rest.endswith('/commits'):
+                pr_commits = commits[number % max(len(commits), 1):][:standin.pr_commits]
+                chunk, link = self._paginate(pr_commits, query)
+                self._send(200, [self._commit_json(name, c) for c in chunk], {**headers, **link})
+            else:
+                self._send(200, self._pull_json(name, pull, detail=True), headers)
+        else:
+            self._send(404, {'message': 'Not Found'}, headers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repos', type=int, default=3)
+    parser.add_argument('--commits', type=int, default=120)
+    parser.add_argument('--pulls', type=int, default=20)
+    parser.add_argument('--rate-limit', type=int, default=5000)
+    parser.add_argument('--rate-window', type=float, default=3600)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--max-concurrent', type=int, default=0, help="Limite secundário (0 = desligado)")
+    parser.add_argument('--retry-after', type=float, default=1.0)
+    parser.add_argument('--error-every', type=int, default=0, help="Uma resposta 502 a cada N (0 = nunca)")
+    args = parser.parse_args()
+
+    standin = GitHubStandIn(repos=args.repos, commits=args.commits, pulls=args.pulls,
+                            rate_limit=args.rate_limit, rate_window=args.rate_window,
+                            latency=args.latency, port=args.port, max_concurrent=args.max_concurrent,
+                            retry_after=args.retry_after, error_every=args.error_every)
+    print(f"GitHub stand-in at {standin.base_url}")
+    print(f"GITHUB_API_URL={standin.base_url}")
+    print(f"INTERNAL_REPOSITORIES={','.join(standin.full_names)}")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        standin.stop()
+
+
+if __name__ == '__main__':
+    main()
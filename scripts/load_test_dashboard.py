@@ -0,0 +1,239 @@
+"""Teste de carga do dashboard: N sessões simultâneas navegando pelo app.py.
+
+Gera um datalake sintético (backend local) com alguns snapshots e, para cada
+nível de concorrência, sobe um processo novo com N sessões do Streamlit
+(`streamlit.testing.v1.AppTest`, uma thread por sessão, compartilhando os
+caches como no servidor). Cada sessão abre o dashboard e clica em snapshots,
+tipo, período e nas abas de detalhamento, diferenças e histórico. Mede a
+latência de cada rerun (p50/p95/p99/máx) e o pico de RSS do processo:
+
+    python scripts/load_test_dashboard.py --sessions 1 4 8 16
+    python scripts/load_test_dashboard.py --sessions 8 --commits 300000 --by-step
+    python scripts/load_test_dashboard.py --sessions 4 8 --datalake ./data   # datalake existente (local)
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / 'app.py'
+
+SEARCH_TERMS = ['login', 'ajuste tela', 'corre', 'teste cadastro']
+
+
+def build_datalake(snapshots: int, commits: int, repos: int, seed: int):
+    """Snapshots crescentes (o último com `commits` commits) no formato gravado pela coleta"""
+    import numpy as np
+    import pandas as pd
+
+    from src.datalake import DataLake
+
+    rng = np.random.default_rng(seed)
+    repo_names = np.array([f"Org/2025-1A-T0{r % 3 + 1}-G{r:03d}-{'INTERNO' if r % 2 else 'PUBLICO'}"
+                           for r in range(repos)], dtype=object)
+    words = np.array(['feat: tela de login', 'fix: ajuste na tela', 'docs: correção do readme',
+                      'test: teste de cadastro', 'refactor: rotas da api', 'chore: dependências'], dtype=object)
+    # Maior parte dos commits dentro da janela padrão do dashboard (5 a 17/05), o resto depois
+    start = pd.Timestamp('2025-05-01', tz='UTC')
+    dates = start + pd.to_timedelta(rng.integers(0, 25 * 86400, commits), unit='s')
+    authors = rng.integers(0, max(repos * 5, 1), commits)
+    repo_index = rng.integers(0, repos, commits)
+    commits_df = pd.DataFrame({
+        'sha': [f"{i:040x}" for i in range(commits)],
+        'message': words[rng.integers(0, len(words), commits)],
+        'author': [f"Aluno {a}" for a in authors],
+        'email': [f"aluno{a}@example.com" for a in authors],
+        'date': dates.strftime('%Y-%m-%dT%H:%M:%S+00:00'),
+        'url': [f"https://github.com/{repo_names[r]}/commit/{i:040x}" for i, r in enumerate(repo_index)],
+        'repo_name': repo_names[repo_index],
+    }).sort_values('date', kind='stable').reset_index(drop=True)
+
+    pulls = max(commits // 20, 1)
+    pr_repo = rng.integers(0, repos, pulls)
+    prs_df = pd.DataFrame({
+        'number': [str(i) for i in range(pulls)],
+        'title': words[rng.integers(0, len(words), pulls)],
+        'author': [f"aluno{a}" for a in rng.integers(0, max(repos * 5, 1), pulls)],
+        'email': '',
+        'created_at': '2025-05-06T12:00:00+00:00',
+        'state': np.where(rng.random(pulls) < 0.6, 'open', 'closed'),
+        'comments': '0',
+        'review_comments': '0',
+        'commits': '[]',
+        'url': [f"https://github.com/{repo_names[r]}/pull/{i}" for i, r in enumerate(pr_repo)],
+        'repo_name': repo_names[pr_repo],
+        'updated_at': '2025-05-10T12:00:00+00:00',
+    })
+    repos_df = pd.DataFrame({'repo_name': repo_names, 'last_updated': '2025-05-20'})
+
+    datalake = DataLake()
+    for n in range(1, snapshots + 1):
+        count = commits * n // snapshots
+        datalake.create_snapshot_from_frames(repos_df, commits_df.iloc[:count], prs_df.iloc[:pulls * n // snapshots])
+        if n < snapshots:
+            # Ids de snapshot têm resolução de segundos
+            time.sleep(1.1)
+
+
+def rss_mb() -> float:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+
+def session(index: int, clicks: int, think: float, timeout: float, samples: list, errors: list):
+    """Uma sessão: abre o dashboard e faz `clicks` interações sorteadas, medindo cada rerun"""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(index)
+    at = AppTest.from_file(str(APP), default_timeout=timeout)
+
+    def widget(kind: str, key: str = None, label: str = None):
+        widgets = getattr(at, kind)
+        return widgets(key=key) if key else next(w for w in widgets if w.label == label)
+
+    def pick(kind: str, key: str = None, label: str = None):
+        box = widget(kind, key, label)
+        options = [o for o in box.options if o != box.value] or list(box.options)
+        box.select(rng.choice(options))
+
+    actions = {
+        'snapshot': lambda: pick('selectbox', key='snapshot_selector'),
+        'tipo': lambda: pick('selectbox', label='🏢 Tipo'),
+        'periodo': lambda: widget('date_input', label='Data Inicial').set_value(
+            datetime.date(2025, 5, 5) + datetime.timedelta(days=rng.randrange(7))),
+        'detalhe': lambda: pick('selectbox', key='repo_select'),
+        'busca': lambda: at.text_input(key='search_query').input(rng.choice(SEARCH_TERMS)),
+        'diferencas': lambda: pick('selectbox', key='diff_base_snapshot'),
+        'historico': lambda: pick('selectbox', key='history_repo_select'),
+    }
+
+    def rerun(step: str, action=None):
+        started = time.perf_counter()
+        try:
+            if action is not None:
+                action()
+            at.run()
+        except Exception as e:
+            errors.append({'session': index, 'step': step, 'error': repr(e)})
+            return
+        samples.append({'step': step, 'seconds': time.perf_counter() - started})
+        for exception in at.exception:
+            errors.append({'session': index, 'step': step, 'error': exception.value})
+
+    rerun('abrir')
+    for _ in range(clicks):
+        if think:
+            time.sleep(rng.uniform(0, 2 * think))
+        step = rng.choice(list(actions))
+        rerun(step, actions[step])
+
+
+def worker(args) -> dict:
+    """Roda as sessões de um nível de concorrência neste processo (caches frios) e devolve as medidas"""
+    # Linha de base: processo com Streamlit e o projeto importados, antes da primeira sessão
+    import src.data_collector  # noqa: F401
+    from streamlit.testing.v1 import AppTest  # noqa: F401
+    baseline = rss_mb()
+    samples, errors = [], []
+    threads = [threading.Thread(target=session, args=(i, args.clicks, args.think, args.timeout, samples, errors))
+               for i in range(args.worker)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        'samples': samples,
+        'errors': errors,
+        'seconds': elapsed,
+        'baseline_mb': baseline,
+        # ru_maxrss em KB no Linux
+        'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return float('nan')
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[int(q) - 1]
+
+
+def run_level(sessions: int, args) -> dict:
+    command = [sys.executable, str(Path(__file__).resolve()), '--worker', str(sessions),
+               '--clicks', str(args.clicks), '--think', str(args.think), '--timeout', str(args.timeout)]
+    result = subprocess.run(command, cwd=ROOT, env=os.environ, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"worker with {sessions} sessions failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 8],
+                        help="Níveis de concorrência (sessões simultâneas)")
+    parser.add_argument('--clicks', type=int, default=10, help="Interações por sessão depois de abrir")
+    parser.add_argument('--think', type=float, default=0.0, help="Pausa média entre cliques (segundos)")
+    parser.add_argument('--timeout', type=float, default=600.0, help="Tempo máximo de um rerun")
+    parser.add_argument('--snapshots', type=int, default=3)
+    parser.add_argument('--commits', type=int, default=100000, help="Commits do snapshot mais recente")
+    parser.add_argument('--repos', type=int, default=120)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--datalake', help="Usa um datalake local existente em vez do sintético")
+    parser.add_argument('--by-step', action='store_true', help="Também mostra p50/p95 por interação")
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "ERROR"))
+    sys.path.insert(0, str(ROOT))
+
+    if args.worker:
+        print(json.dumps(worker(args)))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        datalake = args.datalake or tmp
+        os.environ.update(STORAGE_BACKEND='local', DATALAKE_PATH=datalake,
+                          SNAPSHOTS_PATH=str(Path(datalake) / 'snapshots'), SNAPSHOT_WATCH_ENABLED='false')
+        if not args.datalake:
+            started = time.perf_counter()
+            build_datalake(args.snapshots, args.commits, args.repos, args.seed)
+            print(f"synthetic datalake: {args.snapshots} snapshots, {args.commits} commits, {args.repos} repos "
+                  f"({time.perf_counter() - started:.1f}s)")
+
+        print(f"{'sessions':>8} {'reruns':>6} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'max s':>7} "
+              f"{'reruns/s':>8} {'base MB':>8} {'peak MB':>8} {'errors':>6}")
+        for sessions in args.sessions:
+            result = run_level(sessions, args)
+            latencies = sorted(s['seconds'] for s in result['samples'])
+            print(f"{sessions:>8} {len(latencies):>6} {percentile(latencies, 50):>7.3f} "
+                  f"{percentile(latencies, 95):>7.3f} {percentile(latencies, 99):>7.3f} "
+                  f"{max(latencies, default=float('nan')):>7.3f} {len(latencies) / result['seconds']:>8.2f} "
+                  f"{result['baseline_mb']:>8.0f} {result['peak_mb']:>8.0f} {len(result['errors']):>6}")
+            if args.by_step:
+                steps = {}
+                for sample in result['samples']:
+                    steps.setdefault(sample['step'], []).append(sample['seconds'])
+                for step, values in sorted(steps.items()):
+                    print(f"{'':>8} {step:>14} {len(values):>4}x  p50 {percentile(values, 50):.3f}  "
+                          f"p95 {percentile(values, 95):.3f}")
+            for error in result['errors'][:3]:
+                print(f"{'':>8} session {error['session']} {error['step']}: {error['error']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
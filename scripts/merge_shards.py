@@ -0,0 +1,62 @@
+"""Combina os snapshots parciais dos shards de coleta em um snapshot.
+
+Cada scheduler com SHARD_INDEX/SHARD_COUNT grava um parcial em `_shards/`;
+com SHARD_AUTO_MERGE=true o último shard a terminar já faz o merge. Este
+script serve para rodar o merge à parte (cron de um container só) ou para
+fechar um snapshot quando algum shard não terminou.
+
+    python scripts/merge_shards.py --list
+    python scripts/merge_shards.py --shard-count 3 --window 900
+    python scripts/merge_shards.py --carry-missing   # shards ausentes vêm do último snapshot
+"""
+import argparse
+import logging
+import sys
+
+from dotenv import load_dotenv
+
+try:
+    from src.config import Config
+    from src.datalake import DataLake
+except Exception as e:
+    print(f"Failed to import project modules: {e}", file=sys.stderr)
+    sys.exit(1)
+
+
+def main() -> int:
+    load_dotenv(override=True)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--shard-count', type=int, default=Config.SHARD_COUNT)
+    parser.add_argument('--window', type=float, default=Config.SHARD_MERGE_WINDOW,
+                        help="Segundos entre o primeiro e o último shard combinados")
+    parser.add_argument('--carry-missing', action='store_true',
+                        help="Completa os shards ausentes com os dados do último snapshot")
+    parser.add_argument('--list', action='store_true', help="Só lista os parciais pendentes")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    logger = logging.getLogger("merge_shards")
+
+    datalake = DataLake()
+    if args.list:
+        for partial in datalake.list_shard_snapshots():
+            logger.info(f"{partial['partial_id']}: shard {partial['shard_index']}/{partial['shard_count']}, "
+                        f"{len(partial['repositories'])} repos, {partial['commits_count']} commits, "
+                        f"{partial['pull_requests_count']} PRs, finished {partial['finished_at']}")
+        return 0
+
+    if args.shard_count < 2:
+        parser.error("--shard-count must be at least 2 (or set SHARD_COUNT)")
+    snapshot_id = datalake.merge_shard_snapshots(args.shard_count, args.window, args.carry_missing)
+    if snapshot_id:
+        logger.info(f"Snapshot created successfully: {snapshot_id}")
+        return 0
+    logger.warning("No snapshot created (shards missing, merge in progress elsewhere or nothing to merge)")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
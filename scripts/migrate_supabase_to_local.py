@@ -1,24 +1,199 @@
+"""Copia o bucket do Supabase para o datalake local.
+
+Percorre o bucket inteiro (listagem paginada, incluindo `_series/` e
+`_catalog/`, mas não `_shards/`) e baixa os arquivos com um pool de threads. Arquivos que já
+existem localmente com o mesmo tamanho e o mesmo MD5 (eTag) são pulados.
+Cada download vai primeiro para um `.part` e só depois é renomeado, então uma
+execução interrompida pode ser repetida e continua de onde parou. O
+`metadata.json` de cada snapshot é gravado por último: um snapshot só aparece
+localmente quando todos os seus arquivos foram copiados.
+
+    python scripts/migrate_supabase_to_local.py --workers 16
+    python scripts/migrate_supabase_to_local.py --size-only   # não calcula MD5 dos arquivos locais
+"""
+import argparse
+import hashlib
 import os
-import json
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import logging
-from typing import List
+from typing import Iterator, List
 
 from dotenv import load_dotenv
-from supabase import create_client, Client
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("migrate")
 
+# Limite de itens por chamada de list() da API de Storage
+LIST_PAGE_SIZE = 1000
+DOWNLOAD_ATTEMPTS = 3
+_MD5_ETAG = re.compile(r'^[0-9a-f]{32}$')
+# Estado transitório da coleta em shards: o merge.lock copiado travaria os merges locais até
+# SHARD_MERGE_LOCK_TTL e os parciais ainda não terminados não viram snapshot aqui
+SKIPPED_PREFIXES = ('_shards/',)
+
 
 def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
 
-def main() -> None:
+def list_all(storage, prefix: str = '') -> Iterator[dict]:
+    """Lista todos os objetos abaixo de `prefix`, paginando e descendo nas pastas"""
+    offset = 0
+    while True:
+        page = storage.list(prefix or None, {'limit': LIST_PAGE_SIZE, 'offset': offset,
+                                             'sortBy': {'column': 'name', 'order': 'asc'}})
+        for item in page:
+            path = f"{prefix}/{item['name']}" if prefix else item['name']
+            if f"{path}/".startswith(SKIPPED_PREFIXES) or path.startswith(SKIPPED_PREFIXES):
+                logger.info(f"Skipping {path}")
+                continue
+            if item.get('id') is None:
+                # Pastas não têm id nem metadata
+                yield from list_all(storage, path)
+            else:
+                yield {**item, 'path': path}
+        if len(page) < LIST_PAGE_SIZE:
+            return
+        offset += LIST_PAGE_SIZE
+
+
+def file_md5(path: Path) -> str:
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_up_to_date(local_path: Path, item: dict, verify_checksum: bool) -> bool:
+    if not local_path.exists():
+        return False
+    metadata = item.get('metadata') or {}
+    size = metadata.get('size')
+    if size is not None and local_path.stat().st_size != int(size):
+        return False
+    etag = str(metadata.get('eTag') or '').strip('"').lower()
+    if verify_checksum and _MD5_ETAG.match(etag):
+        # eTag de upload simples é o MD5 do conteúdo; uploads multipart não seguem esse formato
+        return file_md5(local_path) == etag
+    return size is not None
+
+
+class Progress:
+    def __init__(self, total_files: int):
+        self.total_files = total_files
+        self.downloaded = 0
+        self.skipped = 0
+        self.failed: List[str] = []
+        self.bytes = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, status: str, path: str, size: int = 0):
+        with self._lock:
+            if status == 'downloaded':
+                self.downloaded += 1
+                self.bytes += size
+            elif status == 'skipped':
+                self.skipped += 1
+            else:
+                self.failed.append(path)
+            done = self.downloaded + self.skipped + len(self.failed)
+        if done % 50 == 0 or done == self.total_files:
+            logger.info(f"[{done}/{self.total_files}] {self.summary()}")
+
+    def summary(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (f"{self.downloaded} downloaded ({self.bytes / 1024 / 1024:.1f} MB, "
+                f"{self.bytes / 1024 / 1024 / elapsed:.2f} MB/s, {self.downloaded / elapsed:.1f} files/s), "
+                f"{self.skipped} skipped, {len(self.failed)} failed in {elapsed:.1f}s")
+
+
+def local_path_for(remote_path: str, snapshots_path: Path, datalake_path: Path) -> Path:
+    # `_series/` e `_catalog/` ficam na raiz do datalake; snapshots em SNAPSHOTS_PATH
+    base = datalake_path if remote_path.startswith('_') else snapshots_path
+    return base / remote_path
+
+
+def download_one(storage, item: dict, local_path: Path, verify_checksum: bool, progress: Progress) -> bool:
+    remote_path = item['path']
+    if is_up_to_date(local_path, item, verify_checksum):
+        progress.add('skipped', remote_path)
+        return True
+
+    ensure_dir(local_path.parent)
+    part_path = local_path.with_name(local_path.name + '.part')
+    for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+        try:
+            blob = storage.download(remote_path)
+            # Some clients may return str
+            data = blob if isinstance(blob, bytes) else blob.encode("utf-8")
+            with open(part_path, 'wb') as f:
+                f.write(data)
+            os.replace(part_path, local_path)
+            progress.add('downloaded', remote_path, len(data))
+            return True
+        except Exception as e:
+            if attempt == DOWNLOAD_ATTEMPTS:
+                logger.warning(f"  - Failed {remote_path}: {e}")
+            else:
+                time.sleep(2 ** attempt)
+    progress.add('failed', remote_path)
+    return False
+
+
+def migrate(storage, snapshots_path: Path, datalake_path: Path, workers: int = 8,
+            verify_checksum: bool = True) -> Progress:
+    items = list(list_all(storage))
+    # metadata.json de cada snapshot só depois dos demais arquivos dele
+    metadata_items = [i for i in items if i['path'].endswith('/metadata.json') and not i['path'].startswith('_')]
+    metadata_paths = {i['path'] for i in metadata_items}
+    data_items = [i for i in items if i['path'] not in metadata_paths]
+    logger.info(f"{len(items)} files in bucket ({len(metadata_items)} snapshots)")
+
+    progress = Progress(len(items))
+    failed_snapshots = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(download_one, storage, item,
+                        local_path_for(item['path'], snapshots_path, datalake_path),
+                        verify_checksum, progress): item
+            for item in data_items
+        }
+        for future in as_completed(futures):
+            if not future.result():
+                failed_snapshots.add(futures[future]['path'].split('/')[0])
+
+        ready = []
+        for item in metadata_items:
+            if item['path'].split('/')[0] in failed_snapshots:
+                logger.warning(f"  - Not publishing {item['path']}: some files of the snapshot failed")
+                progress.add('failed', item['path'])
+            else:
+                ready.append(item)
+        list(pool.map(
+            lambda item: download_one(storage, item,
+                                      local_path_for(item['path'], snapshots_path, datalake_path),
+                                      verify_checksum, progress),
+            ready
+        ))
+    return progress
+
+
+def main() -> int:
     load_dotenv(override=True)
 
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--size-only', action='store_true', help="Compara só o tamanho (sem MD5 local)")
+    args = parser.parse_args()
+
     url = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
     key = os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
     bucket = os.getenv("SUPABASE_BUCKET", "snapshots")
@@ -26,52 +201,23 @@ def main() -> None:
     if not url or not key:
         raise SystemExit("Supabase credentials missing. Set NEXT_PUBLIC_SUPABASE_URL and NEXT_PUBLIC_SUPABASE_ANON_KEY in .env")
 
-    supabase: Client = create_client(url, key)
+    from supabase import create_client
+    storage = create_client(url, key).storage.from_(bucket)
 
-    local_base = Path(os.getenv("SNAPSHOTS_PATH", "./data/snapshots"))
-    ensure_dir(local_base)
+    snapshots_path = Path(os.getenv("SNAPSHOTS_PATH", "./data/snapshots"))
+    datalake_path = Path(os.getenv("DATALAKE_PATH", "./data"))
+    ensure_dir(snapshots_path)
 
-    logger.info(f"Listing snapshots in Supabase bucket '{bucket}'...")
+    logger.info(f"Listing Supabase bucket '{bucket}'...")
     try:
-        items: List[dict] = supabase.storage.from_(bucket).list()
+        progress = migrate(storage, snapshots_path, datalake_path, args.workers, not args.size_only)
     except Exception as e:
-        raise SystemExit(f"Failed to list bucket '{bucket}': {e}")
-
-    if not items:
-        logger.info("No snapshots found in bucket.")
-        return
-
-    total = len(items)
-    for idx, item in enumerate(items, 1):
-        snapshot_id = item.get("name") or item.get("id")
-        if not snapshot_id:
-            logger.warning(f"Skipping item without name/id: {item}")
-            continue
-
-        logger.info(f"[{idx}/{total}] Migrating {snapshot_id}...")
-        snapshot_dir = local_base / snapshot_id
-        ensure_dir(snapshot_dir)
-
-        for filename in ["repositories.parquet", "commits.parquet", "pull_requests.parquet", "metadata.json"]:
-            remote_path = f"{snapshot_id}/{filename}"
-            local_path = snapshot_dir / filename
-            try:
-                blob = supabase.storage.from_(bucket).download(remote_path)
-                if isinstance(blob, bytes):
-                    data = blob
-                else:
-                    # Some clients may return str
-                    data = blob.encode("utf-8")
-                with open(local_path, "wb") as f:
-                    f.write(data)
-                logger.info(f"  - Downloaded {filename}")
-            except Exception as e:
-                logger.warning(f"  - Skipped {filename}: {e}")
-
-    logger.info("Migration completed. Local snapshots available in 'data/snapshots/'.")
+        raise SystemExit(f"Failed to migrate bucket '{bucket}': {e}")
 
-
-if __name__ == "__main__":
-    main()
+    logger.info(f"Migration completed: {progress.summary()}")
+    logger.info(f"Local snapshots available in '{snapshots_path}'.")
+    return 1 if progress.failed else 0
 
 
+if __name__ == "__main__":
+    sys.exit(main())
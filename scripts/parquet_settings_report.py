@@ -0,0 +1,107 @@
+"""Recodifica as tabelas de um snapshot com várias opções de Parquet e compara.
+
+Para cada combinação de codec, dictionary encoding e row group, grava cada
+tabela em memória e mede tamanho, tempo de escrita e tempo de leitura
+(mediana de algumas repetições). O tamanho é o que vai para o disco e para
+o upload no Supabase. O resultado ajuda a escolher os valores de
+PARQUET_COMPRESSION, PARQUET_COMPRESSION_LEVEL, PARQUET_DICTIONARY_COLUMNS e
+PARQUET_ROW_GROUP_SIZE.
+
+    python scripts/parquet_settings_report.py                   # último snapshot
+    python scripts/parquet_settings_report.py --snapshot snapshot_2025-06-23_14-30-00 --output report.csv
+"""
+import argparse
+import io
+import itertools
+import logging
+import statistics
+import sys
+import time
+
+import pandas as pd
+from dotenv import load_dotenv
+
+try:
+    from src.datalake import DataLake, SNAPSHOT_TABLES, parquet_write_options
+except Exception as e:
+    print(f"Failed to import project modules: {e}", file=sys.stderr)
+    sys.exit(1)
+
+# (codec, nível)
+CODECS = [('none', None), ('snappy', None), ('lz4', None), ('zstd', 1), ('zstd', 3), ('zstd', 9), ('gzip', 6)]
+# Colunas repetitivas; message/sha/url quase não se repetem
+DICTIONARY_MODES = ['all', 'none', 'repo_name,author,email,state']
+ROW_GROUP_SIZES = [None, 10000]
+
+
+def measure(df: pd.DataFrame, options: dict, repeats: int) -> dict:
+    write_times, read_times = [], []
+    payload = b''
+    for _ in range(repeats):
+        buffer = io.BytesIO()
+        start = time.perf_counter()
+        df.to_parquet(buffer, index=False, **options)
+        write_times.append(time.perf_counter() - start)
+        payload = buffer.getvalue()
+
+        start = time.perf_counter()
+        pd.read_parquet(io.BytesIO(payload))
+        read_times.append(time.perf_counter() - start)
+    return {
+        'size_kb': len(payload) / 1024,
+        'write_ms': statistics.median(write_times) * 1000,
+        'read_ms': statistics.median(read_times) * 1000,
+    }
+
+
+def main() -> int:
+    load_dotenv(override=True)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--snapshot', help="Snapshot de amostra (padrão: o mais recente)")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help="Salva o relatório completo (.csv ou .parquet)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    datalake = DataLake()
+    snapshot_id = args.snapshot or datalake.get_latest_snapshot()
+    if not snapshot_id:
+        print("No snapshot available", file=sys.stderr)
+        return 1
+
+    tables = {}
+    for table in SNAPSHOT_TABLES:
+        df = datalake._read_parquet(snapshot_id, f"{table}.parquet")
+        if df is not None and not df.empty:
+            tables[table] = df
+    print(f"Snapshot {snapshot_id}: " + ', '.join(f"{t}={len(df)} rows" for t, df in tables.items()))
+
+    rows = []
+    for (codec, level), dictionary, row_group in itertools.product(CODECS, DICTIONARY_MODES, ROW_GROUP_SIZES):
+        options = parquet_write_options(codec, level, dictionary, row_group)
+        total = {'size_kb': 0.0, 'write_ms': 0.0, 'read_ms': 0.0}
+        for table, df in tables.items():
+            result = measure(df, options, args.repeats)
+            rows.append({'table': table, 'codec': codec, 'level': level, 'dictionary': dictionary,
+                         'row_group_size': row_group, **result})
+            for key in total:
+                total[key] += result[key]
+        rows.append({'table': 'TOTAL', 'codec': codec, 'level': level, 'dictionary': dictionary,
+                     'row_group_size': row_group, **total})
+
+    report = pd.DataFrame(rows).astype({'level': 'Int64', 'row_group_size': 'Int64'})
+    totals = report[report['table'] == 'TOTAL'].drop(columns='table').sort_values('size_kb')
+    pd.set_option('display.width', 160)
+    print(totals.to_string(index=False, float_format=lambda v: f"{v:.1f}"))
+
+    if args.output:
+        if args.output.endswith('.parquet'):
+            report.to_parquet(args.output, index=False)
+        else:
+            report.to_csv(args.output, index=False)
+        print(f"Report saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+import logging
+import sys
+from dotenv import load_dotenv
+
+try:
+    from src.datalake import DataLake
+except Exception as e:
+    print(f"Failed to import project modules: {e}", file=sys.stderr)
+    sys.exit(1)
+
+
+def main() -> int:
+    load_dotenv(override=True)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    logger = logging.getLogger("rebuild_series")
+
+    try:
+        count = DataLake().rebuild_series()
+        logger.info(f"Series rebuilt from {count} snapshots")
+        return 0
+    except Exception as e:
+        logger.exception(f"Series rebuild failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Relatórios de janela (abas 2 e 3 do dashboard) para várias janelas de uma vez.
+
+Cada janela é `nome=início/fim` (datas sem fuso são UTC, fim inclusivo) ou
+vem de um CSV com as colunas name,start,end. As contagens de todas as
+janelas saem de uma única passada vetorizada sobre o snapshot.
+
+    python scripts/window_report.py \\
+        --window "sprint1=2025-05-05 00:00:00/2025-05-17 03:15:00" \\
+        --window "sprint2=2025-05-19 00:00:00/2025-05-31 03:15:00" \\
+        --output-dir reports --format parquet
+    python scripts/window_report.py --windows-file janelas.csv --type INTERNO
+    python scripts/window_report.py --windows-file janelas.csv --batch-size 100000   # snapshots grandes
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+import pandas as pd
+from dotenv import load_dotenv
+
+try:
+    from src.datalake import DataLake
+    from src.window_report import Window, WindowReportEngine, streaming_window_reports
+except Exception as e:
+    print(f"Failed to import project modules: {e}", file=sys.stderr)
+    sys.exit(1)
+
+
+def load_windows(args) -> list:
+    windows = [Window.parse(spec) for spec in args.window or []]
+    if args.windows_file:
+        df = pd.read_csv(args.windows_file)
+        windows += [Window.from_values(row['name'], row['start'], row['end']) for row in df.to_dict('records')]
+    return windows
+
+
+def main() -> int:
+    load_dotenv(override=True)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--snapshot', help="Snapshot a usar (padrão: o mais recente)")
+    parser.add_argument('--window', action='append', help="nome=início/fim (pode repetir)")
+    parser.add_argument('--windows-file', help="CSV com colunas name,start,end")
+    parser.add_argument('--type', default='Todos', choices=['Todos', 'INTERNO', 'PUBLICO'])
+    parser.add_argument('--exclude-author', action='append',
+                        help="Autor a ignorar (pode repetir; padrão: EXCLUDED_AUTHORS)")
+    parser.add_argument('--batch-size', type=int,
+                        help="Lê o snapshot em lotes desse tamanho (memória limitada) em vez de carregá-lo inteiro")
+    parser.add_argument('--output-dir', default='.')
+    parser.add_argument('--format', default='csv', choices=['csv', 'parquet'])
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    logger = logging.getLogger("window_report")
+
+    windows = load_windows(args)
+    if not windows:
+        parser.error("at least one --window or --windows-file is required")
+
+    datalake = DataLake()
+    snapshot_id = args.snapshot or datalake.get_latest_snapshot()
+    if not snapshot_id:
+        logger.error("No snapshot available")
+        return 1
+    if args.batch_size:
+        streaming = streaming_window_reports(datalake, snapshot_id, windows, args.type,
+                                             args.exclude_author, args.batch_size)
+        reports = streaming.reports()
+        reports['counts'] = streaming.counts()
+    else:
+        commits = datalake._read_parquet(snapshot_id, 'commits.parquet', columns=['repo_name', 'author', 'date'])
+        engine = WindowReportEngine(commits, args.type, args.exclude_author)
+        reports = engine.reports(windows)
+        reports['counts'] = engine.counts(windows).drop(columns=['_after_from', '_after_to'])
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name, df in reports.items():
+        path = output_dir / f"{name}.{args.format}"
+        if args.format == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+        logger.info(f"{name}: {len(df)} rows -> {path}")
+
+    summary = reports['counts'].groupby('window', sort=False).agg(
+        repos=('repo_name', 'size'),
+        sem_commits=('commits_in_window', lambda c: int((c == 0).sum())),
+    )
+    logger.info(f"Snapshot {snapshot_id}, {len(windows)} windows:\n{summary.to_string()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
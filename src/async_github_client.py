@@ -0,0 +1,452 @@
+import asyncio
+import importlib.util
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+from github import GithubException, RateLimitExceededException
+
+from .config import Config
+from .concurrency import AdaptiveConcurrency, route_of
+from .exceptions import CircuitBreakerError
+from .github_client import GitHubClient, _as_utc
+from .models import Commit, PullRequest
+from .token_pool import TokenPool, TokenState
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = 15
+_LINK = re.compile(r'<([^>]+)>;\s*rel="(\w+)"')
+
+
+def _iso(value: Optional[str]) -> Optional[str]:
+    """Mesmo formato que o PyGithub produz (datetime com fuso -> isoformat)"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).isoformat() if value else None
+
+
+def _links(response: httpx.Response) -> Dict[str, str]:
+    return {rel: url for url, rel in _LINK.findall(response.headers.get('link', ''))}
+
+
+def _page_number(url: str) -> int:
+    return int(parse_qs(urlparse(url).query).get('page', ['1'])[0])
+
+
+class AsyncGitHubClient(GitHubClient):
+    """Coletor REST em asyncio (httpx) com a mesma interface e os mesmos modelos do GitHubClient.
+
+    Um event loop em thread própria atende todas as threads do DataCollector
+    com um único pool de conexões keep-alive (HTTP/2 quando o pacote `h2`
+    está instalado). Páginas de uma listagem são buscadas em paralelo a
+    partir do Link rel="last", e os detalhes de cada PR (PR completo,
+    commits e e-mail do autor) saem juntos em vez de um atributo preguiçoso
+    por vez. As vagas vêm do mesmo AdaptiveConcurrency do PyGithub.
+    """
+
+    def __init__(self, pool: TokenPool, concurrency: AdaptiveConcurrency = None, base_url: str = None):
+        super().__init__(pool=pool, concurrency=concurrency)
+        self.base_url = (base_url or Config.GITHUB_API_URL).rstrip('/')
+        self.http2 = Config.COLLECTOR_HTTP2 and importlib.util.find_spec('h2') is not None
+        if Config.COLLECTOR_HTTP2 and not self.http2:
+            logger.info("Package h2 not installed, async collector using HTTP/1.1 keep-alive")
+        self._http: Optional[httpx.AsyncClient] = None
+        # E-mail por login: o mesmo autor aparece em vários PRs (e repositórios)
+        self._user_emails: Dict[str, asyncio.Task] = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='github-async', daemon=True)
+        self._thread.start()
+
+    def _run(self, coroutine: Awaitable):
+        """Executa a corrotina no loop do cliente e espera o resultado (chamado das threads do coletor)"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def close(self):
+        async def _close():
+            if self._http is not None:
+                await self._http.aclose()
+        self._run(_close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    # --- HTTP ----------------------------------------------------------------
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            limits = httpx.Limits(max_connections=max(Config.COLLECTOR_MAX_CONCURRENCY, 1),
+                                  max_keepalive_connections=max(Config.COLLECTOR_MAX_CONCURRENCY, 1))
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url, http2=self.http2, limits=limits, timeout=REQUEST_TIMEOUT,
+                headers={'Accept': 'application/vnd.github+json', 'User-Agent': 'egonsystem'},
+            )
+        return self._http
+
+    async def _authorization(self, token: TokenState) -> str:
+        # O token de instalação do GitHub App é renovado pelo PyGithub com uma chamada bloqueante
+        value = await asyncio.to_thread(lambda: token.auth.token)
+        return f"{token.auth.token_type} {value}"
+
+    async def _wait_for_reset(self):
+        wait_seconds = self.pool.seconds_until_reset()
+        if wait_seconds is None or self.check_should_stop():
+            raise RateLimitExceededException(403, {'message': 'All GitHub credentials exhausted'}, None)
+        logger.warning(f"All GitHub credentials exhausted, waiting {wait_seconds:.0f}s for reset")
+        await asyncio.sleep(min(wait_seconds, 3600) + 1)
+
+    async def _request(self, url: str, params: Optional[dict] = None) -> httpx.Response:
+        """GET com failover de token, backoff do AdaptiveConcurrency e erros como GithubException"""
+        attempts = Config.COLLECTOR_MAX_RETRIES + 1
+        attempt = 0
+        while True:
+            if not self.pool.available():
+                await self._wait_for_reset()
+            token = self.pool.acquire()
+            authorization = await self._authorization(token)
+            async with self.concurrency.async_slot():
+                start = time.monotonic()
+                response = await self._client().get(url, params=params, headers={'Authorization': authorization})
+                latency = time.monotonic() - start
+            headers = {key.lower(): value for key, value in response.headers.items()}
+            self.pool.update(token, headers)
+            status = response.status_code
+            if status in (403, 429) and headers.get('x-ratelimit-remaining') == '0':
+                # Orçamento do token esgotado: a próxima volta usa outro token ou espera o reset
+                logger.warning(f"GitHub credential {token.name} exhausted until {token.reset_time}")
+                continue
+            attempt += 1
+            body = response.text if status in (403, 429) else ''
+            retry = self.concurrency.record(status, latency, headers, body, route_of(response.url.path))
+            if retry and attempt < attempts:
+                continue
+            if status >= 400:
+                try:
+                    data = response.json()
+                except ValueError:
+                    data = {'message': response.text}
+                raise GithubException(status, data, headers)
+            return response
+
+    async def _get_page(self, url: str, params: dict) -> list:
+        if self.check_should_stop():
+            return []
+        return (await self._request(url, params)).json()
+
+    async def _list(self, url: str, params: dict,
+                    stop_when: Optional[Callable[[dict], bool]] = None) -> List[dict]:
+        """Todos os itens de uma listagem paginada.
+
+        Com o Link rel="last" as páginas restantes são pedidas juntas; com
+        `stop_when` (listagem incremental) elas seguem em ordem até o primeiro
+        item que satisfaz a condição.
+        """
+        params = {**params, 'per_page': Config.GITHUB_PAGE_SIZE}
+        first = await self._request(url, params)
+        items = first.json()
+        links = _links(first)
+        if stop_when is None and 'last' in links:
+            pages = await asyncio.gather(*(self._get_page(url, {**params, 'page': page})
+                                           for page in range(2, _page_number(links['last']) + 1)))
+            return items + [item for page in pages for item in page]
+
+        next_url = links.get('next')
+        while next_url and not self.check_should_stop():
+            if stop_when is not None and any(stop_when(item) for item in items):
+                break
+            response = await self._request(next_url)
+            items.extend(response.json())
+            next_url = _links(response).get('next')
+        return items
+
+    # --- Repositório e commits -------------------------------------------------
+
+    async def _repository_state(self, repo_name: str) -> dict:
+        repo = (await self._request(f"/repos/{repo_name}")).json()
+        head_sha = None
+        try:
+            branch = await self._request(f"/repos/{repo_name}/branches/{repo['default_branch']}")
+            head_sha = (branch.json().get('commit') or {}).get('sha')
+        except GithubException as e:
+            # Repositório vazio não tem branch padrão
+            logger.info(f"Could not read head of {repo_name}/{repo['default_branch']}: {e.status}")
+        return {
+            'pushed_at': _iso(repo.get('pushed_at')),
+            'updated_at': _iso(repo.get('updated_at')),
+            'default_branch': repo['default_branch'],
+            'head_sha': head_sha,
+        }
+
+    def get_repository_state(self, repo_name: str) -> Optional[dict]:
+        if self.check_should_stop():
+            return None
+        try:
+            state = self._run(self._repository_state(repo_name))
+            self._record_success()
+            return state
+        except GithubException as e:
+            if e.status == 404:
+                logger.info(f"Repository {repo_name} not found or not accessible (404)")
+                return None  # 404 não é considerado falha do circuit breaker
+            self._record_failure(e)
+            logger.error(f"Error accessing repository {repo_name}: {e}")
+            return None
+        except CircuitBreakerError:
+            raise
+        except Exception as e:
+            self._record_failure(e)
+            logger.error(f"Unexpected error accessing repository {repo_name}: {e}")
+            return None
+
+    @staticmethod
+    def _commit_model(item: dict, repo_name: str) -> Commit:
+        author = item['commit'].get('author') or {}
+        return Commit(
+            sha=item['sha'],
+            message=item['commit']['message'],
+            author=author.get('name') or '',
+            email=author.get('email') or '',
+            date=_iso(author.get('date')),
+            url=item['html_url'],
+            repo_name=repo_name
+        )
+
+    def get_commits_from_repo(self, repo_name: str) -> List[Commit]:
+        if self.check_should_stop():
+            self._mark_incomplete(repo_name)
+            return []
+        try:
+            items = self._run(self._list(f"/repos/{repo_name}/commits", {}))
+        except GithubException as e:
+            # 409: repositório vazio
+            if e.status == 409 or 'Git Repository is empty' in str(e):
+                logger.warning(f"Repository {repo_name} is empty")
+            else:
+                logger.error(f"Error fetching commits from {repo_name}: {e}")
+                self._mark_incomplete(repo_name)
+            return []
+        if self.check_should_stop():
+            # Páginas pedidas depois da parada voltam vazias
+            self._mark_incomplete(repo_name)
+
+        commits, seen = [], set()
+        for item in items:
+            if item['sha'] in seen:
+                continue
+            try:
+                commits.append(self._commit_model(item, repo_name))
+                seen.add(item['sha'])
+            except Exception as e:
+                logger.warning(f"Error processing commit {item.get('sha')} from {repo_name}: {e}")
+                self._mark_incomplete(repo_name)
+        return commits
+
+    async def _commit_detail(self, repo_name: str, sha: str) -> Optional[dict]:
+        if self.check_should_stop():
+            return None
+        try:
+            data = (await self._request(f"/repos/{repo_name}/commits/{sha}")).json()
+        except GithubException as e:
+            if e.status in (404, 422):
+                logger.info(f"Commit {sha} not available in {repo_name} ({e.status})")
+                return None
+            raise
+        files = [f['filename'] for f in data.get('files') or []]
+        stats = data.get('stats') or {}
+        return {
+            'additions': stats.get('additions', 0),
+            'deletions': stats.get('deletions', 0),
+            'changed_files': len(files),
+            'files': files
+        }
+
+    def get_commit_details(self, repo_name: str, shas: List[str]) -> Dict[str, dict]:
+        """Busca additions, deletions e arquivos alterados de cada SHA (todos os SHAs em paralelo)"""
+        if self.check_should_stop():
+            return {}
+
+        async def _gather():
+            return await asyncio.gather(*(self._commit_detail(repo_name, sha) for sha in shas),
+                                        return_exceptions=True)
+
+        details = {}
+        for sha, result in zip(shas, self._run(_gather())):
+            if isinstance(result, Exception):
+                self._record_failure(result)
+                logger.error(f"Error fetching commit {sha} from {repo_name}: {result}")
+            elif result is not None:
+                details[sha] = result
+                self._record_success()
+        return details
+
+    # --- Pull requests ---------------------------------------------------------
+
+    async def _fetch_user_email(self, login: str) -> str:
+        return (await self._request(f"/users/{login}")).json().get('email') or ''
+
+    async def _user_email(self, login: str) -> str:
+        task = self._user_emails.get(login)
+        if task is None:
+            task = self._user_emails[login] = asyncio.ensure_future(self._fetch_user_email(login))
+        try:
+            return await task
+        except Exception:
+            # Falha não fica em cache: o próximo PR do autor tenta de novo
+            self._user_emails.pop(login, None)
+            raise
+
+    async def _pull_request_commits(self, repo_name: str, number: int,
+                                    collected_shas: List[str]) -> Tuple[List[str], Optional[List[str]]]:
+        """(lista limitada da coluna `commits`, lista completa ou None se a chamada falhar)"""
+        # Mesmos limites do GitHubClient: 10 commits com cache de commits do repositório, 5 sem
+        limit = 10 if collected_shas else 5
+        try:
+            items = await self._list(f"/repos/{repo_name}/pulls/{number}/commits", {})
+            commit_shas = [item['sha'] for item in items]
+            return commit_shas[:limit], commit_shas
+        except RateLimitExceededException:
+            raise
+        except Exception:
+            return collected_shas[:10], None
+
+    async def _build_pull_request(self, item: dict, repo_name: str, collected_shas: List[str]) -> PullRequest:
+        """PR completo, commits e e-mail do autor em paralelo"""
+        number = item['number']
+        detail, email, (pr_commits, commit_shas) = await asyncio.gather(
+            self._request(f"/repos/{repo_name}/pulls/{number}"),
+            self._user_email(item['user']['login']),
+            self._pull_request_commits(repo_name, number, collected_shas),
+        )
+        detail = detail.json()
+        return PullRequest(
+            number=str(number),
+            title=detail['title'],
+            author=detail['user']['login'],
+            email=email,
+            created_at=_iso(detail.get('created_at')),
+            state=detail['state'],
+            comments=str(detail.get('comments', 0)),
+            review_comments=str(detail.get('review_comments', 0)),
+            commits=str(pr_commits),
+            url=detail['html_url'],
+            repo_name=repo_name,
+            updated_at=_iso(detail.get('updated_at')),
+            commit_shas=commit_shas
+        )
+
+    async def _build_pull_requests(self, items: List[dict], repo_name: str,
+                                   collected_shas: List[str]) -> Dict[str, PullRequest]:
+        results = await asyncio.gather(*(self._build_pull_request(item, repo_name, collected_shas)
+                                         for item in items), return_exceptions=True)
+        built = {}
+        for item, result in zip(items, results):
+            if isinstance(result, (RateLimitExceededException, CircuitBreakerError)):
+                raise result
+            if isinstance(result, Exception):
+                logger.warning(f"Error processing PR #{item['number']} from {repo_name}: {result}")
+                self._mark_incomplete(repo_name)
+                continue
+            built[result.number] = result
+        return built
+
+    async def _pull_requests(self, repo_name: str, collected_shas: List[str],
+                             known: Dict[str, PullRequest], since: Optional[datetime]) -> List[PullRequest]:
+        url = f"/repos/{repo_name}/pulls"
+        if since is None:
+            items = await self._list(url, {'state': 'all', 'sort': 'created', 'direction': 'desc'})
+        else:
+            # Lista ordenada por atualização: a partir do primeiro PR mais antigo, o resto já está no snapshot
+            def is_stale(item):
+                return bool(item.get('updated_at')) and _as_utc(datetime.fromisoformat(_iso(item['updated_at']))) < since
+            items = await self._list(url, {'state': 'all', 'sort': 'updated', 'direction': 'desc'}, stop_when=is_stale)
+            cut = next((i for i, item in enumerate(items) if is_stale(item)), len(items))
+            items = items[:cut]
+
+        refreshed, to_build = {}, []
+        for item in items:
+            number = str(item['number'])
+            previous = known.get(number)
+            if previous and previous.updated_at == _iso(item.get('updated_at')):
+                refreshed[number] = previous
+            else:
+                refreshed[number] = None
+                to_build.append(item)
+        refreshed.update(await self._build_pull_requests(to_build, repo_name, collected_shas))
+        refreshed = {number: pr for number, pr in refreshed.items() if pr is not None}
+
+        if since is None:
+            return list(refreshed.values())
+
+        # Rechecagem dos PRs que estavam abertos e não apareceram na listagem incremental
+        stale_open = [number for number, pr in known.items() if pr.state == 'open' and number not in refreshed]
+        if stale_open and self.check_should_stop():
+            self._mark_incomplete(repo_name)
+        elif stale_open:
+            open_now = {str(item['number']): item for item in await self._list(url, {'state': 'open'})}
+            # Fora da listagem de abertos: foi fechado, busca o PR individualmente
+            closed = [number for number in stale_open if number not in open_now]
+            fetched = await asyncio.gather(*(self._request(f"{url}/{number}") for number in closed),
+                                           return_exceptions=True)
+            for number, response in zip(closed, fetched):
+                if isinstance(response, Exception):
+                    logger.warning(f"Error re-checking open PR #{number} from {repo_name}: {response}")
+                    self._mark_incomplete(repo_name)
+                else:
+                    open_now[number] = response.json()
+            changed = []
+            for number in stale_open:
+                item = open_now.get(number)
+                if item is None:
+                    continue
+                if known[number].updated_at == _iso(item.get('updated_at')):
+                    refreshed[number] = known[number]
+                else:
+                    changed.append(item)
+            refreshed.update(await self._build_pull_requests(changed, repo_name, collected_shas))
+        logger.info(f"Incremental PRs for {repo_name}: {len(refreshed)} refreshed, "
+                    f"{len(set(known) - set(refreshed))} carried forward")
+
+        # PRs fechados são imutáveis: mantidos como no snapshot anterior
+        merged = {**known, **refreshed}
+        return sorted(merged.values(), key=lambda pr: int(pr.number), reverse=True)
+
+    def get_pull_requests_from_repo(self, repo_name: str, collected_commits: List[Commit] = None,
+                                    known_prs: List[PullRequest] = None) -> List[PullRequest]:
+        """Coleta os PRs do repositório (incremental com `known_prs`, como no GitHubClient)"""
+        known = {pr.number: pr for pr in known_prs or []}
+        if self.check_should_stop():
+            self._mark_incomplete(repo_name)
+            return []
+
+        since = None
+        if known and all(pr.updated_at for pr in known.values()):
+            since = max(_as_utc(datetime.fromisoformat(pr.updated_at)) for pr in known.values())
+
+        collected_shas = [commit.sha for commit in collected_commits or []]
+        try:
+            pull_requests = self._run(self._pull_requests(repo_name, collected_shas, known, since))
+        except GithubException as e:
+            if e.status == 409 or 'Git Repository is empty' in str(e):
+                logger.warning(f"Repository {repo_name} is empty")
+            else:
+                logger.error(f"Error fetching pull requests from {repo_name}: {e}")
+                self._mark_incomplete(repo_name)
+            return list(known.values()) if since is not None else []
+        if self.check_should_stop():
+            self._mark_incomplete(repo_name)
+        return pull_requests
+
+    def get_rate_limit_info(self) -> dict:
+        """Estado do pool a partir dos cabeçalhos das respostas (sem consultar o PyGithub)"""
+        best = max(self.pool.tokens, key=lambda t: t.budget())
+        remaining = best.budget()
+        limit = best.limit or 5000
+        return {
+            'remaining': remaining,
+            'limit': limit,
+            'reset_time': best.reset_time,
+            'used': limit - remaining,
+            'tokens': self.pool.status()
+        }
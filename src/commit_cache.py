@@ -0,0 +1,111 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# Limite de variáveis por consulta do SQLite
+_QUERY_CHUNK = 500
+
+
+class CommitDetailCache:
+    """Cache persistente de estatísticas por SHA (additions, deletions, arquivos).
+
+    O conteúdo de um commit nunca muda depois que o SHA existe, então cada
+    SHA é buscado na API uma única vez e reaproveitado por todas as execuções
+    seguintes. O tamanho é limitado descartando os SHAs acessados há mais tempo.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None):
+        self.path = Path(path or Config.COMMIT_DETAILS_CACHE_PATH)
+        self.max_entries = max_entries or Config.COMMIT_DETAILS_CACHE_MAX_ENTRIES
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS commit_details (
+                sha TEXT PRIMARY KEY,
+                additions INTEGER,
+                deletions INTEGER,
+                changed_files INTEGER,
+                files TEXT,
+                last_access REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON commit_details(last_access)")
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM commit_details").fetchone()[0]
+
+    def get_many(self, shas: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Retorna os SHAs presentes no cache e atualiza o último acesso"""
+        shas = list(dict.fromkeys(shas))
+        found = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(shas), _QUERY_CHUNK):
+                chunk = shas[start:start + _QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT sha, additions, deletions, changed_files, files "
+                    f"FROM commit_details WHERE sha IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                for sha, additions, deletions, changed_files, files in rows:
+                    found[sha] = {
+                        'additions': additions,
+                        'deletions': deletions,
+                        'changed_files': changed_files,
+                        'files': json.loads(files) if files else [],
+                    }
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE commit_details SET last_access = ? WHERE sha IN ({placeholders})",
+                        [now] + chunk
+                    )
+            self._conn.commit()
+        return found
+
+    def put_many(self, details: Dict[str, Dict[str, Any]]):
+        if not details:
+            return
+        now = time.time()
+        rows = [
+            (sha, d.get('additions'), d.get('deletions'), d.get('changed_files'),
+             json.dumps(d.get('files') or []), now)
+            for sha, d in details.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO commit_details "
+                "(sha, additions, deletions, changed_files, files, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM commit_details").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM commit_details WHERE sha IN "
+                "(SELECT sha FROM commit_details ORDER BY last_access LIMIT ?)",
+                (excess,)
+            )
+            logger.info(f"Evicted {excess} entries from commit detail cache")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+
+from github.Requester import (HTTPRequestsConnectionClass, HTTPSRequestsConnectionClass, Requester,
+                              RequestsResponse)
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# Trecho da mensagem de 403 do limite secundário ("You have exceeded a secondary rate limit")
+SECONDARY_LIMIT_MESSAGE = 'secondary rate limit'
+# Intervalo de nova tentativa de vaga no asyncio (o Condition do threading não pode ser aguardado no loop)
+ASYNC_SLOT_POLL = 0.01
+# Repositório, usuário, ids numéricos e SHAs viram marcadores (/repos/:repo/pulls/:id)
+_ROUTE_PATTERNS = [
+    (re.compile(r'/repos/[^/]+/[^/]+'), '/repos/:repo'),
+    (re.compile(r'/users/[^/]+'), '/users/:login'),
+    (re.compile(r'/(?:[0-9a-f]{40}|\d+)(?=/|$)'), '/:id'),
+]
+
+
+class AdaptiveConcurrency:
+    """Controle AIMD do número de requisições simultâneas ao GitHub.
+
+    Respostas saudáveis (latência até `latency_tolerance` vezes a melhor
+    observada na mesma rota, já que /rate_limit e uma listagem de 100 commits
+    têm custos muito diferentes) aumentam o limite em 1 a cada
+    `increase_interval` segundos; latência acima disso, limite secundário
+    (403/429) ou 5xx multiplicam o limite por `decrease_factor`, uma vez por
+    leva de requisições (as que já estavam em andamento na redução não reduzem
+    de novo). Limite secundário e 5xx também suspendem novas requisições até o
+    Retry-After (ou backoff exponencial sem ele).
+    """
+
+    def __init__(self, min_limit: int = 1, max_limit: int = 8, initial: Optional[int] = None,
+                 latency_tolerance: float = 2.0, decrease_factor: float = 0.5,
+                 secondary_limit_wait: float = 60.0, max_backoff: float = 300.0, increase_interval: float = 1.0):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial or self.min_limit, self.min_limit), self.max_limit))
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.secondary_limit_wait = secondary_limit_wait
+        self.max_backoff = max_backoff
+        self.increase_interval = increase_interval
+
+        self.in_flight = 0
+        self.backoff_until = 0.0
+        # Por rota: média móvel e melhor latência
+        self.latency_ewma: Dict[str, float] = {}
+        self.best_latency: Dict[str, float] = {}
+        self.requests = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self._consecutive_errors = 0
+        self._last_decrease = 0.0
+        self._last_increase = 0.0
+        self._condition = threading.Condition()
+
+    @classmethod
+    def from_config(cls) -> 'AdaptiveConcurrency':
+        return cls(
+            min_limit=Config.COLLECTOR_MIN_CONCURRENCY,
+            max_limit=Config.COLLECTOR_MAX_CONCURRENCY,
+            initial=Config.COLLECTOR_INITIAL_CONCURRENCY,
+            latency_tolerance=Config.COLLECTOR_LATENCY_TOLERANCE,
+            decrease_factor=Config.COLLECTOR_DECREASE_FACTOR,
+            secondary_limit_wait=Config.SECONDARY_LIMIT_DEFAULT_WAIT,
+        )
+
+    def _try_acquire(self) -> Optional[float]:
+        """Ocupa uma vaga (None) ou devolve quanto falta de backoff (0 = sem vaga livre)"""
+        wait = self.backoff_until - time.monotonic()
+        if wait <= 0 and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return None
+        return max(wait, 0.0)
+
+    def _release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Espera vaga (e o fim do backoff) antes de uma requisição"""
+        with self._condition:
+            while (wait := self._try_acquire()) is not None:
+                self._condition.wait(timeout=wait or None)
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """Mesmo que `slot`, sem bloquear o event loop (vagas compartilhadas com as threads)"""
+        while True:
+            with self._condition:
+                wait = self._try_acquire()
+            if wait is None:
+                break
+            await asyncio.sleep(wait or ASYNC_SLOT_POLL)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def record(self, status: int, latency: float, headers: Dict[str, str], body: str = '', route: str = '') -> bool:
+        """Ajusta o limite pela resposta; True se a requisição deve ser repetida após o backoff"""
+        now = time.monotonic()
+        started = now - latency
+        with self._condition:
+            self.requests += 1
+            if is_secondary_limit(status, headers, body):
+                self.throttled += 1
+                self._consecutive_errors += 1
+                self._decrease(now, started)
+                wait = _retry_after(headers) or self.secondary_limit_wait
+                self._back_off(now, wait, f"Secondary rate limit ({status})")
+                return True
+            if status >= 500:
+                self.server_errors += 1
+                self._consecutive_errors += 1
+                self._decrease(now, started)
+                wait = _retry_after(headers) or min(2 ** (self._consecutive_errors - 1), self.max_backoff)
+                self._back_off(now, wait, f"Server error {status}")
+                return True
+
+            self._consecutive_errors = 0
+            ewma = self.latency_ewma.get(route)
+            ewma = self.latency_ewma[route] = latency if ewma is None else 0.8 * ewma + 0.2 * latency
+            best = self.best_latency[route] = min(self.best_latency.get(route, latency), latency)
+            if ewma > best * self.latency_tolerance:
+                self._decrease(now, started)
+            elif now - max(self._last_increase, self._last_decrease) >= self.increase_interval:
+                self._last_increase = now
+                self.limit = min(self.limit + 1, float(self.max_limit))
+            self._condition.notify_all()
+            return False
+
+    def _decrease(self, now: float, started: float):
+        # Requisição enviada antes da última redução: a leva inteira falha junto e reduziria várias vezes
+        if started < self._last_decrease:
+            return
+        self._last_decrease = now
+        self.limit = max(self.limit * self.decrease_factor, float(self.min_limit))
+        # Recomeça as médias a partir da melhor latência, senão cada resposta lenta reduz de novo
+        self.latency_ewma.update(self.best_latency)
+
+    def _back_off(self, now: float, wait: float, reason: str):
+        wait = min(wait, self.max_backoff)
+        self.backoff_until = max(self.backoff_until, now + wait)
+        logger.warning(f"{reason}: backing off {wait:.1f}s, concurrency {int(self.limit)}")
+
+    def state(self) -> dict:
+        with self._condition:
+            return {
+                'concurrency': int(self.limit),
+                'in_flight': self.in_flight,
+                'backoff_seconds': max(self.backoff_until - time.monotonic(), 0.0),
+                'latency_ms': max(self.latency_ewma.values(), default=0.0) * 1000,
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'server_errors': self.server_errors,
+            }
+
+    def describe(self) -> str:
+        """Resumo curto para o progress_callback"""
+        state = self.state()
+        text = f"concorrência {state['concurrency']} ({state['in_flight']} em andamento)"
+        if state['backoff_seconds'] > 0:
+            text += f", backoff {state['backoff_seconds']:.0f}s"
+        if state['throttled'] or state['server_errors']:
+            text += f", {state['throttled']} limites secundários, {state['server_errors']} erros 5xx"
+        return text
+
+
+def _retry_after(headers: Dict[str, str]) -> Optional[float]:
+    value = headers.get('retry-after')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def route_of(url: str) -> str:
+    route = url.split('?', 1)[0]
+    for pattern, placeholder in _ROUTE_PATTERNS:
+        route = pattern.sub(placeholder, route)
+    return route
+
+
+def is_secondary_limit(status: int, headers: Dict[str, str], body: str = '') -> bool:
+    """429, ou 403 com Retry-After / mensagem de limite secundário (403 com orçamento zerado é o limite primário)"""
+    if status == 429:
+        return True
+    if status != 403:
+        return False
+    if headers.get('x-ratelimit-remaining') == '0':
+        return False
+    return 'retry-after' in headers or SECONDARY_LIMIT_MESSAGE in body[:512].lower()
+
+
+# Controle ativo no processo; as conexões injetadas no PyGithub passam por ele
+_controller: Optional[AdaptiveConcurrency] = None
+
+
+def set_controller(controller: Optional[AdaptiveConcurrency]):
+    global _controller
+    _controller = controller
+
+
+class _ControlledConnection:
+    """Mixin das classes de conexão do PyGithub.
+
+    O Requester compartilha uma conexão entre threads e chama `request` e
+    depois `getresponse`; os parâmetros ficam por thread para que coletas em
+    paralelo não troquem requisições entre si. Limite secundário e 5xx são
+    repetidos aqui (após o backoff) até COLLECTOR_MAX_RETRIES vezes, então só
+    falhas persistentes chegam ao circuit breaker do GitHubClient.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._local = threading.local()
+
+    def request(self, verb, url, input, headers, stream=False):
+        self._local.args = (verb, url, input, headers)
+
+    def _send(self, verb, url, input, headers) -> RequestsResponse:
+        method = getattr(self.session, verb.lower())
+        return RequestsResponse(method(
+            f"{self.protocol}://{self.host}:{self.port}{url}",
+            headers=headers, data=input, timeout=self.timeout, verify=self.verify, allow_redirects=False,
+        ))
+
+    def getresponse(self) -> RequestsResponse:
+        args = self._local.args
+        controller = _controller
+        if controller is None:
+            return self._send(*args)
+        attempts = Config.COLLECTOR_MAX_RETRIES + 1
+        for attempt in range(1, attempts + 1):
+            with controller.slot():
+                start = time.monotonic()
+                response = self._send(*args)
+                latency = time.monotonic() - start
+            body = response.read() if response.status in (403, 429) else ''
+            headers = {k.lower(): v for k, v in response.getheaders()}
+            retry = controller.record(response.status, latency, headers, body, route_of(args[1]))
+            if not retry or attempt == attempts:
+                return response
+        return response
+
+
+class ControlledHTTPConnection(_ControlledConnection, HTTPRequestsConnectionClass):
+    pass
+
+
+class ControlledHTTPSConnection(_ControlledConnection, HTTPSRequestsConnectionClass):
+    pass
+
+
+def install_transport():
+    """Faz o PyGithub usar as conexões controladas (clientes criados depois desta chamada)"""
+    Requester.injectConnectionClasses(ControlledHTTPConnection, ControlledHTTPSConnection)
@@ -1,4 +1,5 @@
 import os
+import re
 from typing import List
 from dotenv import load_dotenv
 
@@ -6,14 +7,83 @@ load_dotenv(override=True)
 
 class Config:
     GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
+    # Pool de tokens (separados por vírgula); cada um tem seu próprio rate limit
+    GITHUB_TOKENS = [t.strip() for t in os.getenv('GITHUB_TOKENS', '').split(',') if t.strip()]
+    # GitHub App: cada instalação entra no pool como uma credencial
+    GITHUB_APP_ID = os.getenv('GITHUB_APP_ID')
+    GITHUB_APP_PRIVATE_KEY_PATH = os.getenv('GITHUB_APP_PRIVATE_KEY_PATH')
+    GITHUB_APP_INSTALLATION_IDS = [i.strip() for i in os.getenv('GITHUB_APP_INSTALLATION_IDS', '').split(',') if i.strip()]
+    # Permite apontar para um stand-in local da API (scripts/github_standin.py)
+    GITHUB_API_URL = os.getenv('GITHUB_API_URL', 'https://api.github.com')
     INTERNAL_REPOSITORIES = os.getenv('INTERNAL_REPOSITORIES', '').split(',') if os.getenv('INTERNAL_REPOSITORIES') else []
     PUBLIC_REPOSITORIES = os.getenv('PUBLIC_REPOSITORIES', '').split(',') if os.getenv('PUBLIC_REPOSITORIES') else []
+    # Descoberta por organização: padrões `Org/regex` (separados por espaço ou ';') casados com o nome completo
+    REPOSITORY_PATTERNS = [p for p in re.split(r'[;\s]+', os.getenv('REPOSITORY_PATTERNS', '')) if p]
+    # Listagem das organizações revalidada (com ETag) só depois desse intervalo, em segundos
+    REPOSITORY_DISCOVERY_INTERVAL = float(os.getenv('REPOSITORY_DISCOVERY_INTERVAL', '86400'))
+    # Autores ignorados nos relatórios de janela (bots, contas da coordenação)
+    EXCLUDED_AUTHORS = [a.strip() for a in os.getenv('EXCLUDED_AUTHORS', 'Inteli Hub,José Romualdo').split(',') if a.strip()]
     # Storage backend: 'local' or 'supabase'
     STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'local').lower()
     DATALAKE_PATH = os.getenv('DATALAKE_PATH', './data')
     SNAPSHOTS_PATH = os.getenv('SNAPSHOTS_PATH', './data/snapshots')
+    # Local copy of snapshots downloaded from Supabase (snapshots are immutable)
+    SNAPSHOT_CACHE_PATH = os.getenv('SNAPSHOT_CACHE_PATH', os.path.join(DATALAKE_PATH, 'cache'))
+    # Listagens das organizações (REPOSITORY_PATTERNS) com os ETags de cada página
+    REPOSITORY_DISCOVERY_CACHE_PATH = os.getenv('REPOSITORY_DISCOVERY_CACHE_PATH', os.path.join(SNAPSHOT_CACHE_PATH, 'repository_discovery.json'))
+    # Opções de escrita dos Parquet (compare com scripts/parquet_settings_report.py)
+    PARQUET_COMPRESSION = os.getenv('PARQUET_COMPRESSION', 'snappy').lower()
+    PARQUET_COMPRESSION_LEVEL = int(os.getenv('PARQUET_COMPRESSION_LEVEL')) if os.getenv('PARQUET_COMPRESSION_LEVEL') else None
+    # Colunas com dictionary encoding (separadas por vírgula); 'all' = todas, 'none' = nenhuma
+    PARQUET_DICTIONARY_COLUMNS = os.getenv('PARQUET_DICTIONARY_COLUMNS', 'all')
+    PARQUET_ROW_GROUP_SIZE = int(os.getenv('PARQUET_ROW_GROUP_SIZE')) if os.getenv('PARQUET_ROW_GROUP_SIZE') else None
+    # Linhas por lote em DataLake.iter_snapshot_batches
+    SNAPSHOT_BATCH_SIZE = int(os.getenv('SNAPSHOT_BATCH_SIZE', '65536'))
+    # Cópia Arrow IPC sem compressão das tabelas, lida com memory map (local ou no cache do Supabase)
+    SNAPSHOT_ARROW_IPC = os.getenv('SNAPSHOT_ARROW_IPC', 'false').lower() == 'true'
+    # Dashboard: snapshots decodificados mantidos em memória e pré-carga de snapshots novos
+    SNAPSHOT_MEMORY_CACHE_SIZE = int(os.getenv('SNAPSHOT_MEMORY_CACHE_SIZE', '2'))
+    SNAPSHOT_WATCH_ENABLED = os.getenv('SNAPSHOT_WATCH_ENABLED', 'true').lower() == 'true'
+    SNAPSHOT_WATCH_INTERVAL = float(os.getenv('SNAPSHOT_WATCH_INTERVAL', '15'))
+    # Resultados derivados do dashboard (por snapshot, tipo, janela e autores excluídos) em cache entre sessões
+    DASHBOARD_CACHE_MAX_ENTRIES = int(os.getenv('DASHBOARD_CACHE_MAX_ENTRIES', '64'))
+    DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', '3600'))
     APP_NAME = os.getenv('APP_NAME', 'FourSystem')
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    # Reaproveita os dados do último snapshot para repositórios sem push desde então
+    SKIP_UNCHANGED_REPOS = os.getenv('SKIP_UNCHANGED_REPOS', 'true').lower() == 'true'
+    # PRs: busca só os atualizados desde o último snapshot e recheca os abertos
+    INCREMENTAL_PULL_REQUESTS = os.getenv('INCREMENTAL_PULL_REQUESTS', 'true').lower() == 'true'
+    # Estatísticas por commit (additions/deletions/arquivos), com cache persistente por SHA
+    COMMIT_DETAILS_ENABLED = os.getenv('COMMIT_DETAILS_ENABLED', 'false').lower() == 'true'
+    COMMIT_DETAILS_CACHE_PATH = os.getenv('COMMIT_DETAILS_CACHE_PATH', os.path.join(SNAPSHOT_CACHE_PATH, 'commit_details.sqlite'))
+    COMMIT_DETAILS_CACHE_MAX_ENTRIES = int(os.getenv('COMMIT_DETAILS_CACHE_MAX_ENTRIES', '500000'))
+    COMMIT_DETAILS_BATCH_SIZE = int(os.getenv('COMMIT_DETAILS_BATCH_SIZE', '100'))
+    COMMIT_DETAILS_MAX_PER_RUN = int(os.getenv('COMMIT_DETAILS_MAX_PER_RUN', '1000'))
+    # Controle adaptativo (AIMD) de requisições simultâneas ao GitHub e repositórios coletados em paralelo
+    COLLECTOR_MIN_CONCURRENCY = int(os.getenv('COLLECTOR_MIN_CONCURRENCY', '1'))
+    COLLECTOR_MAX_CONCURRENCY = int(os.getenv('COLLECTOR_MAX_CONCURRENCY', '8'))
+    COLLECTOR_INITIAL_CONCURRENCY = int(os.getenv('COLLECTOR_INITIAL_CONCURRENCY', '2'))
+    # Latência média acima de N vezes a melhor observada reduz a concorrência
+    COLLECTOR_LATENCY_TOLERANCE = float(os.getenv('COLLECTOR_LATENCY_TOLERANCE', '2.0'))
+    COLLECTOR_DECREASE_FACTOR = float(os.getenv('COLLECTOR_DECREASE_FACTOR', '0.5'))
+    # Tentativas extras após limite secundário (403/429) ou 5xx antes de contar como falha
+    COLLECTOR_MAX_RETRIES = int(os.getenv('COLLECTOR_MAX_RETRIES', '4'))
+    # Espera quando o limite secundário vem sem Retry-After (o GitHub pede ao menos um minuto)
+    SECONDARY_LIMIT_DEFAULT_WAIT = float(os.getenv('SECONDARY_LIMIT_DEFAULT_WAIT', '60'))
+    # Itens por página nas listagens da API (máximo 100)
+    GITHUB_PAGE_SIZE = min(int(os.getenv('GITHUB_PAGE_SIZE', '100')), 100)
+    # Cliente da coleta: 'pygithub' (GitHubClient) ou 'async' (AsyncGitHubClient, httpx + asyncio)
+    COLLECTOR_BACKEND = os.getenv('COLLECTOR_BACKEND', 'pygithub').lower()
+    # HTTP/2 no cliente async (requer o pacote h2; sem ele usa HTTP/1.1 keep-alive)
+    COLLECTOR_HTTP2 = os.getenv('COLLECTOR_HTTP2', 'true').lower() == 'true'
+    # Coleta em shards: cada scheduler coleta os repositórios com sha1(nome) % SHARD_COUNT == SHARD_INDEX
+    SHARD_INDEX = int(os.getenv('SHARD_INDEX', '0'))
+    SHARD_COUNT = int(os.getenv('SHARD_COUNT', '1'))
+    # Shards que terminaram dentro dessa janela (segundos) são combinados em um snapshot
+    SHARD_MERGE_WINDOW = float(os.getenv('SHARD_MERGE_WINDOW', '900'))
+    # O último shard a terminar já faz o merge (senão, scripts/merge_shards.py)
+    SHARD_AUTO_MERGE = os.getenv('SHARD_AUTO_MERGE', 'true').lower() == 'true'
 
     SUPABASE_URL = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
     SUPABASE_ANON_KEY = os.getenv('NEXT_PUBLIC_SUPABASE_ANON_KEY')
@@ -21,7 +91,12 @@ class Config:
 
     @classmethod
     def get_all_repositories(cls) -> List[str]:
-        return [repo.strip() for repo in cls.INTERNAL_REPOSITORIES + cls.PUBLIC_REPOSITORIES if repo.strip()]
+        repos = [repo.strip() for repo in cls.INTERNAL_REPOSITORIES + cls.PUBLIC_REPOSITORIES if repo.strip()]
+        if cls.REPOSITORY_PATTERNS:
+            # Só o cache da descoberta; a revalidação acontece na coleta (DataCollector.collect_all_data)
+            from .repo_discovery import RepositoryDiscovery
+            repos += RepositoryDiscovery().cached_repositories()
+        return list(dict.fromkeys(repos))
 
     @classmethod
     def validate(cls) -> bool:
@@ -30,10 +105,23 @@ class Config:
         if cls.STORAGE_BACKEND == 'supabase':
             if not cls.SUPABASE_URL or not cls.SUPABASE_ANON_KEY:
                 raise ValueError("Supabase configuration (URL and ANON_KEY) is required")
+        if cls.COLLECTOR_BACKEND not in ('pygithub', 'async'):
+            raise ValueError(f"Invalid COLLECTOR_BACKEND {cls.COLLECTOR_BACKEND!r} (use 'pygithub' or 'async')")
+        if cls.SHARD_COUNT < 1 or not 0 <= cls.SHARD_INDEX < cls.SHARD_COUNT:
+            raise ValueError(f"Invalid shard {cls.SHARD_INDEX} of {cls.SHARD_COUNT}")
         return True
 
+    @classmethod
+    def get_github_tokens(cls) -> List[str]:
+        tokens = cls.GITHUB_TOKENS + ([cls.GITHUB_TOKEN] if cls.GITHUB_TOKEN else [])
+        return list(dict.fromkeys(tokens))
+
+    @classmethod
+    def has_github_app(cls) -> bool:
+        return bool(cls.GITHUB_APP_ID and cls.GITHUB_APP_PRIVATE_KEY_PATH and cls.GITHUB_APP_INSTALLATION_IDS)
+
     @classmethod
     def validate_github_token(cls) -> bool:
-        if not cls.GITHUB_TOKEN:
-            raise ValueError("GITHUB_TOKEN is required for data collection")
+        if not cls.get_github_tokens() and not cls.has_github_app():
+            raise ValueError("GITHUB_TOKEN (or GITHUB_TOKENS / GitHub App credentials) is required for data collection")
         return True
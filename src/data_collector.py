@@ -1,87 +1,157 @@
 import logging
-from typing import List, Tuple, Callable, Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import fields
+from typing import List, Tuple, Callable, Optional, Dict
 from datetime import datetime
 
-from .github_client import GitHubClient, CircuitBreakerError
+import pandas as pd
+
+from .exceptions import CircuitBreakerError
 from .datalake import DataLake
+from .search import SearchIndex
+from .pr_links import PullRequestLinks
+from .sharding import shard_repositories
+from .commit_cache import CommitDetailCache
 from .models import Repository, Commit, PullRequest
 from .config import Config
 
 logger = logging.getLogger(__name__)
 
+# Intervalo (segundos) entre atualizações de progresso enquanto nenhum repositório termina
+PROGRESS_INTERVAL = 2.0
+
+# Campos que identificam se um repositório mudou desde o último snapshot
+REPOSITORY_STATE_FIELDS = ('pushed_at', 'updated_at', 'head_sha')
+
+
+def rows_to_models(df: Optional[pd.DataFrame], model_cls) -> list:
+    """Converte linhas de um snapshot de volta para os modelos (NaN vira None)"""
+    if df is None or df.empty:
+        return []
+    names = [f.name for f in fields(model_cls)]
+    df = df.reindex(columns=names).astype(object)
+    df = df.where(pd.notna(df), None)
+    return [model_cls(**record) for record in df.to_dict('records')]
+
+
 class DataCollector:
     def __init__(self):
         Config.validate()
         self.github_client = None
         self.datalake = DataLake()
+        self._commit_cache = None
+        # Snapshots são imutáveis: os decodificados ficam em memória (LRU) entre sessões do dashboard
+        self._snapshot_cache = OrderedDict()
+        self._snapshot_locks: Dict[str, threading.Lock] = {}
+        self._snapshot_cache_lock = threading.Lock()
+        self._search_indexes = OrderedDict()
+        self._pr_links = OrderedDict()
+        self._snapshot_watcher = None
 
     def _ensure_github_client(self):
         """Initialize GitHub client only when needed"""
         if self.github_client is None:
             Config.validate_github_token()
-            self.github_client = GitHubClient(Config.GITHUB_TOKEN)
+            # Import tardio: PyGithub só é carregado quando há coleta (o dashboard só lê snapshots)
+            from .token_pool import TokenPool
+            if Config.COLLECTOR_BACKEND == 'async':
+                from .async_github_client import AsyncGitHubClient
+                self.github_client = AsyncGitHubClient(pool=TokenPool.from_config())
+            else:
+                from .github_client import GitHubClient
+                self.github_client = GitHubClient(pool=TokenPool.from_config())
+
+    def _refresh_discovery(self):
+        """Revalida a listagem das organizações vencidas; se falhar, a coleta segue com o cache"""
+        from .repo_discovery import RepositoryDiscovery
+        try:
+            RepositoryDiscovery(self.github_client.pool).refresh()
+        except Exception as e:
+            logger.warning(f"Repository discovery failed, using cached listings: {e}")
 
     def collect_all_data(self, progress_callback: Optional[Callable[[int, int, str], None]] = None) -> str:
         logger.info("Starting data collection for all repositories")
         self._ensure_github_client()
+        # Uma parada anterior (usuário ou circuit breaker) não vale para esta coleta
+        self.github_client.should_stop.clear()
 
         repositories = []
         all_commits = []
         all_pull_requests = []
 
-        repo_names = Config.get_all_repositories()
+        if Config.REPOSITORY_PATTERNS:
+            self._refresh_discovery()
+        repo_names = shard_repositories(Config.get_all_repositories(), Config.SHARD_INDEX, Config.SHARD_COUNT)
+        if Config.SHARD_COUNT > 1:
+            logger.info(f"Shard {Config.SHARD_INDEX} of {Config.SHARD_COUNT}: {len(repo_names)} repositories")
 
-        if not repo_names:
+        if not repo_names and Config.SHARD_COUNT == 1:
             logger.warning("No repositories configured")
             return None
 
         total_repos = len(repo_names)
+        previous = None
+        if Config.SKIP_UNCHANGED_REPOS or Config.INCREMENTAL_PULL_REQUESTS:
+            previous = self._load_previous_snapshot()
 
-        for i, repo_name in enumerate(repo_names, 1):
+        concurrency = self.github_client.concurrency
+        results = {}
+        # Repositórios em paralelo; o número de requisições simultâneas é regulado pelo AdaptiveConcurrency.
+        # O progress_callback é chamado só nesta thread (o Streamlit não aceita atualizações de outras threads)
+        with ThreadPoolExecutor(max_workers=max(Config.COLLECTOR_MAX_CONCURRENCY, 1),
+                                thread_name_prefix='collector') as pool:
+            pending = {pool.submit(self._collect_repository, repo_name, previous): repo_name
+                       for repo_name in repo_names}
+            if progress_callback:
+                progress_callback(0, total_repos, f"Coletando {total_repos} repositórios | {concurrency.describe()}")
             try:
-                if progress_callback:
-                    progress_callback(i-1, total_repos, f"Processando: {repo_name}")
-
-                logger.info(f"Processing repository: {repo_name}")
-
-                # Create repository record
-                repository = Repository(
-                    repo_name=repo_name,
-                    last_updated=datetime.now().isoformat()
-                )
-                repositories.append(repository)
-
-                # Collect commits
-                commits = self.github_client.get_commits_from_repo(repo_name)
-                all_commits.extend(commits)
-                logger.info(f"Collected {len(commits)} commits from {repo_name}")
-
-                # Collect pull requests (passando commits coletados para otimizar)
-                pull_requests = self.github_client.get_pull_requests_from_repo(repo_name, commits)
-                all_pull_requests.extend(pull_requests)
-                logger.info(f"Collected {len(pull_requests)} pull requests from {repo_name}")
-
-                if progress_callback:
-                    progress_callback(i, total_repos, f"✅ {repo_name} - {len(commits)} commits, {len(pull_requests)} PRs")
-
+                while pending:
+                    done, _ = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        repo_name = pending.pop(future)
+                        results[repo_name], message = future.result()
+                        if progress_callback:
+                            progress_callback(len(results), total_repos, f"{message} | {concurrency.describe()}")
+                    if not done and progress_callback:
+                        progress_callback(len(results), total_repos,
+                                          f"Coletando {len(pending)} repositórios | {concurrency.describe()}")
             except CircuitBreakerError as e:
                 # Parar completamente a coleta - não salvar dados parciais
+                self.github_client.stop_execution()
+                pool.shutdown(wait=True, cancel_futures=True)
                 error_msg = f"🔴 Coleta interrompida: {str(e)}"
                 logger.error(error_msg)
                 if progress_callback:
-                    progress_callback(i, total_repos, error_msg)
+                    progress_callback(len(results), total_repos, error_msg)
                 raise e  # Propagar o erro para o front
-            except Exception as e:
-                logger.error(f"Error processing repository {repo_name}: {e}")
-                if progress_callback:
-                    progress_callback(i, total_repos, f"❌ Erro em {repo_name}: {str(e)}")
-                continue
+
+        # Mesma ordem da configuração, independente de qual repositório terminou antes
+        for repo_name in repo_names:
+            repository, commits, pull_requests = results[repo_name]
+            if repository is not None:
+                repositories.append(repository)
+            all_commits.extend(commits)
+            all_pull_requests.extend(pull_requests)
+
+        if Config.COMMIT_DETAILS_ENABLED:
+            self._enrich_commit_details(all_commits, progress_callback)
 
         # Create snapshot
         if progress_callback:
             backend_label = 'Supabase' if Config.STORAGE_BACKEND == 'supabase' else 'Local'
             progress_callback(total_repos, total_repos, f"Criando snapshot no {backend_label}...")
 
+        if Config.SHARD_COUNT > 1:
+            # Parcial do shard (mesmo vazio: o merge espera por todos os shards)
+            partial_id = self.datalake.write_shard_snapshot(
+                Config.SHARD_INDEX, Config.SHARD_COUNT, repositories, all_commits, all_pull_requests
+            )
+            snapshot_id = self.datalake.merge_shard_snapshots() if Config.SHARD_AUTO_MERGE else None
+            return snapshot_id or partial_id
+
         snapshot_id = self.datalake.create_snapshot(repositories, all_commits, all_pull_requests)
 
         logger.info(f"Data collection completed. Created snapshot: {snapshot_id}")
@@ -89,6 +159,154 @@ class DataCollector:
 
         return snapshot_id
 
+    def _collect_repository(self, repo_name: str, previous: Optional[Dict[str, pd.DataFrame]]):
+        """Coleta um repositório; devolve ((repository, commits, PRs), mensagem de progresso)"""
+        repository = None
+        try:
+            logger.info(f"Processing repository: {repo_name}")
+
+            # Create repository record
+            state = self.github_client.get_repository_state(repo_name) or {}
+            repository = Repository(
+                repo_name=repo_name,
+                last_updated=datetime.now().isoformat(),
+                **state
+            )
+
+            # Pré-checagem: sem push desde o último snapshot, reaproveita as linhas anteriores
+            carried = self._carry_forward(previous, repository) if Config.SKIP_UNCHANGED_REPOS else None
+            if carried is not None:
+                commits, pull_requests = carried
+                logger.info(f"Repository {repo_name} unchanged, reused {len(commits)} commits and {len(pull_requests)} PRs")
+                return (repository, commits, pull_requests), \
+                    f"⏭️ {repo_name} sem alterações - {len(commits)} commits, {len(pull_requests)} PRs"
+
+            # Collect commits
+            self.github_client.listing_incomplete(repo_name)
+            commits = self.github_client.get_commits_from_repo(repo_name)
+            logger.info(f"Collected {len(commits)} commits from {repo_name}")
+
+            # Collect pull requests (passando commits coletados para otimizar)
+            # Incremental só sobre uma listagem anterior completa: PRs que ela não trouxe e são mais
+            # antigos que o último updated_at conhecido ficariam de fora para sempre
+            known_prs = self._previous_rows(previous, 'pull_requests', repo_name, PullRequest) \
+                if Config.INCREMENTAL_PULL_REQUESTS and self._has_complete_state(previous, repo_name) else None
+            pull_requests = self.github_client.get_pull_requests_from_repo(repo_name, commits, known_prs)
+            logger.info(f"Collected {len(pull_requests)} pull requests from {repo_name}")
+
+            if self.github_client.listing_incomplete(repo_name):
+                # Sem o estado o próximo snapshot não reaproveita estas linhas e coleta o repositório de novo
+                logger.warning(f"Listings of {repo_name} incomplete, not recording repository state")
+                self._clear_state(repository)
+
+            return (repository, commits, pull_requests), \
+                f"✅ {repo_name} - {len(commits)} commits, {len(pull_requests)} PRs"
+
+        except CircuitBreakerError:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing repository {repo_name}: {e}")
+            self._clear_state(repository)
+            return (repository, [], []), f"❌ Erro em {repo_name}: {str(e)}"
+
+    @staticmethod
+    def _has_complete_state(previous: Optional[Dict[str, pd.DataFrame]], repo_name: str) -> bool:
+        """Se o snapshot anterior gravou o estado do repositório (só gravado com as listagens completas)"""
+        if previous is None or repo_name not in previous['repositories'].index:
+            return False
+        last = previous['repositories'].loc[repo_name]
+        return any(field in last and pd.notna(last[field]) for field in REPOSITORY_STATE_FIELDS)
+
+    @staticmethod
+    def _clear_state(repository: Optional[Repository]):
+        if repository is not None:
+            for field in REPOSITORY_STATE_FIELDS:
+                setattr(repository, field, None)
+
+    def _load_previous_snapshot(self) -> Optional[Dict[str, pd.DataFrame]]:
+        try:
+            snapshot_id = self.datalake.get_latest_snapshot()
+            if not snapshot_id:
+                return None
+            data = self.datalake.load_snapshot_data(snapshot_id)
+            if 'repositories' not in data:
+                return None
+            logger.info(f"Using {snapshot_id} as baseline for unchanged repositories")
+            return {
+                'repositories': data['repositories'].set_index('repo_name', drop=False),
+                'commits': data.get('commits', pd.DataFrame(columns=['repo_name'])),
+                'pull_requests': data.get('pull_requests', pd.DataFrame(columns=['repo_name'])),
+            }
+        except Exception as e:
+            logger.warning(f"Could not load previous snapshot, collecting everything: {e}")
+            return None
+
+    def _carry_forward(self, previous: Optional[Dict[str, pd.DataFrame]],
+                       repository: Repository) -> Optional[Tuple[List[Commit], List[PullRequest]]]:
+        """Linhas do snapshot anterior se o repositório não mudou; None caso contrário"""
+        if previous is None or repository.repo_name not in previous['repositories'].index:
+            return None
+
+        last = previous['repositories'].loc[repository.repo_name]
+        for field in REPOSITORY_STATE_FIELDS:
+            current = getattr(repository, field)
+            if current is None or field not in last or pd.isna(last[field]) or last[field] != current:
+                return None
+
+        return (
+            self._previous_rows(previous, 'commits', repository.repo_name, Commit),
+            self._previous_rows(previous, 'pull_requests', repository.repo_name, PullRequest),
+        )
+
+    @staticmethod
+    def _previous_rows(previous: Optional[Dict[str, pd.DataFrame]], table: str, repo_name: str, model_cls) -> list:
+        if previous is None:
+            return []
+        df = previous[table]
+        return rows_to_models(df[df['repo_name'] == repo_name], model_cls)
+
+    def _enrich_commit_details(self, commits: List[Commit],
+                               progress_callback: Optional[Callable[[int, int, str], None]] = None):
+        """Preenche additions/deletions/changed_files a partir do cache por SHA.
+
+        Apenas SHAs ausentes do cache são buscados, em lotes gravados no cache
+        à medida que chegam; o restante fica para as próximas execuções.
+        """
+        if self._commit_cache is None:
+            self._commit_cache = CommitDetailCache()
+        cache = self._commit_cache
+
+        details = cache.get_many(commit.sha for commit in commits)
+        missing = {}
+        for commit in commits:
+            if commit.sha not in details and commit.sha not in missing:
+                missing[commit.sha] = commit.repo_name
+        pending = list(missing.items())[:Config.COMMIT_DETAILS_MAX_PER_RUN]
+        logger.info(f"Commit details: {len(details)} cached, {len(missing)} missing, fetching {len(pending)}")
+
+        batch_size = Config.COMMIT_DETAILS_BATCH_SIZE
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            if progress_callback:
+                progress_callback(start, len(pending), f"Detalhes de commits: {start}/{len(pending)}")
+            by_repo: Dict[str, List[str]] = {}
+            for sha, repo_name in batch:
+                by_repo.setdefault(repo_name, []).append(sha)
+            fetched = {}
+            for repo_name, shas in by_repo.items():
+                fetched.update(self.github_client.get_commit_details(repo_name, shas))
+            cache.put_many(fetched)
+            details.update(fetched)
+            if self.github_client.check_should_stop():
+                break
+
+        for commit in commits:
+            detail = details.get(commit.sha)
+            if detail:
+                commit.additions = detail['additions']
+                commit.deletions = detail['deletions']
+                commit.changed_files = detail['changed_files']
+
     def stop_collection(self):
         """Para a coleta de dados em andamento"""
         if self.github_client:
@@ -106,5 +324,94 @@ class DataCollector:
             logger.warning("No snapshots available")
             return None
 
-        return self.datalake.load_snapshot_data(snapshot_id)
+        return self._load_snapshot_cached(snapshot_id)
+
+    def _load_snapshot_cached(self, snapshot_id: str) -> Dict[str, pd.DataFrame]:
+        with self._snapshot_cache_lock:
+            if snapshot_id in self._snapshot_cache:
+                self._snapshot_cache.move_to_end(snapshot_id)
+                return self._snapshot_cache[snapshot_id]
+            # Um lock por snapshot: quem chega durante a pré-carga espera por ela em vez de decodificar de novo
+            load_lock = self._snapshot_locks.setdefault(snapshot_id, threading.Lock())
+
+        with load_lock:
+            with self._snapshot_cache_lock:
+                if snapshot_id in self._snapshot_cache:
+                    return self._snapshot_cache[snapshot_id]
+            data = self.datalake.load_snapshot_data(snapshot_id)
+            with self._snapshot_cache_lock:
+                if data and Config.SNAPSHOT_MEMORY_CACHE_SIZE > 0:
+                    self._snapshot_cache[snapshot_id] = data
+                    while len(self._snapshot_cache) > Config.SNAPSHOT_MEMORY_CACHE_SIZE:
+                        self._snapshot_cache.popitem(last=False)
+                self._snapshot_locks.pop(snapshot_id, None)
+            return data
+
+    def prewarm_snapshot(self, snapshot_id: str):
+        """Carrega o snapshot para o cache em memória (chamado pelo SnapshotWatcher)"""
+        start = time.perf_counter()
+        data = self._load_snapshot_cached(snapshot_id)
+        rows = sum(len(df) for df in data.values()) if data else 0
+        if data:
+            self._search_index(snapshot_id)
+        logger.info(f"Prewarmed {snapshot_id} ({rows} rows) in {time.perf_counter() - start:.2f}s")
+
+    def _search_index(self, snapshot_id: str) -> SearchIndex:
+        with self._snapshot_cache_lock:
+            if snapshot_id in self._search_indexes:
+                self._search_indexes.move_to_end(snapshot_id)
+                return self._search_indexes[snapshot_id]
+        index = SearchIndex(self.datalake.load_search_index(snapshot_id))
+        with self._snapshot_cache_lock:
+            self._search_indexes[snapshot_id] = index
+            while len(self._search_indexes) > max(Config.SNAPSHOT_MEMORY_CACHE_SIZE, 1):
+                self._search_indexes.popitem(last=False)
+        return index
+
+    def search_snapshot(self, snapshot_id: str, query: str, repo_names: List[str] = None,
+                        limit: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+        """Commits e PRs do snapshot cujo texto contém todos os termos da busca"""
+        rows = self._search_index(snapshot_id).search(query, repo_names, limit)
+        data = self._load_snapshot_cached(snapshot_id)
+        return {table: data[table].iloc[positions] if table in data else pd.DataFrame()
+                for table, positions in rows.items()}
+
+    def _pull_request_links(self, snapshot_id: str) -> PullRequestLinks:
+        with self._snapshot_cache_lock:
+            if snapshot_id in self._pr_links:
+                self._pr_links.move_to_end(snapshot_id)
+                return self._pr_links[snapshot_id]
+        links = PullRequestLinks(self.datalake.load_pr_links(snapshot_id))
+        with self._snapshot_cache_lock:
+            self._pr_links[snapshot_id] = links
+            while len(self._pr_links) > max(Config.SNAPSHOT_MEMORY_CACHE_SIZE, 1):
+                self._pr_links.popitem(last=False)
+        return links
+
+    def pull_requests_for_commits(self, snapshot_id: str, shas: List[str]) -> pd.DataFrame:
+        """PRs (sha, repo_name, number) que trouxeram cada commit"""
+        return self._pull_request_links(snapshot_id).lookup(shas)
+
+    def join_pull_requests(self, snapshot_id: str, commits_df: pd.DataFrame) -> pd.DataFrame:
+        """Commits com a coluna `pr_number` (<NA> para commits feitos direto na branch)"""
+        return self._pull_request_links(snapshot_id).join(commits_df)
+
+    def pr_share_by_repo(self, snapshot_id: str, commits_df: pd.DataFrame = None) -> pd.DataFrame:
+        """Fração dos commits de cada repositório que passou por um PR"""
+        if commits_df is None:
+            commits_df = self._load_snapshot_cached(snapshot_id).get('commits', pd.DataFrame(columns=['sha', 'repo_name']))
+        return self._pull_request_links(snapshot_id).share_by_repo(commits_df)
+
+    def start_snapshot_watcher(self):
+        """Inicia a thread que pré-carrega snapshots novos publicados pelo coletor"""
+        if self._snapshot_watcher is None:
+            from .snapshot_watcher import SnapshotWatcher
+            self._snapshot_watcher = SnapshotWatcher(self)
+        self._snapshot_watcher.start()
+        return self._snapshot_watcher
+
+    def diff_snapshots(self, snapshot_a: str, snapshot_b: str):
+        return self.datalake.diff_snapshots(snapshot_a, snapshot_b)
 
+    def load_series(self, repo_names: List[str] = None):
+        return self.datalake.load_series(repo_names)
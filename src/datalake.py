@@ -1,28 +1,187 @@
 import os
+import shutil
 import json
+import socket
+import time
+import hashlib
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, TYPE_CHECKING
 import logging
 import io
-from supabase import create_client, Client
+import pyarrow as pa
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 from .models import Commit, PullRequest, Repository, SnapshotMetadata
 from .config import Config
+from .search import SEARCH_FIELDS, build_search_index
+from .pr_links import build_pr_links, has_commit_list
+from .identity import (IDENTITY_COLUMNS, AuthorIdentityIndex, assign_author_ids, author_aliases,
+                       resolve_author_ids)
+from .sharding import (SHARDS_DIR, SHARD_METADATA_FILE, SHARD_MERGE_LOCK_FILE, SHARD_MERGE_LOCK_TTL,
+                       shard_of, shard_partial_id)
 
 logger = logging.getLogger(__name__)
 
+SNAPSHOT_TABLES = ('repositories', 'commits', 'pull_requests')
+
+# Índices por snapshot usados pelo diff (lidos sem carregar as tabelas completas)
+COMMITS_INDEX_FILE = 'commits_index.parquet'
+PULL_REQUESTS_INDEX_FILE = 'pull_requests_index.parquet'
+COMMITS_INDEX_COLUMNS = ['sha', 'repo_name', 'author', 'date']
+PULL_REQUESTS_INDEX_COLUMNS = ['repo_name', 'number', 'title', 'state', 'created_at', 'digest']
+PULL_REQUESTS_DIGEST_COLUMNS = ['repo_name', 'number', 'title', 'state', 'created_at',
+                                'comments', 'review_comments', 'commits']
+
+# Índice invertido de mensagens de commit e títulos de PR (busca do dashboard)
+SEARCH_INDEX_FILE = 'search_index.parquet'
+
+# Links SHA -> (repositório, PR) a partir das listas completas de commits dos PRs
+PR_LINKS_FILE = 'pr_commit_links.parquet'
+
+# Cópia Arrow IPC (Feather v2 sem compressão) de cada tabela, mapeada em memória na leitura
+ARROW_IPC_SUFFIX = '.arrow'
+
+# Marcador do último snapshot publicado; o dashboard observa para pré-carregar snapshots novos
+CATALOG_DIR = '_catalog'
+LATEST_MARKER_FILE = 'latest.json'
+
+# Índice de identidades de autores (variante -> author_id), atualizado a cada snapshot
+IDENTITY_DIR = '_identity'
+# v2: nomes não unem e-mails diferentes (o índice v1 tinha esses merges e é reconstruído)
+IDENTITY_FILE = 'author_identities_v2.parquet'
+
+# Série histórica com contadores por repositório, atualizada a cada snapshot
+SERIES_DIR = '_series'
+SERIES_FILE = 'repo_series.parquet'
+SERIES_COUNTERS = ['commits_count', 'authors_count', 'pull_requests_count', 'open_prs', 'closed_prs']
+
+
+def parquet_write_options(compression: str = None, compression_level: int = None,
+                          dictionary_columns: str = None, row_group_size: int = None) -> Dict[str, Any]:
+    """Argumentos de `to_parquet` (engine pyarrow); valores omitidos vêm do Config"""
+    compression = compression or Config.PARQUET_COMPRESSION
+    dictionary = (dictionary_columns or Config.PARQUET_DICTIONARY_COLUMNS).strip()
+    if dictionary.lower() == 'all':
+        use_dictionary = True
+    elif dictionary.lower() == 'none':
+        use_dictionary = False
+    else:
+        use_dictionary = [column.strip() for column in dictionary.split(',') if column.strip()]
+    return {
+        'engine': 'pyarrow',
+        'compression': None if compression == 'none' else compression,
+        'compression_level': compression_level if compression_level is not None else Config.PARQUET_COMPRESSION_LEVEL,
+        'use_dictionary': use_dictionary,
+        'row_group_size': row_group_size or Config.PARQUET_ROW_GROUP_SIZE,
+    }
+
+
+def _arrow_string_dtype():
+    """Dtype que mantém strings nos buffers Arrow em vez de objetos Python"""
+    try:
+        if pd.get_option('future.infer_string'):
+            # pandas já converte strings Arrow sem cópia (mesmo dtype da leitura do Parquet)
+            return None
+    except Exception:
+        pass
+    return pd.StringDtype('pyarrow')
+
+
+def write_arrow_ipc(path: Path, df: pd.DataFrame):
+    """Grava `df` como Arrow IPC sem compressão (escrita atômica)"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = path.with_suffix('.tmp')
+    with pa.OSFile(str(tmp_path), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def read_arrow_ipc(path: Path) -> pd.DataFrame:
+    """Lê um arquivo Arrow IPC com memory map: os buffers vêm do page cache compartilhado"""
+    with pa.memory_map(str(path), 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    string_dtype = _arrow_string_dtype()
+    types_mapper = {pa.string(): string_dtype, pa.large_string(): string_dtype}.get if string_dtype else None
+    return table.to_pandas(split_blocks=True, types_mapper=types_mapper)
+
+
+def build_commits_index(commits_df: pd.DataFrame) -> pd.DataFrame:
+    """Índice de commits ordenado por SHA"""
+    index = commits_df.reindex(columns=COMMITS_INDEX_COLUMNS)
+    return index.sort_values(['sha', 'repo_name'], kind='stable').reset_index(drop=True)
+
+
+def build_pull_requests_index(prs_df: pd.DataFrame) -> pd.DataFrame:
+    """Índice de PRs com um digest do estado mutável de cada PR"""
+    df = prs_df.reindex(columns=PULL_REQUESTS_DIGEST_COLUMNS).fillna('')
+    state = df['title'].astype(str)
+    for column in ('state', 'comments', 'review_comments', 'commits'):
+        state = state + '\x1f' + df[column].astype(str)
+    df['digest'] = [hashlib.blake2b(value.encode('utf-8'), digest_size=8).hexdigest() for value in state]
+    df['number'] = df['number'].astype(str)
+    index = df[PULL_REQUESTS_INDEX_COLUMNS]
+    return index.sort_values(['repo_name', 'number'], kind='stable').reset_index(drop=True)
+
+
+def build_series_rows(snapshot_id: str, timestamp: str, repo_names: List[str],
+                      commits_df: pd.DataFrame, prs_df: pd.DataFrame) -> pd.DataFrame:
+    """Contadores por repositório de um snapshot (uma linha por repositório)"""
+    commits_df = commits_df.reindex(columns=['repo_name', 'author', 'date'])
+    prs_df = prs_df.reindex(columns=['repo_name', 'state'])
+    return _series_rows(snapshot_id, timestamp, repo_names,
+                        *_commit_series_stats(commits_df), _pr_series_stats(prs_df))
+
+
+def _commit_series_stats(commits_df: pd.DataFrame):
+    """(commits e última data por repositório, pares distintos repositório/autor)"""
+    by_repo = commits_df.groupby('repo_name')
+    stats = pd.DataFrame({'commits_count': by_repo.size(), 'last_commit_date': by_repo['date'].max()})
+    return stats, commits_df[['repo_name', 'author']].dropna().drop_duplicates()
+
+
+def _pr_series_stats(prs_df: pd.DataFrame) -> pd.DataFrame:
+    return pd.DataFrame({
+        'pull_requests_count': prs_df.groupby('repo_name').size(),
+        'open_prs': prs_df[prs_df['state'] == 'open'].groupby('repo_name').size(),
+        'closed_prs': prs_df[prs_df['state'] == 'closed'].groupby('repo_name').size(),
+    })
+
+
+def _series_rows(snapshot_id: str, timestamp: str, repo_names: List[str], commit_stats: pd.DataFrame,
+                 repo_authors: pd.DataFrame, pr_stats: pd.DataFrame) -> pd.DataFrame:
+    repo_names = pd.concat([pd.Series(repo_names, dtype=object), pd.Series(commit_stats.index, dtype=object),
+                            pd.Series(pr_stats.index, dtype=object)])
+    rows = pd.DataFrame(index=pd.Index(sorted(repo_names.dropna().unique()), name='repo_name'))
+    rows['commits_count'] = commit_stats['commits_count']
+    rows['authors_count'] = repo_authors.groupby('repo_name').size()
+    for column in ('pull_requests_count', 'open_prs', 'closed_prs'):
+        rows[column] = pr_stats[column]
+    rows[SERIES_COUNTERS] = rows[SERIES_COUNTERS].fillna(0).astype('int64')
+    rows['last_commit_date'] = commit_stats['last_commit_date']
+    rows = rows.reset_index()
+    rows.insert(0, 'timestamp', timestamp)
+    rows.insert(0, 'snapshot_id', snapshot_id)
+    return rows
+
+
 class DataLake:
     def __init__(self, base_path: str = None):
         self.base_path = Path(base_path or Config.DATALAKE_PATH)
         self.snapshots_path = Path(Config.SNAPSHOTS_PATH)
+        self.cache_path = Path(Config.SNAPSHOT_CACHE_PATH)
         self.storage_backend = Config.STORAGE_BACKEND
         self._ensure_directories()
 
-        self.supabase: Optional[Client] = None
+        self.supabase: Optional['Client'] = None
         self.bucket_name = None
         if self.storage_backend == 'supabase':
+            # Import tardio: o cliente do Supabase só é carregado com esse backend
+            from supabase import create_client
             self.supabase = create_client(Config.SUPABASE_URL, Config.SUPABASE_ANON_KEY)
             self.bucket_name = Config.SUPABASE_BUCKET
             self._ensure_bucket()
@@ -48,70 +207,66 @@ class DataLake:
     def create_snapshot(self, repositories: List[Repository],
                        commits: List[Commit],
                        pull_requests: List[PullRequest]) -> str:
+        return self.create_snapshot_from_frames(
+            pd.DataFrame([repo.to_dict() for repo in repositories]),
+            pd.DataFrame([commit.to_dict() for commit in commits]),
+            pd.DataFrame([pr.to_dict() for pr in pull_requests]),
+        )
+
+    def create_snapshot_from_frames(self, repos_df: pd.DataFrame, commits_df: pd.DataFrame,
+                                    prs_df: pd.DataFrame) -> str:
+        """Grava um snapshot a partir das tabelas já montadas (usado também pelo merge de shards)"""
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         snapshot_id = f"snapshot_{timestamp}"
 
         try:
-            if self.storage_backend == 'supabase':
-                # Convert to DataFrames and upload as Parquet to Supabase
-                if repositories:
-                    repos_df = pd.DataFrame([repo.to_dict() for repo in repositories])
-                    buffer = io.BytesIO()
-                    repos_df.to_parquet(buffer, index=False)
-                    buffer.seek(0)
-
-                    file_path = f"{snapshot_id}/repositories.parquet"
-                    self.supabase.storage.from_(self.bucket_name).upload(
-                        file_path, buffer.getvalue(),
-                        file_options={"upsert": "true"}
-                    )
-
-                if commits:
-                    commits_df = pd.DataFrame([commit.to_dict() for commit in commits])
-                    buffer = io.BytesIO()
-                    commits_df.to_parquet(buffer, index=False)
-                    buffer.seek(0)
-
-                    file_path = f"{snapshot_id}/commits.parquet"
-                    self.supabase.storage.from_(self.bucket_name).upload(
-                        file_path, buffer.getvalue(),
-                        file_options={"upsert": "true"}
-                    )
-
-                if pull_requests:
-                    prs_df = pd.DataFrame([pr.to_dict() for pr in pull_requests])
-                    buffer = io.BytesIO()
-                    prs_df.to_parquet(buffer, index=False)
-                    buffer.seek(0)
-
-                    file_path = f"{snapshot_id}/pull_requests.parquet"
-                    self.supabase.storage.from_(self.bucket_name).upload(
-                        file_path, buffer.getvalue(),
-                        file_options={"upsert": "true"}
-                    )
-            else:
-                # Local filesystem backend
-                snapshot_dir = self.snapshots_path / snapshot_id
-                snapshot_dir.mkdir(parents=True, exist_ok=True)
+            try:
+                commits_df, prs_df = self._assign_author_ids(commits_df, prs_df)
+            except Exception as e:
+                # Sem a coluna author_id o dashboard agrupa e exclui pelo nome, como antes
+                logger.warning(f"Could not assign author ids for {snapshot_id}: {e}")
+
+            has_repositories, has_commits, has_prs = not repos_df.empty, not commits_df.empty, not prs_df.empty
+
+            if has_repositories:
+                self._write_parquet(snapshot_id, 'repositories.parquet', repos_df)
 
-                if repositories:
-                    repos_df = pd.DataFrame([repo.to_dict() for repo in repositories])
-                    repos_df.to_parquet(snapshot_dir / 'repositories.parquet', index=False)
+            if has_commits:
+                self._write_parquet(snapshot_id, 'commits.parquet', commits_df)
+                self._write_parquet(snapshot_id, COMMITS_INDEX_FILE, build_commits_index(commits_df))
 
-                if commits:
-                    commits_df = pd.DataFrame([commit.to_dict() for commit in commits])
-                    commits_df.to_parquet(snapshot_dir / 'commits.parquet', index=False)
+            if has_prs:
+                try:
+                    self._write_parquet(snapshot_id, PR_LINKS_FILE,
+                                        build_pr_links(prs_df, self._previous_pr_links(prs_df)))
+                except Exception as e:
+                    logger.warning(f"Could not write PR links for {snapshot_id}: {e}")
+                # A lista completa só existe durante a coleta; na tabela fica a lista limitada de `commits`
+                prs_df = prs_df.drop(columns=['commit_shas'], errors='ignore')
+                self._write_parquet(snapshot_id, 'pull_requests.parquet', prs_df)
+                self._write_parquet(snapshot_id, PULL_REQUESTS_INDEX_FILE, build_pull_requests_index(prs_df))
+
+            if has_commits or has_prs:
+                try:
+                    self._write_parquet(snapshot_id, SEARCH_INDEX_FILE, build_search_index(commits_df, prs_df))
+                except Exception as e:
+                    # Derivado das tabelas; sem ele a busca monta o índice na primeira consulta
+                    logger.warning(f"Could not write search index for {snapshot_id}: {e}")
 
-                if pull_requests:
-                    prs_df = pd.DataFrame([pr.to_dict() for pr in pull_requests])
-                    prs_df.to_parquet(snapshot_dir / 'pull_requests.parquet', index=False)
+            if Config.SNAPSHOT_ARROW_IPC:
+                tables = {'repositories': repos_df if has_repositories else None,
+                          'commits': commits_df if has_commits else None,
+                          'pull_requests': prs_df if has_prs else None}
+                for table, df in tables.items():
+                    if df is not None:
+                        self._write_arrow_copy(snapshot_id, table, df)
 
             # Create metadata
             metadata = SnapshotMetadata(
                 timestamp=timestamp,
-                repositories_count=len(repositories),
-                commits_count=len(commits),
-                pull_requests_count=len(pull_requests),
+                repositories_count=len(repos_df),
+                commits_count=len(commits_df),
+                pull_requests_count=len(prs_df),
                 snapshot_id=snapshot_id
             )
 
@@ -125,9 +280,24 @@ class DataLake:
                 )
             else:
                 snapshot_dir = self.snapshots_path / snapshot_id
+                snapshot_dir.mkdir(parents=True, exist_ok=True)
                 with open(snapshot_dir / 'metadata.json', 'w', encoding='utf-8') as f:
                     f.write(metadata_json)
 
+            try:
+                self._append_series(build_series_rows(
+                    snapshot_id, timestamp, repos_df['repo_name'].tolist() if has_repositories else [],
+                    commits_df, prs_df
+                ))
+            except Exception as e:
+                # A série é derivada; falhar aqui não invalida o snapshot
+                logger.warning(f"Could not update series for {snapshot_id}: {e}")
+
+            try:
+                self.publish_latest_snapshot(snapshot_id)
+            except Exception as e:
+                logger.warning(f"Could not publish latest snapshot marker for {snapshot_id}: {e}")
+
             logger.info(f"Snapshot created: {snapshot_id}")
             return snapshot_id
 
@@ -135,6 +305,33 @@ class DataLake:
             logger.error(f"Error creating snapshot: {e}")
             raise
 
+    def load_author_identities(self) -> pd.DataFrame:
+        payload = self._read_object(f"{IDENTITY_DIR}/{IDENTITY_FILE}")
+        if payload is None:
+            return pd.DataFrame(columns=IDENTITY_COLUMNS)
+        return pd.read_parquet(io.BytesIO(payload))
+
+    def load_author_aliases(self) -> Dict[int, int]:
+        try:
+            return author_aliases(self.load_author_identities())
+        except Exception as e:
+            logger.warning(f"Could not load author id aliases: {e}")
+            return {}
+
+    def _assign_author_ids(self, commits_df: pd.DataFrame, prs_df: pd.DataFrame):
+        """Atualiza o índice de identidades com o snapshot e acrescenta `author_id` aos commits e PRs"""
+        if commits_df.empty and prs_df.empty:
+            return commits_df, prs_df
+        index = AuthorIdentityIndex(self.load_author_identities())
+        known = len(index)
+        commits_df, prs_df = assign_author_ids(index, commits_df, prs_df)
+        # Sempre regravado: uma linha nova pode unir variantes já conhecidas sem criar chaves
+        buffer = io.BytesIO()
+        index.to_frame().to_parquet(buffer, index=False, **parquet_write_options())
+        self._write_object(f"{IDENTITY_DIR}/{IDENTITY_FILE}", buffer.getvalue())
+        logger.info(f"Author identities: {len(index)} variants, {index.next_id} ids ({len(index) - known} new variants)")
+        return commits_df, prs_df
+
     def list_snapshots(self) -> List[Dict[str, Any]]:
         snapshots = []
         try:
@@ -142,6 +339,8 @@ class DataLake:
                 items = self.supabase.storage.from_(self.bucket_name).list()
                 for item in items:
                     snapshot_id = item['name']
+                    if snapshot_id in (SERIES_DIR, CATALOG_DIR, SHARDS_DIR, IDENTITY_DIR):
+                        continue
                     try:
                         metadata_path = f"{snapshot_id}/metadata.json"
                         response = self.supabase.storage.from_(self.bucket_name).download(metadata_path)
@@ -169,51 +368,339 @@ class DataLake:
 
     def load_snapshot_data(self, snapshot_id: str) -> Dict[str, pd.DataFrame]:
         data = {}
+        aliases = None
         try:
-            if self.storage_backend == 'supabase':
+            for table in SNAPSHOT_TABLES:
                 try:
-                    repos_path = f"{snapshot_id}/repositories.parquet"
-                    repos_data = self.supabase.storage.from_(self.bucket_name).download(repos_path)
-                    data['repositories'] = pd.read_parquet(io.BytesIO(repos_data))
-                except:
-                    pass
-                try:
-                    commits_path = f"{snapshot_id}/commits.parquet"
-                    commits_data = self.supabase.storage.from_(self.bucket_name).download(commits_path)
-                    data['commits'] = pd.read_parquet(io.BytesIO(commits_data))
-                except:
-                    pass
-                try:
-                    prs_path = f"{snapshot_id}/pull_requests.parquet"
-                    prs_data = self.supabase.storage.from_(self.bucket_name).download(prs_path)
-                    data['pull_requests'] = pd.read_parquet(io.BytesIO(prs_data))
-                except:
-                    pass
-            else:
-                snapshot_dir = self.snapshots_path / snapshot_id
-                try:
-                    repos_file = snapshot_dir / 'repositories.parquet'
-                    if repos_file.exists():
-                        data['repositories'] = pd.read_parquet(repos_file)
-                except:
-                    pass
-                try:
-                    commits_file = snapshot_dir / 'commits.parquet'
-                    if commits_file.exists():
-                        data['commits'] = pd.read_parquet(commits_file)
-                except:
-                    pass
-                try:
-                    prs_file = snapshot_dir / 'pull_requests.parquet'
-                    if prs_file.exists():
-                        data['pull_requests'] = pd.read_parquet(prs_file)
-                except:
+                    if Config.SNAPSHOT_ARROW_IPC:
+                        arrow_file = self._arrow_copy_path(snapshot_id, table)
+                        if arrow_file.exists():
+                            data[table] = read_arrow_ipc(arrow_file)
+                            continue
+                    df = self._read_parquet(snapshot_id, f"{table}.parquet")
+                    if df is not None:
+                        data[table] = df
+                        if Config.SNAPSHOT_ARROW_IPC:
+                            # Snapshots antigos (ou ainda não baixados): próxima leitura já é mapeada
+                            self._write_arrow_copy(snapshot_id, table, df)
+                except Exception:
                     pass
+                if 'author_id' in data.get(table, ()):
+                    # Ids unidos depois deste snapshot passam para o id atual do autor
+                    if aliases is None:
+                        aliases = self.load_author_aliases()
+                    data[table] = resolve_author_ids(data[table], aliases)
         except Exception as e:
             logger.error(f"Error loading snapshot {snapshot_id}: {e}")
             raise
         return data
 
+    def _arrow_copy_path(self, snapshot_id: str, table: str) -> Path:
+        # No Supabase a cópia fica no cache em disco, junto dos Parquet baixados
+        base = self.cache_path if self.storage_backend == 'supabase' else self.snapshots_path
+        return base / snapshot_id / f"{table}{ARROW_IPC_SUFFIX}"
+
+    def _write_arrow_copy(self, snapshot_id: str, table: str, df: pd.DataFrame):
+        path = self._arrow_copy_path(snapshot_id, table)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_arrow_ipc(path, df)
+        except Exception as e:
+            # A cópia é derivada do Parquet; sem ela a leitura só fica mais lenta
+            logger.warning(f"Could not write Arrow copy of {table} for {snapshot_id}: {e}")
+
+    def _write_parquet(self, snapshot_id: str, filename: str, df: pd.DataFrame):
+        if self.storage_backend == 'supabase':
+            buffer = io.BytesIO()
+            df.to_parquet(buffer, index=False, **parquet_write_options())
+            self.supabase.storage.from_(self.bucket_name).upload(
+                f"{snapshot_id}/{filename}", buffer.getvalue(),
+                file_options={"upsert": "true"}
+            )
+        else:
+            snapshot_dir = self.snapshots_path / snapshot_id
+            snapshot_dir.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(snapshot_dir / filename, index=False, **parquet_write_options())
+
+    def _read_parquet(self, snapshot_id: str, filename: str,
+                      columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """Lê um arquivo Parquet do snapshot; retorna None se não existir"""
+        if self.storage_backend == 'supabase':
+            try:
+                payload = self.supabase.storage.from_(self.bucket_name).download(f"{snapshot_id}/{filename}")
+            except Exception:
+                return None
+            return pd.read_parquet(io.BytesIO(payload), columns=columns)
+
+        path = self.snapshots_path / snapshot_id / filename
+        if not path.exists():
+            return None
+        return pd.read_parquet(path, columns=columns)
+
+    def ensure_local_snapshot(self, snapshot_id: str, tables: Optional[List[str]] = None) -> Path:
+        """Diretório local com os Parquet do snapshot.
+
+        No backend local é o próprio diretório do snapshot; no Supabase os
+        arquivos ausentes são baixados uma única vez para o cache em disco.
+        """
+        if self.storage_backend != 'supabase':
+            return self.snapshots_path / snapshot_id
+
+        snapshot_dir = self.cache_path / snapshot_id
+        snapshot_dir.mkdir(parents=True, exist_ok=True)
+        for table in tables or SNAPSHOT_TABLES:
+            local_file = snapshot_dir / f"{table}.parquet"
+            if local_file.exists():
+                continue
+            try:
+                payload = self.supabase.storage.from_(self.bucket_name).download(f"{snapshot_id}/{table}.parquet")
+            except Exception as e:
+                logger.warning(f"Could not download {table}.parquet of {snapshot_id}: {e}")
+                continue
+            tmp_file = local_file.with_suffix('.tmp')
+            tmp_file.write_bytes(payload)
+            os.replace(tmp_file, local_file)
+        return snapshot_dir
+
+    def iter_snapshot_batches(self, snapshot_id: str, table: str, batch_size: int = None,
+                              columns: Optional[List[str]] = None, filters=None) -> Iterator[pa.RecordBatch]:
+        """Lê uma tabela do snapshot em lotes Arrow, sem materializar a tabela inteira.
+
+        `filters` aceita o formato do pandas (`[('repo_name', 'in', [...])]`)
+        ou uma expressão `pyarrow.compute`; filtros e projeção são aplicados
+        na leitura. No Supabase o Parquet é baixado uma vez para o cache em
+        disco e lido de lá. A memória fica limitada ao row group em leitura
+        (veja PARQUET_ROW_GROUP_SIZE) mais alguns lotes de read-ahead.
+        """
+        # Import tardio: pyarrow.dataset só é necessário no caminho em lotes
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+
+        snapshot_dir = self.ensure_local_snapshot(snapshot_id, [table])
+        parquet_file = snapshot_dir / f"{table}.parquet"
+        if not parquet_file.exists():
+            return
+        if filters is not None and not isinstance(filters, ds.Expression):
+            filters = pq.filters_to_expression(filters)
+
+        dataset = ds.dataset(str(parquet_file), format='parquet')
+        # Colunas ausentes em snapshots antigos são ignoradas em vez de falhar
+        if columns is not None:
+            columns = [column for column in columns if column in dataset.schema.names]
+        yield from dataset.to_batches(
+            columns=columns, filter=filters,
+            batch_size=batch_size or Config.SNAPSHOT_BATCH_SIZE,
+            batch_readahead=2, fragment_readahead=1
+        )
+
+    def _load_index(self, snapshot_id: str, index_file: str, table: str, builder) -> pd.DataFrame:
+        index = self._read_parquet(snapshot_id, index_file)
+        if index is not None:
+            return index
+
+        # Snapshots antigos não têm índice: monta a partir só das colunas necessárias
+        logger.info(f"No {index_file} in {snapshot_id}, building it from {table}.parquet")
+        columns = COMMITS_INDEX_COLUMNS if table == 'commits' else PULL_REQUESTS_DIGEST_COLUMNS
+        df = self._read_parquet(snapshot_id, f"{table}.parquet", columns=columns)
+        if df is None:
+            df = pd.DataFrame(columns=columns)
+        return builder(df)
+
+    def load_search_index(self, snapshot_id: str) -> pd.DataFrame:
+        index = self._read_parquet(snapshot_id, SEARCH_INDEX_FILE)
+        if index is not None:
+            return index
+
+        logger.info(f"No {SEARCH_INDEX_FILE} in {snapshot_id}, building it from the snapshot tables")
+        tables = {}
+        for table, column in SEARCH_FIELDS.items():
+            tables[table] = self._read_parquet(snapshot_id, f"{table}.parquet", columns=['repo_name', column])
+        return build_search_index(tables['commits'], tables['pull_requests'])
+
+    def _previous_pr_links(self, prs_df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Links do último snapshot, necessários só para PRs reaproveitados (sem a lista completa)"""
+        if 'commit_shas' in prs_df.columns and prs_df['commit_shas'].map(has_commit_list).all():
+            return None
+        previous_id = self.get_latest_snapshot()
+        return self.load_pr_links(previous_id) if previous_id else None
+
+    def load_pr_links(self, snapshot_id: str) -> pd.DataFrame:
+        links = self._read_parquet(snapshot_id, PR_LINKS_FILE)
+        if links is not None:
+            return links
+
+        # Snapshots antigos: só as listas limitadas da coluna `commits`
+        logger.info(f"No {PR_LINKS_FILE} in {snapshot_id}, building it from pull_requests.parquet")
+        return build_pr_links(self._read_parquet(snapshot_id, 'pull_requests.parquet',
+                                                 columns=['repo_name', 'number', 'commits']))
+
+    def diff_snapshots(self, snapshot_a: str, snapshot_b: str) -> Dict[str, pd.DataFrame]:
+        """Compara dois snapshots (a = base, b = mais recente) lendo apenas os índices.
+
+        Retorna DataFrames com commits adicionados/removidos, PRs
+        adicionados/removidos/alterados e um resumo por repositório.
+        """
+        commits_a = self._load_index(snapshot_a, COMMITS_INDEX_FILE, 'commits', build_commits_index)
+        commits_b = self._load_index(snapshot_b, COMMITS_INDEX_FILE, 'commits', build_commits_index)
+        prs_a = self._load_index(snapshot_a, PULL_REQUESTS_INDEX_FILE, 'pull_requests', build_pull_requests_index)
+        prs_b = self._load_index(snapshot_b, PULL_REQUESTS_INDEX_FILE, 'pull_requests', build_pull_requests_index)
+
+        commit_keys = ['sha', 'repo_name']
+        commits = commits_b.merge(commits_a[commit_keys], on=commit_keys, how='left', indicator=True)
+        commits_added = commits[commits['_merge'] == 'left_only'].drop(columns='_merge')
+        commits_removed = commits_a.merge(
+            commits_b[commit_keys], on=commit_keys, how='left', indicator=True
+        )
+        commits_removed = commits_removed[commits_removed['_merge'] == 'left_only'].drop(columns='_merge')
+
+        pr_keys = ['repo_name', 'number']
+        prs = prs_b.merge(prs_a[pr_keys + ['state', 'digest']], on=pr_keys, how='left',
+                          suffixes=('', '_before'), indicator=True)
+        prs_added = prs[prs['_merge'] == 'left_only'][PULL_REQUESTS_INDEX_COLUMNS]
+        prs_removed = prs_a.merge(prs_b[pr_keys], on=pr_keys, how='left', indicator=True)
+        prs_removed = prs_removed[prs_removed['_merge'] == 'left_only'][PULL_REQUESTS_INDEX_COLUMNS]
+        prs_changed = prs[(prs['_merge'] == 'both') & (prs['digest'] != prs['digest_before'])]
+        prs_changed = prs_changed.rename(columns={'state': 'state_after'})[
+            ['repo_name', 'number', 'title', 'state_before', 'state_after']
+        ]
+
+        repos = pd.concat([commits_a['repo_name'], commits_b['repo_name'],
+                           prs_a['repo_name'], prs_b['repo_name']]).dropna().unique()
+        summary = pd.DataFrame(index=pd.Index(sorted(repos), name='repo_name'))
+        summary['commits_added'] = commits_added.groupby('repo_name').size()
+        summary['commits_removed'] = commits_removed.groupby('repo_name').size()
+        summary['prs_opened'] = prs_added[prs_added['state'] == 'open'].groupby('repo_name').size()
+        closed = prs_changed[(prs_changed['state_before'] == 'open') & (prs_changed['state_after'] == 'closed')]
+        summary['prs_closed'] = closed.groupby('repo_name').size()
+        summary['prs_changed'] = prs_changed.groupby('repo_name').size()
+        summary = summary.fillna(0).astype(int)
+        activity = summary[['commits_added', 'prs_opened', 'prs_changed']].sum(axis=1)
+        summary['quiet'] = activity == 0
+
+        return {
+            'commits_added': commits_added.reset_index(drop=True),
+            'commits_removed': commits_removed.reset_index(drop=True),
+            'pull_requests_added': prs_added.reset_index(drop=True),
+            'pull_requests_removed': prs_removed.reset_index(drop=True),
+            'pull_requests_changed': prs_changed.reset_index(drop=True),
+            'repositories': summary.reset_index(),
+        }
+
+    def _series_location(self):
+        if self.storage_backend == 'supabase':
+            return f"{SERIES_DIR}/{SERIES_FILE}"
+        return self.base_path / SERIES_DIR / SERIES_FILE
+
+    def load_series(self, repo_names: Optional[List[str]] = None) -> pd.DataFrame:
+        """Lê a série histórica de todos os snapshots em uma única leitura"""
+        filters = [('repo_name', 'in', list(repo_names))] if repo_names else None
+        location = self._series_location()
+        try:
+            if self.storage_backend == 'supabase':
+                payload = self.supabase.storage.from_(self.bucket_name).download(location)
+                return pd.read_parquet(io.BytesIO(payload), filters=filters)
+            if location.exists():
+                return pd.read_parquet(location, filters=filters)
+        except Exception as e:
+            logger.warning(f"Could not load series: {e}")
+        return pd.DataFrame(columns=['snapshot_id', 'timestamp', 'repo_name'] + SERIES_COUNTERS + ['last_commit_date'])
+
+    def _write_series(self, series: pd.DataFrame):
+        series = series.sort_values(['repo_name', 'timestamp'], kind='stable').reset_index(drop=True)
+        location = self._series_location()
+        if self.storage_backend == 'supabase':
+            buffer = io.BytesIO()
+            series.to_parquet(buffer, index=False, **parquet_write_options())
+            self.supabase.storage.from_(self.bucket_name).upload(
+                location, buffer.getvalue(),
+                file_options={"upsert": "true"}
+            )
+        else:
+            location.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = location.with_suffix('.tmp')
+            series.to_parquet(tmp_path, index=False, **parquet_write_options())
+            os.replace(tmp_path, location)
+
+    def _append_series(self, rows: pd.DataFrame):
+        series = self.load_series()
+        series = series[~series['snapshot_id'].isin(rows['snapshot_id'].unique())]
+        self._write_series(pd.concat([series, rows], ignore_index=True) if not series.empty else rows)
+
+    def series_rows_from_batches(self, snapshot_id: str, timestamp: str, batch_size: int = None) -> pd.DataFrame:
+        """Mesmas linhas de `build_series_rows`, agregando o snapshot em lotes (memória limitada)"""
+        commit_stats = pd.DataFrame(columns=['commits_count', 'last_commit_date'])
+        repo_authors = pd.DataFrame(columns=['repo_name', 'author'])
+        for batch in self.iter_snapshot_batches(snapshot_id, 'commits', batch_size,
+                                                columns=['repo_name', 'author', 'date']):
+            batch_stats, batch_authors = _commit_series_stats(
+                batch.to_pandas().reindex(columns=['repo_name', 'author', 'date'])
+            )
+            # Combina o lote com o acumulado: o estado cresce com repositórios/autores, não com commits
+            combined = pd.concat([commit_stats, batch_stats]) if not commit_stats.empty else batch_stats
+            commit_stats = combined.groupby(level=0).agg({'commits_count': 'sum', 'last_commit_date': 'max'})
+            repo_authors = pd.concat([repo_authors, batch_authors]).drop_duplicates()
+
+        pr_parts = [
+            _pr_series_stats(batch.to_pandas().reindex(columns=['repo_name', 'state']))
+            for batch in self.iter_snapshot_batches(snapshot_id, 'pull_requests', batch_size,
+                                                    columns=['repo_name', 'state'])
+        ]
+        pr_stats = (pd.concat(pr_parts).groupby(level=0).sum() if pr_parts
+                    else pd.DataFrame(columns=['pull_requests_count', 'open_prs', 'closed_prs']))
+
+        repo_names = [name for batch in self.iter_snapshot_batches(snapshot_id, 'repositories', batch_size,
+                                                                   columns=['repo_name'])
+                      for name in batch.column('repo_name').to_pylist()]
+        return _series_rows(snapshot_id, timestamp, repo_names, commit_stats, repo_authors, pr_stats)
+
+    def rebuild_series(self) -> int:
+        """Recria a série a partir de todos os snapshots existentes (backfill)"""
+        parts = []
+        for metadata in self.list_snapshots():
+            parts.append(self.series_rows_from_batches(metadata['snapshot_id'], metadata['timestamp']))
+        if parts:
+            self._write_series(pd.concat(parts, ignore_index=True))
+        logger.info(f"Series rebuilt from {len(parts)} snapshots")
+        return len(parts)
+
+    def _latest_marker_location(self):
+        if self.storage_backend == 'supabase':
+            return f"{CATALOG_DIR}/{LATEST_MARKER_FILE}"
+        return self.base_path / CATALOG_DIR / LATEST_MARKER_FILE
+
+    def publish_latest_snapshot(self, snapshot_id: Optional[str]):
+        """Grava o marcador com o último snapshot (versão incrementada a cada publicação)"""
+        previous = self.read_latest_marker() or {}
+        marker = json.dumps({
+            'snapshot_id': snapshot_id,
+            'version': int(previous.get('version', 0)) + 1,
+            'published_at': datetime.now().isoformat(),
+        })
+        location = self._latest_marker_location()
+        if self.storage_backend == 'supabase':
+            self.supabase.storage.from_(self.bucket_name).upload(
+                location, marker.encode('utf-8'),
+                file_options={"upsert": "true"}
+            )
+        else:
+            location.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = location.with_suffix('.tmp')
+            tmp_path.write_text(marker, encoding='utf-8')
+            os.replace(tmp_path, location)
+
+    def read_latest_marker(self) -> Optional[Dict[str, Any]]:
+        """Marcador do último snapshot; None se nenhum foi publicado"""
+        location = self._latest_marker_location()
+        try:
+            if self.storage_backend == 'supabase':
+                payload = self.supabase.storage.from_(self.bucket_name).download(location)
+                return json.loads(payload.decode('utf-8'))
+            if location.exists():
+                return json.loads(location.read_text(encoding='utf-8'))
+        except Exception as e:
+            logger.debug(f"Could not read latest snapshot marker: {e}")
+        return None
+
     def get_latest_snapshot(self) -> Optional[str]:
         snapshots = self.list_snapshots()
         return snapshots[0]['snapshot_id'] if snapshots else None
@@ -225,6 +712,9 @@ class DataLake:
                 for file in files:
                     file_path = f"{snapshot_id}/{file['name']}"
                     self.supabase.storage.from_(self.bucket_name).remove([file_path])
+                cache_dir = self.cache_path / snapshot_id
+                if cache_dir.exists():
+                    shutil.rmtree(cache_dir, ignore_errors=True)
             else:
                 snapshot_dir = self.snapshots_path / snapshot_id
                 if snapshot_dir.exists() and snapshot_dir.is_dir():
@@ -235,8 +725,216 @@ class DataLake:
                         if path.is_dir():
                             path.rmdir()
                     snapshot_dir.rmdir()
+            latest = self.read_latest_marker()
+            if latest and latest.get('snapshot_id') == snapshot_id:
+                self.publish_latest_snapshot(self.get_latest_snapshot())
+            series = self.load_series()
+            if (series['snapshot_id'] == snapshot_id).any():
+                self._write_series(series[series['snapshot_id'] != snapshot_id])
             logger.info(f"Snapshot {snapshot_id} deleted")
             return True
         except Exception as e:
             logger.error(f"Error deleting snapshot {snapshot_id}: {e}")
             return False
+
+    # Coleta em shards: cada scheduler grava um snapshot parcial em _shards/ e o merge os combina
+
+    def _object_location(self, key: str):
+        """Chave relativa à raiz do datalake (no Supabase, à raiz do bucket)"""
+        if self.storage_backend == 'supabase':
+            return key
+        return self.base_path / key
+
+    def _write_object(self, key: str, payload: bytes, overwrite: bool = True):
+        location = self._object_location(key)
+        if self.storage_backend == 'supabase':
+            # Sem upsert o upload falha se o objeto já existe (usado no lock de merge)
+            self.supabase.storage.from_(self.bucket_name).upload(
+                location, payload, file_options={"upsert": "true" if overwrite else "false"}
+            )
+            return
+        location.parent.mkdir(parents=True, exist_ok=True)
+        if not overwrite:
+            fd = os.open(location, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            return
+        tmp_path = location.with_name(location.name + '.tmp')
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, location)
+
+    def _read_object(self, key: str) -> Optional[bytes]:
+        location = self._object_location(key)
+        try:
+            if self.storage_backend == 'supabase':
+                return self.supabase.storage.from_(self.bucket_name).download(location)
+            return location.read_bytes() if location.exists() else None
+        except Exception:
+            return None
+
+    def write_shard_snapshot(self, shard_index: int, shard_count: int, repositories: List[Repository],
+                             commits: List[Commit], pull_requests: List[PullRequest]) -> str:
+        """Grava o snapshot parcial de um shard; o shard.json vai por último e marca o parcial como completo"""
+        finished_at = datetime.now()
+        partial_id = shard_partial_id(shard_index, shard_count, finished_at.strftime("%Y-%m-%d_%H-%M-%S"))
+        tables = {
+            'repositories': pd.DataFrame([repo.to_dict() for repo in repositories]),
+            'commits': pd.DataFrame([commit.to_dict() for commit in commits]),
+            'pull_requests': pd.DataFrame([pr.to_dict() for pr in pull_requests]),
+        }
+        for table, df in tables.items():
+            if df.empty:
+                continue
+            buffer = io.BytesIO()
+            df.to_parquet(buffer, index=False, **parquet_write_options())
+            self._write_object(f"{SHARDS_DIR}/{partial_id}/{table}.parquet", buffer.getvalue())
+
+        metadata = {
+            'partial_id': partial_id,
+            'shard_index': shard_index,
+            'shard_count': shard_count,
+            'finished_at': finished_at.isoformat(),
+            'repositories': [repo.repo_name for repo in repositories],
+            'commits_count': len(commits),
+            'pull_requests_count': len(pull_requests),
+        }
+        self._write_object(f"{SHARDS_DIR}/{partial_id}/{SHARD_METADATA_FILE}",
+                           json.dumps(metadata, indent=2).encode('utf-8'))
+        logger.info(f"Shard {shard_index}/{shard_count} written: {partial_id} "
+                    f"({len(repositories)} repos, {len(commits)} commits, {len(pull_requests)} PRs)")
+        return partial_id
+
+    def list_shard_snapshots(self) -> List[Dict[str, Any]]:
+        """Parciais completos (com shard.json) ainda não combinados, do mais antigo ao mais novo"""
+        if self.storage_backend == 'supabase':
+            try:
+                names = [item['name'] for item in self.supabase.storage.from_(self.bucket_name).list(SHARDS_DIR)
+                         if item.get('id') is None]
+            except Exception as e:
+                logger.warning(f"Could not list shard snapshots: {e}")
+                return []
+        else:
+            shards_dir = self.base_path / SHARDS_DIR
+            names = [entry.name for entry in shards_dir.iterdir() if entry.is_dir()] if shards_dir.exists() else []
+
+        partials = []
+        for name in names:
+            payload = self._read_object(f"{SHARDS_DIR}/{name}/{SHARD_METADATA_FILE}")
+            if payload is None:
+                continue
+            try:
+                partials.append(json.loads(payload.decode('utf-8')))
+            except Exception as e:
+                logger.warning(f"Error reading metadata for shard {name}: {e}")
+        return sorted(partials, key=lambda p: p['finished_at'])
+
+    def _read_shard_table(self, partial_id: str, table: str) -> Optional[pd.DataFrame]:
+        payload = self._read_object(f"{SHARDS_DIR}/{partial_id}/{table}.parquet")
+        return pd.read_parquet(io.BytesIO(payload)) if payload is not None else None
+
+    def _delete_shard_snapshot(self, partial_id: str):
+        if self.storage_backend == 'supabase':
+            storage = self.supabase.storage.from_(self.bucket_name)
+            files = storage.list(f"{SHARDS_DIR}/{partial_id}")
+            if files:
+                storage.remove([f"{SHARDS_DIR}/{partial_id}/{file['name']}" for file in files])
+        else:
+            shutil.rmtree(self.base_path / SHARDS_DIR / partial_id, ignore_errors=True)
+
+    def _acquire_merge_lock(self) -> bool:
+        key = f"{SHARDS_DIR}/{SHARD_MERGE_LOCK_FILE}"
+        payload = json.dumps({'acquired_at': time.time(), 'host': socket.gethostname(), 'pid': os.getpid()})
+        for _ in range(2):
+            try:
+                self._write_object(key, payload.encode('utf-8'), overwrite=False)
+                return True
+            except Exception:
+                current = self._read_object(key)
+                if current is not None:
+                    try:
+                        acquired_at = float(json.loads(current.decode('utf-8'))['acquired_at'])
+                    except Exception:
+                        acquired_at = 0.0
+                    if time.time() - acquired_at < SHARD_MERGE_LOCK_TTL:
+                        return False
+                    logger.warning(f"Removing stale shard merge lock: {current!r}")
+                self._release_merge_lock()
+        return False
+
+    def _release_merge_lock(self):
+        location = self._object_location(f"{SHARDS_DIR}/{SHARD_MERGE_LOCK_FILE}")
+        try:
+            if self.storage_backend == 'supabase':
+                self.supabase.storage.from_(self.bucket_name).remove([location])
+            elif location.exists():
+                location.unlink()
+        except Exception as e:
+            logger.warning(f"Could not release shard merge lock: {e}")
+
+    def merge_shard_snapshots(self, shard_count: int = None, window: float = None,
+                              carry_missing: bool = False) -> Optional[str]:
+        """Combina o parcial mais recente de cada shard em um snapshot.
+
+        Só entram parciais que terminaram até `window` segundos antes do mais
+        recente. Sem todos os shards nada é feito, a não ser com
+        `carry_missing`: aí os repositórios dos shards ausentes vêm do último
+        snapshot. Parciais combinados (e os mais antigos) são removidos.
+        """
+        shard_count = shard_count or Config.SHARD_COUNT
+        window = Config.SHARD_MERGE_WINDOW if window is None else window
+        if not self._acquire_merge_lock():
+            logger.info("Another process is merging shards, skipping")
+            return None
+
+        try:
+            partials = [p for p in self.list_shard_snapshots() if p['shard_count'] == shard_count]
+            if not partials:
+                logger.info(f"No shard snapshots of {shard_count} to merge")
+                return None
+
+            latest = {p['shard_index']: p for p in partials}
+            newest = max(datetime.fromisoformat(p['finished_at']) for p in latest.values())
+            group = {index: p for index, p in sorted(latest.items())
+                     if (newest - datetime.fromisoformat(p['finished_at'])).total_seconds() <= window}
+            missing = sorted(set(range(shard_count)) - set(group))
+            if missing and not carry_missing:
+                logger.info(f"Waiting for shards {missing} of {shard_count} "
+                            f"(finished within {window:.0f}s of {newest.isoformat()})")
+                return None
+
+            frames = {table: [] for table in SNAPSHOT_TABLES}
+            for partial in group.values():
+                for table in SNAPSHOT_TABLES:
+                    df = self._read_shard_table(partial['partial_id'], table)
+                    if df is not None and not df.empty:
+                        frames[table].append(df)
+            if missing:
+                for table, df in self._carry_missing_shards(missing, shard_count).items():
+                    frames[table].append(df)
+
+            snapshot_id = self.create_snapshot_from_frames(*(
+                pd.concat(frames[table], ignore_index=True) if frames[table] else pd.DataFrame()
+                for table in SNAPSHOT_TABLES
+            ))
+            for partial in partials:
+                if datetime.fromisoformat(partial['finished_at']) <= newest:
+                    self._delete_shard_snapshot(partial['partial_id'])
+            logger.info(f"Merged shards {sorted(group)} of {shard_count} into {snapshot_id}"
+                        + (f", carried shards {missing} from the previous snapshot" if missing else ""))
+            return snapshot_id
+        finally:
+            self._release_merge_lock()
+
+    def _carry_missing_shards(self, missing: List[int], shard_count: int) -> Dict[str, pd.DataFrame]:
+        previous_id = self.get_latest_snapshot()
+        if not previous_id:
+            return {}
+        carried = {}
+        for table, df in self.load_snapshot_data(previous_id).items():
+            shards = df['repo_name'].map(lambda name: shard_of(name, shard_count))
+            rows = df[shards.isin(missing)]
+            if not rows.empty:
+                carried[table] = rows
+        logger.info(f"Carrying shards {missing} from {previous_id}: "
+                    + ', '.join(f"{table}={len(df)}" for table, df in carried.items()))
+        return carried
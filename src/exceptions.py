@@ -0,0 +1,3 @@
+class CircuitBreakerError(Exception):
+    """Erro customizado para circuit breaker"""
+    pass
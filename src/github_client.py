@@ -1,33 +1,50 @@
-from typing import List, Generator, Optional, Callable
-from github import Github, GithubException, RateLimitExceededException
+from typing import List, Generator, Optional, Callable, Dict
+from github import Auth, Github, GithubException, RateLimitExceededException
 from github.Repository import Repository
 from github.Commit import Commit as GHCommit
 from github.PullRequest import PullRequest as GHPullRequest
 import logging
 import time
 import threading
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 from .models import Commit, PullRequest
 from .config import Config
+from .exceptions import CircuitBreakerError
+from .token_pool import TokenPool
+from .concurrency import AdaptiveConcurrency, is_secondary_limit, set_controller
 
 logger = logging.getLogger(__name__)
 
-class CircuitBreakerError(Exception):
-    """Erro customizado para circuit breaker"""
-    pass
+def _as_utc(value: datetime) -> datetime:
+    """PyGithub 1.x devolve datas sem fuso (UTC); 2.x devolve com fuso"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
 
 class GitHubClient:
-    def __init__(self, token: str):
-        self.client = Github(token)
-        self.user = self.client.get_user()
+    def __init__(self, token: str = None, pool: TokenPool = None, concurrency: AdaptiveConcurrency = None):
+        # Todas as requisições (de qualquer token) passam pelo controle adaptativo
+        self.concurrency = concurrency or AdaptiveConcurrency.from_config()
+        set_controller(self.concurrency)
+        # Um único token vira um pool de um elemento
+        self.pool = pool or TokenPool([Auth.Token(token)])
+        self.user = self.pool.tokens[0].client.get_user()
         self.should_stop = threading.Event()
         self.rate_limit_reset_time = None
+        # Objetos de repositório já obtidos nesta execução (evita get_repo repetido)
+        self._repo_cache = {}
+        # Token pelo qual cada repositório foi obtido (paginação usa o mesmo token)
+        self._repo_tokens = {}
+        
+        # Repositórios com alguma listagem incompleta (erro, parada ou rate limit) desde a última consulta
+        self._incomplete = set()
+        self._incomplete_lock = threading.Lock()
         
         # Circuit breaker state
         self.failure_count = 0
         self.failure_threshold = 3  # Número de falhas consecutivas para parar
         self.last_error = None
+        # As threads do coletor registram falhas e sucessos ao mesmo tempo
+        self._failure_lock = threading.Lock()
         
     def set_stop_callback(self, callback: Callable[[], bool]):
         """Define callback para verificar se deve parar a execução"""
@@ -39,92 +56,135 @@ class GitHubClient:
     
     def _record_failure(self, error: Exception):
         """Registra uma falha na operação"""
-        self.failure_count += 1
-        self.last_error = str(error)
+        with self._failure_lock:
+            self.failure_count += 1
+            self.last_error = str(error)
+            failure_count, last_error = self.failure_count, self.last_error
         
-        if self.failure_count >= self.failure_threshold:
-            logger.error(f"Muitas falhas consecutivas ({self.failure_count}) - parando coleta")
-            logger.error(f"Último erro: {self.last_error}")
-            raise CircuitBreakerError(f"Coleta interrompida após {self.failure_count} falhas consecutivas: {self.last_error}")
+        if failure_count >= self.failure_threshold:
+            logger.error(f"Muitas falhas consecutivas ({failure_count}) - parando coleta")
+            logger.error(f"Último erro: {last_error}")
+            raise CircuitBreakerError(f"Coleta interrompida após {failure_count} falhas consecutivas: {last_error}")
         else:
-            logger.warning(f"Falha {self.failure_count}/{self.failure_threshold} registrada: {self.last_error}")
+            logger.warning(f"Falha {failure_count}/{self.failure_threshold} registrada: {last_error}")
+    
+    def _mark_incomplete(self, repo_name: str):
+        """Registra que uma listagem do repositório terminou antes do fim"""
+        with self._incomplete_lock:
+            self._incomplete.add(repo_name)
+    
+    def listing_incomplete(self, repo_name: str) -> bool:
+        """Se alguma listagem do repositório terminou incompleta desde a última consulta (limpa a marca)"""
+        with self._incomplete_lock:
+            incomplete = repo_name in self._incomplete
+            self._incomplete.discard(repo_name)
+        return incomplete
     
     def _record_success(self):
         """Registra uma operação bem-sucedida"""
-        self.failure_count = 0
-        self.last_error = None
+        with self._failure_lock:
+            self.failure_count = 0
+            self.last_error = None
     
     def stop_execution(self):
         """Para a execução atual"""
         self.should_stop.set()
         
+    @property
+    def client(self) -> Github:
+        """Cliente do token com maior orçamento restante"""
+        return self.pool.acquire().client
+        
     def get_rate_limit_info(self) -> dict:
-        """Obtém informações sobre rate limit"""
+        """Obtém informações sobre rate limit (token com maior orçamento e estado do pool)"""
         try:
-            rate_limit = self.client.get_rate_limit()
-            
-            # PyGithub 2.x mudou a estrutura - core está dentro de resources
-            if hasattr(rate_limit, 'resources') and hasattr(rate_limit.resources, 'core'):
-                core = rate_limit.resources.core
-            elif hasattr(rate_limit, 'core'):
-                # Fallback para versões antigas
-                core = rate_limit.core
-            else:
-                # Se não encontrar core, usar rate diretamente (caso extremo)
-                core = rate_limit.rate if hasattr(rate_limit, 'rate') else rate_limit
+            for token in self.pool.tokens:
+                self.pool.refresh(token)
+            best = max(self.pool.tokens, key=lambda t: t.budget())
+            remaining = best.budget()
+            limit = best.limit or 5000
             
             return {
-                'remaining': core.remaining,
-                'limit': core.limit,
-                'reset_time': core.reset,
-                'used': core.limit - core.remaining
+                'remaining': remaining,
+                'limit': limit,
+                'reset_time': best.reset_time,
+                'used': limit - remaining,
+                'tokens': self.pool.status()
             }
         except Exception as e:
             logger.warning(f"Could not get rate limit info: {e}")
-            return {'remaining': 0, 'limit': 5000, 'reset_time': None, 'used': 5000}
+            return {'remaining': 0, 'limit': 5000, 'reset_time': None, 'used': 5000, 'tokens': []}
     
-    def wait_for_rate_limit(self, progress_callback: Optional[Callable[[str], None]] = None) -> bool:
-        """Aguarda o reset do rate limit."""
+    def wait_for_rate_limit(self, progress_callback: Optional[Callable[[str], None]] = None,
+                            repo_name: str = None) -> bool:
+        """Garante orçamento: troca de token quando possível, senão aguarda o primeiro reset."""
         rate_info = self.get_rate_limit_info()
         
+        token = self._repo_tokens.get(repo_name)
+        if token is not None and token.exhausted and self.pool.available():
+            # O repositório passa a ser obtido por outro token na próxima chamada
+            self._repo_cache.pop(repo_name, None)
+        
         if rate_info['remaining'] > 10:  # Buffer de segurança
             return True
             
-        if not rate_info['reset_time']:
+        wait_seconds = self.pool.seconds_until_reset()
+        if wait_seconds is None:
             logger.warning("No rate limit reset time available")
             return False
-            
-        wait_seconds = (rate_info['reset_time'] - datetime.now()).total_seconds()
         
         if wait_seconds <= 0:
             return True
             
-        logger.warning(f"Rate limit exceeded. Waiting {wait_seconds:.0f} seconds...")
+        logger.warning(f"Rate limit exceeded on all {len(self.pool)} credentials. Waiting {wait_seconds:.0f} seconds...")
+        if progress_callback:
+            progress_callback(f"Rate limit esgotado, aguardando {wait_seconds:.0f}s")
         time.sleep(min(wait_seconds, 3600))  # Max 1 hora
         return True
     
+    def _on_rate_limited(self, repo_name: str, error: RateLimitExceededException = None):
+        """Marca o token usado pelo repositório como esgotado (failover para os demais)"""
+        if error is not None and is_secondary_limit(error.status, {k.lower(): v for k, v in (error.headers or {}).items()},
+                                                    str((error.data or {}).get('message', ''))):
+            # Limite secundário que persistiu após as novas tentativas com backoff: o token
+            # ainda tem orçamento, então conta como falha (circuit breaker) em vez de failover
+            self._record_failure(error)
+            return
+        token = self._repo_tokens.pop(repo_name, None)
+        if token is not None:
+            self.pool.mark_exhausted(token)
+        self._repo_cache.pop(repo_name, None)
+    
+    def _fetch_repository(self, repo_name: str) -> Repository:
+        token = self.pool.acquire()
+        self._repo_tokens[repo_name] = token
+        repo = token.client.get_repo(repo_name)
+        self._repo_cache[repo_name] = repo
+        self._record_success()
+        return repo
+    
     def get_repository(self, repo_name: str) -> Optional[Repository]:
         """Obtém repositório com rate limiting inteligente e circuit breaker"""
         if self.check_should_stop():
             return None
         
+        if repo_name in self._repo_cache:
+            return self._repo_cache[repo_name]
+        
         try:
             # Verifica rate limit antes da requisição
             if not self.wait_for_rate_limit():
                 return None
             
-            repo = self.client.get_repo(repo_name)
-            self._record_success()  # Registra sucesso
-            return repo
+            return self._fetch_repository(repo_name)
         except RateLimitExceededException as e:
             logger.warning(f"Rate limit exceeded while accessing {repo_name}")
+            self._on_rate_limited(repo_name, e)
             if not self.wait_for_rate_limit():
                 self._record_failure(e)
                 return None
             try:
-                repo = self.client.get_repo(repo_name)
-                self._record_success()
-                return repo
+                return self._fetch_repository(repo_name)
             except Exception as retry_error:
                 self._record_failure(retry_error)
                 logger.error(f"Failed to access repository {repo_name} after rate limit wait: {retry_error}")
@@ -142,26 +202,56 @@ class GitHubClient:
             logger.error(f"Unexpected error accessing repository {repo_name}: {e}")
             return None
     
-    def get_commits_from_repo(self, repo_name: str) -> List[Commit]:
-        commits = []
+    def get_repository_state(self, repo_name: str) -> Optional[dict]:
+        """Obtém pushed_at, updated_at e o SHA do HEAD da branch padrão (sempre atualizados)"""
+        self._repo_cache.pop(repo_name, None)
+        repo = self.get_repository(repo_name)
+        if not repo:
+            return None
+        
+        head_sha = None
+        try:
+            head_sha = repo.get_branch(repo.default_branch).commit.sha
+        except GithubException as e:
+            # Repositório vazio não tem branch padrão
+            logger.info(f"Could not read head of {repo_name}/{repo.default_branch}: {e.status}")
+        
+        return {
+            'pushed_at': repo.pushed_at.isoformat() if repo.pushed_at else None,
+            'updated_at': repo.updated_at.isoformat() if repo.updated_at else None,
+            'default_branch': repo.default_branch,
+            'head_sha': head_sha
+        }
+    
+    def get_commits_from_repo(self, repo_name: str, _collected: List[Commit] = None) -> List[Commit]:
+        # `_collected`: commits já obtidos antes de um rate limit; a listagem é retomada pulando-os
+        commits = list(_collected or [])
+        seen = {commit.sha for commit in commits}
         
         if self.check_should_stop():
+            self._mark_incomplete(repo_name)
             return commits
             
         try:
             repo = self.get_repository(repo_name)
             if not repo:
+                self._mark_incomplete(repo_name)
                 return commits
                 
             commit_count = 0
             for gh_commit in repo.get_commits():
                 if self.check_should_stop():
                     logger.info(f"Stopped collecting commits from {repo_name} at user request")
+                    self._mark_incomplete(repo_name)
                     break
+                
+                if gh_commit.sha in seen:
+                    continue
                     
                 # Verifica rate limit a cada 50 commits
                 if commit_count % 50 == 0 and commit_count > 0:
-                    if not self.wait_for_rate_limit():
+                    if not self.wait_for_rate_limit(repo_name=repo_name):
+                        self._mark_incomplete(repo_name)
                         break
                 
                 try:
@@ -178,99 +268,217 @@ class GitHubClient:
                     commits.append(commit)
                     commit_count += 1
                     
+                except RateLimitExceededException:
+                    raise
                 except Exception as e:
                     logger.warning(f"Error processing commit {gh_commit.sha} from {repo_name}: {e}")
+                    self._mark_incomplete(repo_name)
                     continue
                 
-        except RateLimitExceededException:
+        except RateLimitExceededException as e:
             logger.warning(f"Rate limit exceeded while fetching commits from {repo_name}")
+            self._on_rate_limited(repo_name, e)
             if self.wait_for_rate_limit():
-                # Retry uma vez após rate limit
-                return self.get_commits_from_repo(repo_name)
+                # Retoma pelo token com orçamento, sem repetir o que já foi coletado
+                return self.get_commits_from_repo(repo_name, commits)
+            self._mark_incomplete(repo_name)
         except GithubException as e:
             if 'Git Repository is empty' in str(e):
                 logger.warning(f"Repository {repo_name} is empty")
             else:
                 logger.error(f"Error fetching commits from {repo_name}: {e}")
+                self._mark_incomplete(repo_name)
                 
         return commits
     
-    def get_pull_requests_from_repo(self, repo_name: str, collected_commits: List[Commit] = None) -> List[PullRequest]:
-        pull_requests = []
+    def get_commit_details(self, repo_name: str, shas: List[str]) -> Dict[str, dict]:
+        """Busca additions, deletions e arquivos alterados de cada SHA (uma chamada por commit)"""
+        details = {}
         
         if self.check_should_stop():
-            return pull_requests
+            return details
+        
+        repo = self.get_repository(repo_name)
+        if not repo:
+            return details
+        
+        for sha in shas:
+            if self.check_should_stop():
+                logger.info(f"Stopped collecting commit details from {repo_name} at user request")
+                break
+            
+            try:
+                gh_commit = repo.get_commit(sha)
+                files = [f.filename for f in gh_commit.files]
+                details[sha] = {
+                    'additions': gh_commit.stats.additions,
+                    'deletions': gh_commit.stats.deletions,
+                    'changed_files': len(files),
+                    'files': files
+                }
+                self._record_success()
+            except RateLimitExceededException as e:
+                logger.warning(f"Rate limit exceeded while fetching commit details from {repo_name}")
+                self._on_rate_limited(repo_name, e)
+                if not self.wait_for_rate_limit():
+                    break
+                # Continua pelo token com orçamento; o SHA perdido fica para a próxima execução
+                repo = self.get_repository(repo_name)
+                if not repo:
+                    break
+            except GithubException as e:
+                if e.status in (404, 422):
+                    logger.info(f"Commit {sha} not available in {repo_name} ({e.status})")
+                else:
+                    self._record_failure(e)
+                    logger.error(f"Error fetching commit {sha} from {repo_name}: {e}")
+        
+        return details
+    
+    def _build_pull_request(self, gh_pr: GHPullRequest, repo_name: str, commit_cache: dict) -> PullRequest:
+        """Converte um PR do PyGithub no modelo (inclui a lista completa de commits)"""
+        # Lista completa de commits do PR (uma página de 100 na maioria dos PRs); a coluna `commits`
+        # continua com a lista limitada de antes (10 com cache de commits do repositório, 5 sem)
+        commit_shas = None
+        try:
+            commit_shas = [c.sha for c in gh_pr.get_commits()]
+            pr_commits = commit_shas[:10 if commit_cache else 5]
+        except RateLimitExceededException:
+            raise
+        except Exception:
+            # Fallback: usar commits do cache se a chamada falhar
+            pr_commits = [sha for sha in commit_cache.keys()][:10]
+        
+        return PullRequest(
+            number=str(gh_pr.number),
+            title=gh_pr.title,
+            author=gh_pr.user.login,
+            email=gh_pr.user.email or '',
+            created_at=gh_pr.created_at.isoformat() if gh_pr.created_at else None,
+            state=gh_pr.state,
+            comments=str(gh_pr.comments),
+            review_comments=str(gh_pr.review_comments),
+            commits=str(pr_commits),
+            url=gh_pr.html_url,
+            repo_name=repo_name,
+            updated_at=gh_pr.updated_at.isoformat() if gh_pr.updated_at else None,
+            commit_shas=commit_shas
+        )
+    
+    def get_pull_requests_from_repo(self, repo_name: str, collected_commits: List[Commit] = None,
+                                    known_prs: List[PullRequest] = None,
+                                    _refreshed: Dict[str, PullRequest] = None) -> List[PullRequest]:
+        """Coleta os PRs do repositório.
+        
+        Com `known_prs` (PRs do último snapshot) a coleta é incremental: só
+        PRs atualizados desde a última execução são buscados (sort=updated com
+        parada antecipada), PRs abertos são rechecados e PRs fechados que não
+        mudaram são mantidos como estavam.
+        """
+        # `_refreshed`: PRs já processados antes de um rate limit (retomada)
+        refreshed = dict(_refreshed or {})
+        
+        if self.check_should_stop():
+            self._mark_incomplete(repo_name)
+            return list(refreshed.values())
+        
+        # Sem updated_at nos PRs conhecidos (snapshots antigos) não há como ser incremental
+        known = {pr.number: pr for pr in known_prs or []}
+        since = None
+        if known and all(pr.updated_at for pr in known.values()):
+            since = max(_as_utc(datetime.fromisoformat(pr.updated_at)) for pr in known.values())
             
         try:
             repo = self.get_repository(repo_name)
             if not repo:
-                return pull_requests
+                self._mark_incomplete(repo_name)
+                return list(refreshed.values())
             
             # Criar cache de commits já coletados para otimizar
             commit_cache = {}
             if collected_commits:
                 commit_cache = {commit.sha: commit for commit in collected_commits}
+            
+            if since is None:
+                listing = repo.get_pulls(state='all', sort='created', direction='desc')
+            else:
+                listing = repo.get_pulls(state='all', sort='updated', direction='desc')
                 
             pr_count = 0
-            for gh_pr in repo.get_pulls(state='all', sort='created', direction='desc'):
+            for gh_pr in listing:
                 if self.check_should_stop():
                     logger.info(f"Stopped collecting PRs from {repo_name} at user request")
+                    self._mark_incomplete(repo_name)
+                    break
+                
+                # Lista ordenada por atualização: o resto já está no snapshot anterior
+                if since is not None and gh_pr.updated_at and _as_utc(gh_pr.updated_at) < since:
                     break
+                
+                if str(gh_pr.number) in refreshed:
+                    continue
                     
                 # Verifica rate limit a cada 20 PRs
                 if pr_count % 20 == 0 and pr_count > 0:
-                    if not self.wait_for_rate_limit():
+                    if not self.wait_for_rate_limit(repo_name=repo_name):
+                        self._mark_incomplete(repo_name)
                         break
                 
                 try:
-                    # Estratégia otimizada para commits do PR
-                    pr_commits = []
-                    if commit_cache:
-                        # Usar commits já coletados quando possível (evita chamada à API)
-                        try:
-                            # Apenas fazer chamada se realmente precisar de dados específicos do PR
-                            pr_commits_limited = list(gh_pr.get_commits()[:10])  # Limitar a 10 commits
-                            pr_commits = [c.sha for c in pr_commits_limited]
-                        except Exception:
-                            # Fallback: usar commits do cache se a chamada falhar
-                            pr_commits = [sha for sha in commit_cache.keys()][:10]
+                    previous = known.get(str(gh_pr.number))
+                    if previous and gh_pr.updated_at and previous.updated_at == gh_pr.updated_at.isoformat():
+                        refreshed[previous.number] = previous
                     else:
-                        # Coleta limitada quando não há cache
-                        try:
-                            pr_commits_limited = list(gh_pr.get_commits()[:5])  # Ainda mais limitado
-                            pr_commits = [c.sha for c in pr_commits_limited]
-                        except Exception:
-                            pr_commits = []  # Evitar falha completa
-                    
-                    pr = PullRequest(
-                        number=str(gh_pr.number),
-                        title=gh_pr.title,
-                        author=gh_pr.user.login,
-                        email=gh_pr.user.email or '',
-                        created_at=gh_pr.created_at.isoformat() if gh_pr.created_at else None,
-                        state=gh_pr.state,
-                        comments=str(gh_pr.comments),
-                        review_comments=str(gh_pr.review_comments),
-                        commits=str(pr_commits),
-                        url=gh_pr.html_url,
-                        repo_name=repo_name
-                    )
-                    pull_requests.append(pr)
+                        refreshed[str(gh_pr.number)] = self._build_pull_request(gh_pr, repo_name, commit_cache)
                     pr_count += 1
                     
+                except RateLimitExceededException:
+                    raise
                 except Exception as e:
                     logger.warning(f"Error processing PR #{gh_pr.number} from {repo_name}: {e}")
+                    self._mark_incomplete(repo_name)
                     continue
+            
+            if since is not None:
+                # Rechecagem dos PRs que estavam abertos e não apareceram na listagem incremental
+                stale_open = [number for number, pr in known.items() if pr.state == 'open' and number not in refreshed]
+                if stale_open and self.check_should_stop():
+                    self._mark_incomplete(repo_name)
+                elif stale_open:
+                    open_now = {str(gh_pr.number): gh_pr for gh_pr in repo.get_pulls(state='open')}
+                    for number in stale_open:
+                        try:
+                            # Fora da listagem de abertos: foi fechado, busca o PR individualmente
+                            gh_pr = open_now.get(number) or repo.get_pull(int(number))
+                            if gh_pr.updated_at and known[number].updated_at == gh_pr.updated_at.isoformat():
+                                refreshed[number] = known[number]
+                            else:
+                                refreshed[number] = self._build_pull_request(gh_pr, repo_name, commit_cache)
+                        except RateLimitExceededException:
+                            raise
+                        except Exception as e:
+                            logger.warning(f"Error re-checking open PR #{number} from {repo_name}: {e}")
+                            self._mark_incomplete(repo_name)
+                logger.info(f"Incremental PRs for {repo_name}: {len(refreshed)} refreshed, "
+                            f"{len(set(known) - set(refreshed))} carried forward")
                 
-        except RateLimitExceededException:
+        except RateLimitExceededException as e:
             logger.warning(f"Rate limit exceeded while fetching PRs from {repo_name}")
+            self._on_rate_limited(repo_name, e)
             if self.wait_for_rate_limit():
-                # Retry uma vez após rate limit
-                return self.get_pull_requests_from_repo(repo_name)
+                # Retoma pelo token com orçamento, sem reprocessar os PRs já obtidos
+                return self.get_pull_requests_from_repo(repo_name, collected_commits, known_prs, refreshed)
+            self._mark_incomplete(repo_name)
         except GithubException as e:
             if 'Git Repository is empty' in str(e):
                 logger.warning(f"Repository {repo_name} is empty")
             else:
                 logger.error(f"Error fetching pull requests from {repo_name}: {e}")
-                
-        return pull_requests
\ No newline at end of file
+                self._mark_incomplete(repo_name)
+        
+        if since is None:
+            return list(refreshed.values())
+        
+        # PRs fechados são imutáveis: mantidos como no snapshot anterior
+        merged = {**known, **refreshed}
+        return sorted(merged.values(), key=lambda pr: int(pr.number), reverse=True)
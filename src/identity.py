@@ -0,0 +1,239 @@
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Índice persistido no datalake: uma linha por variante (chave) com o id do autor
+IDENTITY_COLUMNS = ['key', 'author_id']
+# Linhas sem nome, e-mail ou login
+UNKNOWN_AUTHOR_ID = -1
+
+# E-mails compartilhados por muita gente (commits feitos pela interface web do GitHub)
+IGNORED_EMAILS = {'noreply@github.com'}
+# 12345+login@users.noreply.github.com ou login@users.noreply.github.com
+_NOREPLY_EMAIL = re.compile(r'^(?:\d+\+)?([a-z0-9-]+)@users\.noreply\.github\.com$')
+# Chaves que identificam uma pessoa (e-mail e login); nomes só servem de consulta
+_STRONG_PREFIXES = ('e:', 'l:')
+# Id descartado numa união -> id que ficou (`a:7` no conjunto do id 3)
+_ALIAS_PREFIX = 'a:'
+_SPACES = re.compile(r'\s+')
+
+
+def _normalize_name(name: str) -> str:
+    """Minúsculas, sem acentos e com espaços colapsados ("José  Romualdo" -> "jose romualdo")"""
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+    return _SPACES.sub(' ', name.strip().lower())
+
+
+def _rows(names, emails, logins) -> pd.DataFrame:
+    columns = {'name': names, 'email': emails, 'login': logins}
+    rows = pd.DataFrame({k: pd.Series(v, dtype=object) for k, v in columns.items() if v is not None})
+    return rows.where(rows.notna(), '')
+
+
+def variant_keys(name=None, email=None, login=None) -> List[str]:
+    """Chaves das variantes de uma linha (`e:` e-mail, `l:` login, `n:` nome), a mais específica primeiro"""
+    keys = []
+    email = email.strip().lower() if isinstance(email, str) else ''
+    if email and email not in IGNORED_EMAILS:
+        keys.append(f"e:{email}")
+        noreply = _NOREPLY_EMAIL.match(email)
+        if noreply:
+            keys.append(f"l:{noreply.group(1)}")
+    login = login.strip().lower() if isinstance(login, str) else ''
+    if login:
+        keys.append(f"l:{login}")
+    name = _normalize_name(name) if isinstance(name, str) else ''
+    if name:
+        keys.append(f"n:{name}")
+    return list(dict.fromkeys(keys))
+
+
+class AuthorIdentityIndex:
+    """Union-find das variantes de autor (nomes, e-mails e logins) -> author_id.
+
+    Só e-mails e logins unem conjuntos: os que aparecem na mesma linha
+    (login + e-mail de um PR, login dentro de um e-mail noreply) ficam juntos.
+    Um nome entra no conjunto do primeiro e-mail/login com que aparece e
+    depois serve só de consulta para linhas sem e-mail; o mesmo nome com
+    outro e-mail não une as duas pessoas ("Gabriel" ou "ubuntu" em
+    máquinas diferentes). O índice é incremental: um id atribuído nunca é
+    reutilizado; quando dois conjuntos se unem fica o menor id e o outro
+    vira a chave `a:<id>` no conjunto, para `author_aliases` traduzir os ids
+    gravados em snapshots anteriores.
+    """
+
+    def __init__(self, identities: Optional[pd.DataFrame] = None):
+        self._nodes: Dict[str, int] = {}
+        self._parent: List[int] = []
+        # author_id de cada raiz (None = conjunto novo, sem id ainda)
+        self._ids: List[Optional[int]] = []
+        # Se o conjunto da raiz tem algum e-mail ou login (senão é só um nome)
+        self._strong: List[bool] = []
+        self.next_id = 0
+        if identities is not None and not identities.empty:
+            first: Dict[int, int] = {}
+            for key, author_id in zip(identities['key'], identities['author_id'].astype(np.int64)):
+                node = self._node(key)
+                author_id = int(author_id)
+                if author_id in first:
+                    self._parent[node] = first[author_id]
+                else:
+                    first[author_id] = node
+                    self._ids[node] = author_id
+            for key, node in self._nodes.items():
+                if key.startswith(_STRONG_PREFIXES):
+                    self._strong[self._find(node)] = True
+            # Ids que viraram alias também não são reutilizados
+            used = list(first) + [int(key[len(_ALIAS_PREFIX):]) for key in self._nodes if key.startswith(_ALIAS_PREFIX)]
+            self.next_id = max(used) + 1 if used else 0
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def _node(self, key: str) -> int:
+        node = self._nodes.get(key)
+        if node is None:
+            node = self._nodes[key] = len(self._parent)
+            self._parent.append(node)
+            self._ids.append(None)
+            self._strong.append(key.startswith(_STRONG_PREFIXES))
+        return node
+
+    def _find(self, node: int) -> int:
+        root = node
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[node] != root:
+            self._parent[node], node = root, self._parent[node]
+        return root
+
+    def union(self, keys: Iterable[str]):
+        """Junta os conjuntos das chaves (chaves novas entram no índice)"""
+        roots = {self._find(self._node(key)) for key in keys}
+        if len(roots) < 2:
+            return
+        # Fica a raiz com o menor id (conjuntos novos por último; entre eles, o mais antigo)
+        keep = min(roots, key=lambda r: (self._ids[r] is None, self._ids[r] or 0, r))
+        for root in roots - {keep}:
+            self._parent[root] = keep
+            self._strong[keep] = self._strong[keep] or self._strong[root]
+            if self._ids[root] is not None:
+                self._parent[self._node(f"{_ALIAS_PREFIX}{self._ids[root]}")] = keep
+            self._ids[root] = None
+
+    def add_rows(self, names=None, emails=None, logins=None):
+        """Une as variantes de cada linha (só as combinações distintas são processadas)"""
+        for row in _rows(names, emails, logins).drop_duplicates().itertuples(index=False):
+            keys = variant_keys(**row._asdict())
+            strong = [key for key in keys if key.startswith(_STRONG_PREFIXES)]
+            name_keys = [key for key in keys if not key.startswith(_STRONG_PREFIXES)]
+            if strong:
+                self.union(strong)
+            for key in name_keys:
+                if not strong:
+                    self._node(key)
+                    continue
+                # O nome só acompanha um conjunto sem e-mail/login (nome novo ou visto só sem e-mail)
+                root = self._find(self._node(key))
+                if not self._strong[root]:
+                    self.union([key, strong[0]])
+        self._assign_new_ids()
+
+    def _assign_new_ids(self):
+        for node in range(len(self._parent)):
+            root = self._find(node)
+            if self._ids[root] is None:
+                self._ids[root] = self.next_id
+                self.next_id += 1
+
+    def author_id(self, key: str) -> int:
+        node = self._nodes.get(key)
+        return UNKNOWN_AUTHOR_ID if node is None else self._ids[self._find(node)]
+
+    def ids_for(self, names=None, emails=None, logins=None) -> np.ndarray:
+        """author_id de cada linha (int32; UNKNOWN_AUTHOR_ID sem nenhuma variante conhecida)"""
+        rows = _rows(names, emails, logins)
+        if rows.empty:
+            return np.array([], dtype=np.int32)
+        unique = rows.drop_duplicates()
+        unique = unique.assign(author_id=[
+            self.author_id(keys[0]) if keys else UNKNOWN_AUTHOR_ID
+            for keys in (variant_keys(**row._asdict()) for row in unique.itertuples(index=False))
+        ])
+        return rows.merge(unique, on=list(rows.columns), how='left')['author_id'].to_numpy(dtype=np.int32)
+
+    def to_frame(self) -> pd.DataFrame:
+        keys = list(self._nodes)
+        ids = [self._ids[self._find(node)] for node in self._nodes.values()]
+        return pd.DataFrame({'key': keys, 'author_id': np.asarray(ids, dtype=np.int32)}) \
+            .sort_values(['author_id', 'key'], kind='stable').reset_index(drop=True)
+
+
+def assign_author_ids(index: AuthorIdentityIndex, commits_df: pd.DataFrame,
+                      prs_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Atualiza o índice com as linhas do snapshot e grava a coluna `author_id` (int32) nas duas tabelas"""
+    commits = commits_df.reindex(columns=['author', 'email']) if not commits_df.empty else None
+    prs = prs_df.reindex(columns=['author', 'email']) if not prs_df.empty else None
+    if commits is not None:
+        index.add_rows(names=commits['author'].to_numpy(dtype=object), emails=commits['email'].to_numpy(dtype=object))
+    if prs is not None:
+        # `author` dos PRs é o login
+        index.add_rows(emails=prs['email'].to_numpy(dtype=object), logins=prs['author'].to_numpy(dtype=object))
+    if commits is not None:
+        commits_df = commits_df.assign(author_id=index.ids_for(names=commits['author'].to_numpy(dtype=object),
+                                                               emails=commits['email'].to_numpy(dtype=object)))
+    if prs is not None:
+        prs_df = prs_df.assign(author_id=index.ids_for(emails=prs['email'].to_numpy(dtype=object),
+                                                       logins=prs['author'].to_numpy(dtype=object)))
+    return commits_df, prs_df
+
+
+def author_aliases(identities: pd.DataFrame) -> Dict[int, int]:
+    """Ids descartados em uniões -> id atual do autor, a partir do índice persistido"""
+    if identities.empty:
+        return {}
+    aliases = identities[identities['key'].str.startswith(_ALIAS_PREFIX)]
+    return dict(zip(aliases['key'].str[len(_ALIAS_PREFIX):].astype(int), aliases['author_id'].astype(int)))
+
+
+def resolve_author_ids(df: pd.DataFrame, aliases: Dict[int, int]) -> pd.DataFrame:
+    """Troca os ids descartados em uniões posteriores ao snapshot pelo id atual do autor"""
+    if not aliases or df.empty or 'author_id' not in df.columns:
+        return df
+    ids = df['author_id'].to_numpy()
+    old = np.fromiter(aliases.keys(), dtype=np.int64)
+    mask = np.isin(ids, old)
+    if not mask.any():
+        return df
+    resolved = ids.copy()
+    resolved[mask] = pd.Series(aliases).reindex(ids[mask]).to_numpy()
+    return df.assign(author_id=resolved.astype(ids.dtype))
+
+
+def author_display_names(df: pd.DataFrame) -> pd.Series:
+    """Nome exibido de cada author_id: a variante de `author` mais frequente"""
+    if df.empty or 'author_id' not in df.columns:
+        return pd.Series(dtype=object)
+    counts = df.groupby(['author_id', 'author'], sort=False, observed=True).size().reset_index(name='n')
+    counts = counts.sort_values(['author_id', 'n'], ascending=[True, False], kind='stable')
+    return counts.drop_duplicates('author_id').set_index('author_id')['author']
+
+
+def excluded_author_ids(df: pd.DataFrame, excluded_authors: Iterable[str]) -> np.ndarray:
+    """Ids dos autores excluídos (por qualquer variante de nome que apareça em `author`)"""
+    if 'author_id' not in df.columns:
+        return np.array([], dtype=np.int32)
+    ids = df.loc[df['author'].isin(list(excluded_authors)), 'author_id'].unique()
+    return ids[ids != UNKNOWN_AUTHOR_ID]
+
+
+def drop_excluded_authors(df: pd.DataFrame, excluded_authors: Iterable[str]) -> pd.DataFrame:
+    """Linhas sem os autores excluídos; com `author_id`, todas as variantes do autor saem juntas"""
+    mask = df['author'].isin(list(excluded_authors))
+    if 'author_id' in df.columns:
+        ids = df.loc[mask, 'author_id'].unique()
+        mask = df['author_id'].isin(ids[ids != UNKNOWN_AUTHOR_ID]) | mask
+    return df[~mask]
@@ -12,6 +12,9 @@ class Commit:
     date: Optional[str]
     url: str
     repo_name: str
+    additions: Optional[int] = None
+    deletions: Optional[int] = None
+    changed_files: Optional[int] = None
     
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
@@ -29,6 +32,9 @@ class PullRequest:
     commits: str
     url: str
     repo_name: str
+    updated_at: Optional[str] = None
+    # Lista completa de SHAs do PR (só na coleta; vira a tabela de links SHA -> PR do snapshot)
+    commit_shas: Optional[List[str]] = None
     
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
@@ -37,6 +43,10 @@ class PullRequest:
 class Repository:
     repo_name: str
     last_updated: Optional[str] = None
+    pushed_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    default_branch: Optional[str] = None
+    head_sha: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
         return asdict(self)
@@ -0,0 +1,109 @@
+import re
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+PR_LINK_COLUMNS = ['sha', 'repo_name', 'number']
+
+_SHA_PATTERN = re.compile(r'[0-9a-f]{40}')
+
+
+def _empty_links() -> pd.DataFrame:
+    return pd.DataFrame({'sha': pd.Series(dtype=object), 'repo_name': pd.Series(dtype=object),
+                         'number': pd.Series(dtype=np.int64)})
+
+
+def has_commit_list(value) -> bool:
+    """Se o valor de `commit_shas` é uma lista (None/NaN = PR sem a lista completa)"""
+    return isinstance(value, (list, tuple, np.ndarray))
+
+
+def build_pr_links(prs_df: Optional[pd.DataFrame], previous_links: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Tabela SHA -> (repositório, número do PR), ordenada por SHA.
+
+    PRs buscados nesta coleta trazem a lista completa de commits em
+    `commit_shas`. Os reaproveitados do snapshot anterior (sem a lista)
+    mantêm os links de `previous_links`; sem eles, vale a lista limitada da
+    coluna `commits`.
+    """
+    if prs_df is None or prs_df.empty:
+        return _empty_links()
+    df = prs_df.reindex(columns=['repo_name', 'number', 'commits', 'commit_shas'])
+    df['number'] = pd.to_numeric(df['number'], errors='coerce')
+    df = df.dropna(subset=['repo_name', 'number'])
+    df['number'] = df['number'].astype(np.int64)
+
+    full = df['commit_shas'].map(has_commit_list)
+    parts = [df.loc[full, ['repo_name', 'number', 'commit_shas']].rename(columns={'commit_shas': 'sha'})]
+
+    rest = df.loc[~full, ['repo_name', 'number', 'commits']]
+    if not rest.empty and previous_links is not None and not previous_links.empty:
+        known = previous_links[PR_LINK_COLUMNS].merge(rest[['repo_name', 'number']], on=['repo_name', 'number'])
+        parts.append(known)
+        keys = pd.MultiIndex.from_frame(known[['repo_name', 'number']])
+        rest = rest[~pd.MultiIndex.from_frame(rest[['repo_name', 'number']]).isin(keys)]
+    if not rest.empty:
+        parts.append(pd.DataFrame({
+            'repo_name': rest['repo_name'].to_numpy(dtype=object),
+            'number': rest['number'].to_numpy(),
+            'sha': rest['commits'].fillna('').astype(str).str.findall(_SHA_PATTERN).to_numpy(),
+        }))
+
+    links = pd.concat(parts, ignore_index=True).explode('sha').dropna(subset=['sha'])
+    if links.empty:
+        return _empty_links()
+    links = links.astype({'sha': str, 'number': np.int64})[PR_LINK_COLUMNS]
+    links = links.drop_duplicates().sort_values(PR_LINK_COLUMNS, kind='stable')
+    return links.reset_index(drop=True)
+
+
+class PullRequestLinks:
+    """Consultas sobre a tabela SHA -> PR de um snapshot.
+
+    Com a tabela ordenada por SHA, os PRs de um commit são um intervalo de
+    `searchsorted`; o join com a tabela de commits usa o primeiro PR (menor
+    número) do mesmo repositório.
+    """
+
+    def __init__(self, links_df: pd.DataFrame):
+        if not links_df['sha'].is_monotonic_increasing:
+            links_df = links_df.sort_values(PR_LINK_COLUMNS, kind='stable')
+        self.links = links_df.reset_index(drop=True)[PR_LINK_COLUMNS]
+        self.shas = self.links['sha'].to_numpy(dtype=str)
+        # Um PR por (SHA, repositório): o de menor número, que foi quem trouxe o commit
+        self._first = self.links.drop_duplicates(['sha', 'repo_name']).rename(columns={'number': 'pr_number'})
+
+    def __len__(self) -> int:
+        return len(self.links)
+
+    def lookup(self, shas: Iterable[str]) -> pd.DataFrame:
+        """Todos os PRs (repositório e número) que contêm cada SHA; SHAs sem PR ficam de fora"""
+        shas = np.asarray(list(dict.fromkeys(shas)), dtype=str)
+        lo = np.searchsorted(self.shas, shas, side='left')
+        hi = np.searchsorted(self.shas, shas, side='right')
+        if not len(shas) or not (hi > lo).any():
+            return self.links.iloc[0:0]
+        positions = np.concatenate([np.arange(a, b) for a, b in zip(lo, hi) if b > a])
+        return self.links.iloc[positions].reset_index(drop=True)
+
+    def join(self, commits_df: pd.DataFrame) -> pd.DataFrame:
+        """Commits com a coluna `pr_number` (PR que trouxe o commit; <NA> para commits direto na branch)"""
+        if commits_df.empty:
+            return commits_df.assign(pr_number=pd.Series(dtype='Int64'))
+        joined = commits_df.merge(self._first, on=['sha', 'repo_name'], how='left')
+        joined.index = commits_df.index
+        joined['pr_number'] = joined['pr_number'].astype('Int64')
+        return joined
+
+    def share_by_repo(self, commits_df: pd.DataFrame) -> pd.DataFrame:
+        """Por repositório: commits, commits que vieram de PR e a fração (0 a 1)"""
+        if commits_df.empty:
+            return pd.DataFrame(columns=['repo_name', 'commits', 'commits_in_prs', 'pr_share'])
+        keys = commits_df[['sha', 'repo_name']].drop_duplicates()
+        in_pr = keys.merge(self._first[['sha', 'repo_name']], on=['sha', 'repo_name'], how='left', indicator=True)
+        in_pr = in_pr.assign(in_pr=in_pr['_merge'] == 'both').groupby('repo_name')['in_pr']
+        share = pd.DataFrame({'commits': in_pr.size(), 'commits_in_prs': in_pr.sum().astype(np.int64)})
+        share['pr_share'] = share['commits_in_prs'] / share['commits']
+        return share.reset_index().sort_values(['pr_share', 'repo_name'], ascending=[False, True],
+                                               kind='stable').reset_index(drop=True)
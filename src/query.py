@@ -0,0 +1,181 @@
+import logging
+import threading
+from dataclasses import fields
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+from .datalake import DataLake, SNAPSHOT_TABLES
+from .identity import UNKNOWN_AUTHOR_ID
+from .models import Commit, PullRequest, Repository
+
+logger = logging.getLogger(__name__)
+
+# Padrões de repositório equivalentes ao filtro "Tipo" do dashboard
+REPO_TYPE_PATTERNS = {
+    'Todos': '-(INTERNO|PUBLICO)',
+    'INTERNO': '-INTERNO',
+    'PUBLICO': '-PUBLICO',
+}
+
+# Contagens por repositório na janela; base dos relatórios do app.py.
+# Parâmetros: $repo_pattern, $excluded_authors, $start, $end
+WINDOW_SUMMARY_SQL = f"""
+WITH repos AS (
+    SELECT DISTINCT repo_name
+    FROM commits
+    WHERE regexp_matches(repo_name, $repo_pattern)
+),
+-- Ids dos autores excluídos: as outras variantes de nome/e-mail saem junto (como drop_excluded_authors)
+excluded_ids AS (
+    SELECT DISTINCT author_id
+    FROM commits
+    WHERE regexp_matches(repo_name, $repo_pattern)
+      AND list_contains($excluded_authors, author)
+      AND author_id IS NOT NULL AND author_id <> {UNKNOWN_AUTHOR_ID}
+),
+filtered AS (
+    SELECT repo_name, author, TRY_CAST(date AS TIMESTAMPTZ) AS date_dt
+    FROM commits
+    WHERE regexp_matches(repo_name, $repo_pattern)
+      AND (author IS NULL OR NOT list_contains($excluded_authors, author))
+      AND (author_id IS NULL OR author_id NOT IN (SELECT author_id FROM excluded_ids))
+)
+SELECT
+    r.repo_name,
+    count(f.date_dt) FILTER (WHERE f.date_dt >= $start AND f.date_dt <= $end) AS commits_in_window,
+    count(f.date_dt) FILTER (WHERE f.date_dt > $end) AS commits_after,
+    count(f.repo_name) AS commits_total,
+    string_agg(DISTINCT f.author, ', ' ORDER BY f.author) AS authors,
+    string_agg(DISTINCT f.author, ', ' ORDER BY f.author) FILTER (WHERE f.date_dt > $end) AS authors_after
+FROM repos r
+LEFT JOIN filtered f USING (repo_name)
+GROUP BY r.repo_name
+ORDER BY r.repo_name
+"""
+
+# Aba 2: repositórios SEM commits na janela
+NO_COMMITS_IN_WINDOW_SQL = f"""
+SELECT
+    repo_name AS "Repositório",
+    'Não' AS "Commits na Janela?",
+    coalesce(authors, 'Nenhum author registrado') AS "Authors"
+FROM ({WINDOW_SUMMARY_SQL})
+WHERE commits_in_window = 0
+"""
+
+# Aba 3: repositórios SEM commits na janela MAS COM commits após
+COMMITS_ONLY_AFTER_WINDOW_SQL = f"""
+SELECT
+    repo_name AS "Repositório",
+    commits_after AS "Commits após a Janela",
+    coalesce(authors_after, 'Nenhum author registrado') AS "Authors"
+FROM ({WINDOW_SUMMARY_SQL})
+WHERE commits_in_window = 0 AND commits_after > 0
+"""
+
+
+# Colunas de cada tabela como gravadas no snapshot (commit_shas não vai para o Parquet)
+_TABLE_MODELS = {'repositories': Repository, 'commits': Commit, 'pull_requests': PullRequest}
+_EXTRA_COLUMNS = {'commits': {'author_id': 'INTEGER'}, 'pull_requests': {'author_id': 'INTEGER'}}
+
+
+def _empty_table_sql(table: str) -> str:
+    """SELECT sem linhas com o schema da tabela, para snapshots sem o Parquet"""
+    columns = {field.name: 'BIGINT' if field.type == Optional[int] else 'VARCHAR'
+               for field in fields(_TABLE_MODELS[table]) if field.name != 'commit_shas'}
+    columns.update(_EXTRA_COLUMNS.get(table, {}))
+    return 'SELECT ' + ', '.join(f'CAST(NULL AS {kind}) AS {name}' for name, kind in columns.items()) + ' WHERE false'
+
+
+def _as_utc(value) -> datetime:
+    """Datas sem fuso são tratadas como UTC, como no dashboard"""
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return timestamp.to_pydatetime()
+
+
+class SnapshotQuery:
+    """SQL sobre os Parquet de um snapshot usando DuckDB embarcado.
+
+    As tabelas `commits`, `pull_requests` e `repositories` ficam disponíveis
+    como views sobre `read_parquet`, então filtros, projeções e agregações
+    são aplicados durante a leitura em vez de carregar tudo no pandas.
+    """
+
+    def __init__(self, datalake: DataLake = None):
+        self.datalake = datalake or DataLake()
+        self.connection = duckdb.connect()
+        self._registered = set()
+        self._lock = threading.Lock()
+
+    def _register(self, snapshot_id: str) -> str:
+        schema = snapshot_id.replace('"', '')
+        with self._lock:
+            if schema in self._registered:
+                return schema
+
+            snapshot_dir = self.datalake.ensure_local_snapshot(snapshot_id)
+            self.connection.execute(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+            for table in SNAPSHOT_TABLES:
+                parquet_file = snapshot_dir / f"{table}.parquet"
+                if parquet_file.exists():
+                    path = str(parquet_file).replace("'", "''")
+                    source = f"SELECT * FROM read_parquet('{path}')"
+                    # Snapshots antigos não têm author_id: coluna nula para as consultas valerem nos dois formatos
+                    extra = _EXTRA_COLUMNS.get(table, {})
+                    columns = {row[0] for row in self.connection.execute(f'DESCRIBE {source}').fetchall()} if extra else set()
+                    missing = [f'CAST(NULL AS {kind}) AS {name}' for name, kind in extra.items() if name not in columns]
+                    if missing:
+                        source = f"SELECT *, {', '.join(missing)} FROM read_parquet('{path}')"
+                else:
+                    # Snapshot sem a tabela (ex.: nenhum PR coletado): consultas devolvem vazio em vez de erro
+                    source = _empty_table_sql(table)
+                self.connection.execute(f'CREATE OR REPLACE VIEW "{schema}".{table} AS {source}')
+            self._registered.add(schema)
+            logger.info(f"Registered snapshot {snapshot_id} for SQL queries")
+            return schema
+
+    def _execute(self, snapshot_id: str, sql: str, params: Optional[Dict[str, Any]] = None):
+        schema = self._register(snapshot_id)
+        # Cada cursor tem seu próprio search_path, permitindo consultas concorrentes
+        cursor = self.connection.cursor()
+        cursor.execute(f"SET search_path = '{schema}'")
+        return cursor.execute(sql, params or {})
+
+    def query_arrow(self, snapshot_id: str, sql: str, params: Optional[Dict[str, Any]] = None) -> pa.Table:
+        return self._execute(snapshot_id, sql, params).fetch_record_batch().read_all()
+
+    def query_df(self, snapshot_id: str, sql: str, params: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        return self._execute(snapshot_id, sql, params).df()
+
+    @staticmethod
+    def window_params(start: datetime, end: datetime, repo_type: str = 'Todos',
+                      excluded_authors: Optional[List[str]] = None) -> Dict[str, Any]:
+        return {
+            'repo_pattern': REPO_TYPE_PATTERNS.get(repo_type, repo_type),
+            'excluded_authors': list(excluded_authors or []),
+            'start': _as_utc(start),
+            'end': _as_utc(end),
+        }
+
+    def window_summary(self, snapshot_id: str, start: datetime, end: datetime,
+                       repo_type: str = 'Todos', excluded_authors: Optional[List[str]] = None) -> pd.DataFrame:
+        params = self.window_params(start, end, repo_type, excluded_authors)
+        return self.query_df(snapshot_id, WINDOW_SUMMARY_SQL, params)
+
+    def repos_without_commits_in_window(self, snapshot_id: str, start: datetime, end: datetime,
+                                        repo_type: str = 'Todos',
+                                        excluded_authors: Optional[List[str]] = None) -> pd.DataFrame:
+        params = self.window_params(start, end, repo_type, excluded_authors)
+        return self.query_df(snapshot_id, NO_COMMITS_IN_WINDOW_SQL, params)
+
+    def repos_with_commits_only_after_window(self, snapshot_id: str, start: datetime, end: datetime,
+                                             repo_type: str = 'Todos',
+                                             excluded_authors: Optional[List[str]] = None) -> pd.DataFrame:
+        params = self.window_params(start, end, repo_type, excluded_authors)
+        return self.query_df(snapshot_id, COMMITS_ONLY_AFTER_WINDOW_SQL, params)
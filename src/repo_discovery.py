@@ -0,0 +1,129 @@
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = 30.0
+
+
+def pattern_org(pattern: str) -> str:
+    """Organização de um padrão `Org/regex` (texto antes da primeira barra)"""
+    return pattern.split('/', 1)[0]
+
+
+class RepositoryDiscovery:
+    """Descobre repositórios das organizações a partir de padrões `Org/regex`.
+
+    A listagem de cada organização é pedida em ordem de criação, então
+    repositórios novos entram nas últimas páginas. Cada página fica em cache
+    com seu ETag; na revalidação as páginas inalteradas voltam 304, que não
+    consomem rate limit. A listagem só é revalidada depois de
+    REPOSITORY_DISCOVERY_INTERVAL segundos; antes disso tudo sai do cache.
+    """
+
+    def __init__(self, pool=None, patterns: List[str] = None, cache_path: str = None,
+                 interval: float = None, base_url: str = None):
+        self.pool = pool
+        self.patterns = list(Config.REPOSITORY_PATTERNS if patterns is None else patterns)
+        self.cache_path = Path(cache_path or Config.REPOSITORY_DISCOVERY_CACHE_PATH)
+        self.interval = Config.REPOSITORY_DISCOVERY_INTERVAL if interval is None else interval
+        self.base_url = (base_url or Config.GITHUB_API_URL).rstrip('/')
+        self._regexes = [re.compile(pattern, re.IGNORECASE) for pattern in self.patterns]
+        # Estatísticas da última revalidação
+        self.requests = 0
+        self.not_modified = 0
+
+    @property
+    def orgs(self) -> List[str]:
+        return list(dict.fromkeys(pattern_org(pattern) for pattern in self.patterns))
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('orgs', {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read repository discovery cache {self.cache_path}: {e}")
+            return {}
+
+    def _save(self, orgs: Dict[str, dict]):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'orgs': orgs}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def _matching(self, orgs: Dict[str, dict]) -> List[str]:
+        names = [name for org in self.orgs for page in orgs.get(org, {}).get('pages', [])
+                 for name in page['repos']]
+        return list(dict.fromkeys(name for name in names if any(r.fullmatch(name) for r in self._regexes)))
+
+    def cached_repositories(self) -> List[str]:
+        """Repositórios descobertos que casam com os padrões, só a partir do cache (sem rede)"""
+        if not self.patterns:
+            return []
+        return self._matching(self._load())
+
+    def stale_orgs(self, orgs: Optional[Dict[str, dict]] = None) -> List[str]:
+        orgs = self._load() if orgs is None else orgs
+        now = time.time()
+        return [org for org in self.orgs
+                if org not in orgs or now - orgs[org].get('refreshed_at', 0) >= self.interval]
+
+    def refresh(self, force: bool = False) -> List[str]:
+        """Revalida as organizações vencidas (ou todas, com force) e devolve os repositórios que casam"""
+        orgs = self._load()
+        targets = self.orgs if force else self.stale_orgs(orgs)
+        self.requests = self.not_modified = 0
+        if targets:
+            import httpx
+            if self.pool is None:
+                from .token_pool import TokenPool
+                self.pool = TokenPool.from_config()
+            with httpx.Client(timeout=REQUEST_TIMEOUT,
+                              headers={'Accept': 'application/vnd.github+json', 'User-Agent': 'egonsystem'}) as client:
+                for org in targets:
+                    orgs[org] = {'refreshed_at': time.time(),
+                                 'pages': self._list_org(client, org, orgs.get(org, {}).get('pages', []))}
+                    logger.info(f"Discovered {sum(len(p['repos']) for p in orgs[org]['pages'])} repositories in {org}")
+            self._save(orgs)
+            logger.info(f"Repository discovery: {self.requests} requests, {self.not_modified} not modified")
+        return self._matching(orgs)
+
+    def _list_org(self, client, org: str, cached_pages: List[dict]) -> List[dict]:
+        url = (f"{self.base_url}/orgs/{org}/repos?type=all&sort=created&direction=asc"
+               f"&per_page={Config.GITHUB_PAGE_SIZE}")
+        pages = []
+        while url:
+            cached = cached_pages[len(pages)] if len(pages) < len(cached_pages) else None
+            if cached is not None and cached['url'] != url:
+                cached = None
+            token = self.pool.acquire()
+            headers = {'Authorization': f"{token.auth.token_type} {token.auth.token}"}
+            if cached is not None and cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            response = client.get(url, headers=headers)
+            self.requests += 1
+            self.pool.update(token, {key.lower(): value for key, value in response.headers.items()})
+            if response.status_code == 304:
+                self.not_modified += 1
+                page = cached
+            else:
+                response.raise_for_status()
+                page = {
+                    'url': url,
+                    'etag': response.headers.get('ETag'),
+                    'repos': [repo['full_name'] for repo in response.json()],
+                    'next': response.links.get('next', {}).get('url'),
+                }
+            pages.append(page)
+            url = page['next']
+        return pages
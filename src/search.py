@@ -0,0 +1,117 @@
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Tabelas e colunas indexadas; o código da tabela é gravado no índice
+SEARCH_FIELDS = {'commits': 'message', 'pull_requests': 'title'}
+SEARCH_TABLE_CODES = {table: code for code, table in enumerate(SEARCH_FIELDS)}
+SEARCH_INDEX_COLUMNS = ['token', 'table', 'repo_name', 'row']
+
+MIN_TOKEN_LENGTH = 2
+MAX_TOKEN_LENGTH = 32
+_TOKEN_PATTERN = re.compile(r'[0-9a-z]+')
+
+
+def _normalize(series: pd.Series) -> pd.Series:
+    """Minúsculas e sem acentos ("Correção" -> "correcao")"""
+    return (series.fillna('').astype(str).str.lower()
+            .str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii'))
+
+
+def tokenize(text: str) -> List[str]:
+    normalized = _normalize(pd.Series([text])).iloc[0]
+    return [t[:MAX_TOKEN_LENGTH] for t in _TOKEN_PATTERN.findall(normalized) if len(t) >= MIN_TOKEN_LENGTH]
+
+
+def build_search_index(commits_df: Optional[pd.DataFrame], prs_df: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """Índice invertido token -> (tabela, repositório, linha), ordenado por token.
+
+    `row` é a posição da linha na tabela do snapshot, então o resultado de
+    uma busca é aplicado direto com `iloc` sobre os dados já carregados.
+    """
+    parts = []
+    for table, df in (('commits', commits_df), ('pull_requests', prs_df)):
+        column = SEARCH_FIELDS[table]
+        if df is None or df.empty or column not in df.columns:
+            continue
+        tokens = _normalize(df[column]).str.findall(_TOKEN_PATTERN)
+        postings = pd.DataFrame({
+            'token': tokens.to_numpy(),
+            'repo_name': df['repo_name'].to_numpy(dtype=object),
+            'row': np.arange(len(df), dtype=np.int32),
+        }).explode('token')
+        postings = postings[postings['token'].str.len() >= MIN_TOKEN_LENGTH]
+        postings['token'] = postings['token'].str.slice(0, MAX_TOKEN_LENGTH)
+        postings = postings.drop_duplicates(['token', 'row'])
+        postings.insert(1, 'table', np.int8(SEARCH_TABLE_CODES[table]))
+        parts.append(postings)
+
+    if not parts:
+        return pd.DataFrame({'token': pd.Series(dtype=object), 'table': pd.Series(dtype=np.int8),
+                             'repo_name': pd.Series(dtype=object), 'row': pd.Series(dtype=np.int32)})
+    index = pd.concat(parts, ignore_index=True).sort_values(['token', 'table', 'row'], kind='stable')
+    return index.astype({'table': np.int8, 'row': np.int32}).reset_index(drop=True)[SEARCH_INDEX_COLUMNS]
+
+
+class SearchIndex:
+    """Busca em memória sobre o índice de um snapshot.
+
+    O vocabulário fica ordenado e as postings de cada token são contíguas,
+    então um termo (por prefixo) vira um intervalo de `searchsorted`; os
+    termos da consulta são combinados com AND num bitmap de linhas.
+    """
+
+    def __init__(self, index_df: pd.DataFrame):
+        tokens = index_df['token'].to_numpy(dtype=object)
+        self.vocabulary, starts = np.unique(tokens, return_index=True)
+        self.vocabulary = self.vocabulary.astype(str)
+        self.offsets = np.append(starts, len(tokens))
+        tables = index_df['table'].to_numpy(dtype=np.int64)
+        rows = index_df['row'].to_numpy(dtype=np.int64)
+        repo_codes, self.repos = pd.factorize(index_df['repo_name'])
+
+        # Cada linha de cada tabela vira um id global (tabelas em sequência), usado como posição num bitmap
+        self.bases = {}
+        base = 0
+        for table, code in SEARCH_TABLE_CODES.items():
+            self.bases[table] = base
+            mask = tables == code
+            base += int(rows[mask].max()) + 1 if mask.any() else 0
+        self.size = base
+        self.ids = rows + np.array(list(self.bases.values()), dtype=np.int64)[tables]
+        # Repositório de cada id, para filtrar resultados sem voltar às postings
+        self.id_repos = np.full(self.size, -1, dtype=np.int64)
+        self.id_repos[self.ids] = repo_codes
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _term_mask(self, term: str) -> np.ndarray:
+        lo = np.searchsorted(self.vocabulary, term, side='left')
+        hi = np.searchsorted(self.vocabulary, term + '\uffff', side='left')
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.ids[self.offsets[lo]:self.offsets[hi]]] = True
+        return mask
+
+    def search(self, query: str, repo_names: Optional[List[str]] = None,
+               limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Linhas (posições) que contêm todos os termos (por prefixo), por tabela"""
+        terms = set(tokenize(query))
+        results = {table: np.array([], dtype=np.int64) for table in SEARCH_FIELDS}
+        if not terms:
+            return results
+
+        matched = np.ones(self.size, dtype=bool)
+        for term in terms:
+            matched &= self._term_mask(term)
+        if repo_names is not None:
+            matched &= np.isin(self.id_repos, np.flatnonzero(np.isin(self.repos, list(repo_names))))
+
+        ids = np.flatnonzero(matched)
+        bounds = list(self.bases.values()) + [self.size]
+        for i, table in enumerate(SEARCH_FIELDS):
+            rows = ids[(ids >= bounds[i]) & (ids < bounds[i + 1])] - bounds[i]
+            results[table] = rows[:limit] if limit else rows
+        return results
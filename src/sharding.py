@@ -0,0 +1,28 @@
+import hashlib
+from typing import List
+
+# Snapshots parciais (um por shard) aguardando o merge
+SHARDS_DIR = '_shards'
+SHARD_METADATA_FILE = 'shard.json'
+SHARD_MERGE_LOCK_FILE = 'merge.lock'
+# Lock de merge mais velho que isso é considerado abandonado (processo morto no meio do merge)
+SHARD_MERGE_LOCK_TTL = 600
+
+
+def shard_of(repo_name: str, shard_count: int) -> int:
+    """Shard estável do repositório: o mesmo em qualquer processo ou host (hash() do Python varia por processo).
+
+    SHA-1 em vez de crc32: nomes quase iguais (…-G01-INTERNO, …-G02-INTERNO) ficam mal distribuídos com crc32.
+    """
+    digest = hashlib.sha1(repo_name.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % shard_count
+
+
+def shard_repositories(repo_names: List[str], shard_index: int, shard_count: int) -> List[str]:
+    if shard_count <= 1:
+        return list(repo_names)
+    return [name for name in repo_names if shard_of(name, shard_count) == shard_index]
+
+
+def shard_partial_id(shard_index: int, shard_count: int, timestamp: str) -> str:
+    return f"shard_{shard_index}-of-{shard_count}_{timestamp}"
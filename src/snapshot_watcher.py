@@ -0,0 +1,65 @@
+import logging
+import threading
+from typing import Optional
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotWatcher:
+    """Acompanha o marcador de último snapshot e pré-carrega snapshots novos.
+
+    Roda em uma thread daemon do processo do Streamlit: quando o coletor
+    (outro container) publica um snapshot, ele é lido e decodificado para o
+    cache em memória do `DataCollector` antes de algum usuário selecioná-lo.
+    """
+
+    def __init__(self, collector, interval: float = None):
+        self.collector = collector
+        self.interval = interval or Config.SNAPSHOT_WATCH_INTERVAL
+        self.last_version = None
+        self.last_snapshot_id: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='snapshot-watcher', daemon=True)
+        self._thread.start()
+        logger.info(f"Snapshot watcher started (every {self.interval}s)")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.check()
+            except Exception as e:
+                logger.warning(f"Snapshot watcher check failed: {e}")
+            self._stop.wait(self.interval)
+
+    def check(self) -> Optional[str]:
+        """Uma verificação; retorna o snapshot pré-carregado, se houve um novo"""
+        marker = self.collector.datalake.read_latest_marker()
+        if marker is None:
+            # Datalake sem marcador (snapshots anteriores a ele): usa a listagem uma única vez
+            if self.last_version is not None:
+                return None
+            marker = {'snapshot_id': self.collector.datalake.get_latest_snapshot(), 'version': 0}
+
+        if marker.get('version') == self.last_version:
+            return None
+        self.last_version = marker.get('version')
+
+        snapshot_id = marker.get('snapshot_id')
+        if not snapshot_id or snapshot_id == self.last_snapshot_id:
+            return None
+        self.collector.prewarm_snapshot(snapshot_id)
+        self.last_snapshot_id = snapshot_id
+        return snapshot_id
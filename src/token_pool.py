@@ -0,0 +1,152 @@
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from github import Auth, Github
+
+from .config import Config
+from .concurrency import install_transport
+
+logger = logging.getLogger(__name__)
+
+# Margem por token antes de considerá-lo esgotado
+RATE_LIMIT_BUFFER = 10
+
+
+@dataclass
+class TokenState:
+    """Um token (ou instalação de GitHub App) e seu estado de X-RateLimit"""
+    name: str
+    client: Github
+    # Credencial usada pelo cliente (o AsyncGitHubClient monta o cabeçalho Authorization com ela)
+    auth: Optional[Auth.Auth] = None
+    remaining: Optional[int] = None
+    limit: Optional[int] = None
+    reset_time: Optional[datetime] = None
+    requests_routed: int = 0
+
+    @property
+    def exhausted(self) -> bool:
+        if self.remaining is None or self.remaining > RATE_LIMIT_BUFFER:
+            return False
+        # Depois do reset o token volta a ter orçamento
+        return self.reset_time is None or self.reset_time > datetime.now(timezone.utc)
+
+    def budget(self) -> int:
+        """Orçamento estimado; tokens ainda não usados contam com o limite padrão"""
+        if self.exhausted:
+            return 0
+        if self.remaining is None:
+            return self.limit or 5000
+        if self.reset_time and self.reset_time <= datetime.now(timezone.utc):
+            return self.limit or self.remaining
+        return self.remaining
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'remaining': self.remaining,
+            'limit': self.limit,
+            'reset_time': self.reset_time,
+            'requests_routed': self.requests_routed,
+        }
+
+
+class TokenPool:
+    """Pool de credenciais do GitHub com orçamento de rate limit por token.
+
+    Cada credencial tem seu próprio cliente PyGithub, então os cabeçalhos
+    X-RateLimit de cada resposta atualizam apenas o estado daquele token.
+    `acquire` devolve o token com maior orçamento restante.
+    """
+
+    def __init__(self, auths: List[Auth.Auth], names: Optional[List[str]] = None,
+                 base_url: str = None, **client_kwargs):
+        if not auths:
+            raise ValueError("TokenPool requires at least one credential")
+        base_url = base_url or Config.GITHUB_API_URL
+        names = names or [f"token-{i}" for i in range(1, len(auths) + 1)]
+        # O ritmo vem do AdaptiveConcurrency (src/concurrency.py), não do intervalo fixo do PyGithub
+        install_transport()
+        client_kwargs.setdefault('seconds_between_requests', None)
+        client_kwargs.setdefault('pool_size', Config.COLLECTOR_MAX_CONCURRENCY)
+        # Páginas de 100 (máximo da API) em vez das 30 padrão: ~3x menos requisições por listagem
+        client_kwargs.setdefault('per_page', Config.GITHUB_PAGE_SIZE)
+        # retry=None: rate limit é tratado aqui (failover), não dormindo dentro do PyGithub
+        self.tokens = [
+            TokenState(name=name, client=Github(auth=auth, base_url=base_url, retry=None, **client_kwargs), auth=auth)
+            for name, auth in zip(names, auths)
+        ]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> 'TokenPool':
+        auths, names = [], []
+        for i, token in enumerate(Config.get_github_tokens(), 1):
+            auths.append(Auth.Token(token))
+            names.append(f"token-{i}")
+
+        if Config.has_github_app():
+            with open(Config.GITHUB_APP_PRIVATE_KEY_PATH, 'r', encoding='utf-8') as f:
+                private_key = f.read()
+            app_auth = Auth.AppAuth(int(Config.GITHUB_APP_ID), private_key)
+            for installation_id in Config.GITHUB_APP_INSTALLATION_IDS:
+                auths.append(app_auth.get_installation_auth(int(installation_id)))
+                names.append(f"app-installation-{installation_id}")
+
+        logger.info(f"GitHub token pool with {len(auths)} credentials")
+        return cls(auths, names)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def refresh(self, token: TokenState):
+        """Lê o último X-RateLimit conhecido pelo cliente do token"""
+        try:
+            remaining, limit = token.client.rate_limiting
+            reset = token.client.rate_limiting_resettime
+        except Exception as e:
+            logger.warning(f"Could not read rate limit of {token.name}: {e}")
+            return
+        with self._lock:
+            token.remaining = remaining
+            token.limit = limit
+            token.reset_time = datetime.fromtimestamp(reset, timezone.utc) if reset else None
+
+    def update(self, token: TokenState, headers: Dict[str, str]):
+        """Atualiza o orçamento a partir dos cabeçalhos X-RateLimit de uma resposta (clientes fora do PyGithub)"""
+        if 'x-ratelimit-remaining' not in headers:
+            return
+        with self._lock:
+            token.remaining = int(headers['x-ratelimit-remaining'])
+            token.limit = int(headers.get('x-ratelimit-limit', token.limit or 5000))
+            if 'x-ratelimit-reset' in headers:
+                token.reset_time = datetime.fromtimestamp(int(headers['x-ratelimit-reset']), timezone.utc)
+
+    def acquire(self) -> TokenState:
+        """Token com maior orçamento restante"""
+        with self._lock:
+            token = max(self.tokens, key=lambda t: t.budget())
+            token.requests_routed += 1
+            return token
+
+    def mark_exhausted(self, token: TokenState):
+        self.refresh(token)
+        with self._lock:
+            token.remaining = 0
+        logger.warning(f"GitHub credential {token.name} exhausted until {token.reset_time}")
+
+    def available(self) -> bool:
+        return any(not token.exhausted for token in self.tokens)
+
+    def seconds_until_reset(self) -> Optional[float]:
+        """Tempo até o primeiro token voltar a ter orçamento (None se desconhecido)"""
+        resets = [t.reset_time for t in self.tokens if t.exhausted and t.reset_time]
+        if not resets:
+            return None
+        return max((min(resets) - datetime.now(timezone.utc)).total_seconds(), 0)
+
+    def status(self) -> List[dict]:
+        return [token.to_dict() for token in self.tokens]
@@ -0,0 +1,293 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .config import Config
+from .identity import drop_excluded_authors, excluded_author_ids
+
+logger = logging.getLogger(__name__)
+
+NO_AUTHORS = 'Nenhum author registrado'
+_EPOCH = pd.Timestamp(0, tz='UTC')
+_SECOND = pd.Timedelta(seconds=1)
+
+
+@dataclass
+class Window:
+    """Janela de avaliação (início e fim inclusivos; datas sem fuso são UTC)"""
+    name: str
+    start: pd.Timestamp
+    end: pd.Timestamp
+
+    @classmethod
+    def from_values(cls, name: str, start, end) -> 'Window':
+        return cls(name, _as_utc(start), _as_utc(end))
+
+    @classmethod
+    def parse(cls, spec: str) -> 'Window':
+        """`nome=início/fim`, por exemplo `sprint1=2025-05-05 00:00/2025-05-17 03:15`"""
+        name, _, period = spec.partition('=')
+        if not period:
+            name, period = spec, spec
+        start, sep, end = period.partition('/')
+        if not sep:
+            raise ValueError(f"Invalid window '{spec}', expected name=start/end")
+        return cls.from_values(name.strip(), start.strip(), end.strip())
+
+
+def _as_utc(value) -> pd.Timestamp:
+    timestamp = pd.Timestamp(value)
+    return timestamp.tz_localize('UTC') if timestamp.tzinfo is None else timestamp.tz_convert('UTC')
+
+
+def _join_authors(authors) -> str:
+    authors = [a for a in pd.unique(np.asarray(authors, dtype=object)) if a is not None and a == a]
+    return ", ".join(authors) if authors else NO_AUTHORS
+
+
+class WindowReportEngine:
+    """Relatórios "sem commits na janela" para várias janelas de uma vez.
+
+    Os commits são ordenados uma única vez pela chave
+    `repo_code * span + segundos`, então as contagens de todos os
+    repositórios em todas as janelas saem de duas chamadas de
+    `np.searchsorted`, sem laço por repositório. A semântica é a mesma das
+    abas 2 e 3 do dashboard: filtro por tipo de repositório, autores
+    excluídos, janela inclusiva e "após" estritamente depois do fim.
+    """
+
+    def __init__(self, commits_df: pd.DataFrame, repo_type: str = 'Todos',
+                 excluded_authors: Optional[Sequence[str]] = None):
+        if excluded_authors is None:
+            excluded_authors = Config.EXCLUDED_AUTHORS
+        commits = commits_df if commits_df is not None else pd.DataFrame(columns=['repo_name', 'author', 'date'])
+        repo_names = commits['repo_name'].astype(object)
+        if repo_type in ('INTERNO', 'PUBLICO'):
+            mask = repo_names.str.contains(f'-{repo_type}', na=False)
+        else:
+            mask = repo_names.str.contains('-INTERNO', na=False) | repo_names.str.contains('-PUBLICO', na=False)
+        commits = commits[mask]
+
+        # Repositórios na ordem em que aparecem, como no dashboard (antes de excluir autores)
+        self.repos = pd.unique(commits['repo_name'].to_numpy(dtype=object))
+        commits = drop_excluded_authors(commits, excluded_authors)
+
+        self.authors = commits['author'].to_numpy(dtype=object)
+        self.repo_codes = pd.Categorical(commits['repo_name'], categories=self.repos).codes.astype(np.int64)
+        dates = pd.to_datetime(commits['date'], errors='coerce', utc=True)
+        valid = dates.notna().to_numpy()
+
+        # Datas do GitHub têm resolução de segundos (a unidade interna do pandas varia por versão)
+        seconds = ((dates[valid] - _EPOCH) // _SECOND).to_numpy(dtype=np.int64)
+        self.t_min = int(seconds.min()) if len(seconds) else 0
+        self.span = (int(seconds.max()) - self.t_min + 1) if len(seconds) else 1
+        keys = self.repo_codes[valid] * self.span + (seconds - self.t_min)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        # Posição original de cada commit ordenado (para listar autores na ordem do snapshot)
+        self.positions = np.flatnonzero(valid)[order]
+
+        self.all_authors = {
+            code: _join_authors(self.authors[self.repo_codes == code]) for code in range(len(self.repos))
+        }
+        logger.info(f"Window report engine: {len(self.repos)} repos, {len(self.keys)} dated commits")
+
+    def _offset(self, timestamp: pd.Timestamp, ceil: bool) -> int:
+        seconds = (timestamp - _EPOCH) / _SECOND
+        seconds = int(np.ceil(seconds)) if ceil else int(np.floor(seconds))
+        return seconds - self.t_min
+
+    def counts(self, windows: List[Window]) -> pd.DataFrame:
+        """Commits na janela e após a janela, por janela e repositório"""
+        codes = np.arange(len(self.repos), dtype=np.int64)
+        # Limites fora do intervalo dos dados são presos ao bloco do próprio repositório
+        starts = np.array([min(max(self._offset(w.start, ceil=True), 0), self.span) for w in windows], dtype=np.int64)
+        ends = np.array([min(max(self._offset(w.end, ceil=False), -1), self.span - 1) for w in windows], dtype=np.int64)
+        # Janela invertida (início depois do fim) fica vazia: nenhum commit na janela, como no StreamingWindowReport
+        starts = np.minimum(starts, ends + 1)
+        base = codes[None, :] * self.span
+        lower = np.searchsorted(self.keys, base + starts[:, None], side='left')
+        upper = np.searchsorted(self.keys, base + ends[:, None], side='right')
+        block_end = np.broadcast_to(np.searchsorted(self.keys, base + self.span, side='left'), upper.shape)
+
+        return pd.DataFrame({
+            'window': np.repeat([w.name for w in windows], len(codes)),
+            'start': np.repeat([w.start for w in windows], len(codes)),
+            'end': np.repeat([w.end for w in windows], len(codes)),
+            'repo_name': np.tile(self.repos, len(windows)),
+            'commits_in_window': np.maximum(upper - lower, 0).ravel(),
+            'commits_after': (block_end - upper).ravel(),
+            '_after_from': upper.ravel(),
+            '_after_to': block_end.ravel(),
+        })
+
+    def reports(self, windows: List[Window]) -> Dict[str, pd.DataFrame]:
+        """Tabelas das abas 2 e 3 do dashboard, com uma linha por janela e repositório"""
+        counts = self.counts(windows)
+        empty = counts[counts['commits_in_window'] == 0]
+        codes = pd.Categorical(empty['repo_name'], categories=self.repos).codes
+        after = empty[empty['commits_after'] > 0]
+        # Commits após o fim são um trecho contíguo do bloco ordenado do repositório
+        authors_after = [
+            _join_authors(self.authors[np.sort(self.positions[lo:hi])])
+            for lo, hi in zip(after['_after_from'], after['_after_to'])
+        ]
+        return _report_frames(empty, [self.all_authors[code] for code in codes], after, authors_after)
+
+
+class StreamingWindowReport:
+    """Mesmos relatórios do `WindowReportEngine`, agregados lote a lote.
+
+    Para snapshots que não cabem em memória: `update` recebe cada lote de
+    `DataLake.iter_snapshot_batches` e mantém só contadores por janela e
+    repositório e os autores distintos; a memória não depende do número de
+    commits. Como no `WindowReportEngine`, saem todas as variantes dos
+    autores excluídos: `excluded_ids` são os `author_id` deles no snapshot
+    inteiro (veja `streaming_window_reports`), já que a variante com o nome
+    excluído pode estar em outro lote.
+    """
+
+    def __init__(self, windows: List[Window], repo_type: str = 'Todos',
+                 excluded_authors: Optional[Sequence[str]] = None,
+                 excluded_ids: Optional[Sequence[int]] = None):
+        self.windows = list(windows)
+        self.repo_type = repo_type
+        self.excluded_authors = list(Config.EXCLUDED_AUTHORS if excluded_authors is None else excluded_authors)
+        self.excluded_ids = np.asarray(list(excluded_ids or []), dtype=np.int64)
+        self.repo_index: Dict[str, int] = {}
+        self.in_window = np.zeros((len(self.windows), 0), dtype=np.int64)
+        self.after = np.zeros((len(self.windows), 0), dtype=np.int64)
+        # dicts como conjuntos ordenados: autores na ordem em que aparecem no snapshot
+        self.authors: List[dict] = []
+        self.authors_after: List[List[dict]] = [[] for _ in self.windows]
+        self._starts = np.array([np.ceil((w.start - _EPOCH) / _SECOND) for w in self.windows], dtype=np.int64)
+        self._ends = np.array([np.floor((w.end - _EPOCH) / _SECOND) for w in self.windows], dtype=np.int64)
+        self.rows = 0
+
+    def _register_repos(self, repo_names: np.ndarray):
+        for repo in pd.unique(repo_names):
+            if repo not in self.repo_index:
+                self.repo_index[repo] = len(self.repo_index)
+                self.authors.append({})
+                for per_window in self.authors_after:
+                    per_window.append({})
+        missing = len(self.repo_index) - self.in_window.shape[1]
+        if missing > 0:
+            padding = np.zeros((len(self.windows), missing), dtype=np.int64)
+            self.in_window = np.hstack([self.in_window, padding])
+            self.after = np.hstack([self.after, padding])
+
+    def update(self, batch) -> 'StreamingWindowReport':
+        df = batch.to_pandas() if hasattr(batch, 'to_pandas') else batch
+        df = df.reindex(columns=['repo_name', 'author', 'date', 'author_id'])
+        repo_names = df['repo_name'].astype(object)
+        if self.repo_type in ('INTERNO', 'PUBLICO'):
+            mask = repo_names.str.contains(f'-{self.repo_type}', na=False)
+        else:
+            mask = repo_names.str.contains('-INTERNO', na=False) | repo_names.str.contains('-PUBLICO', na=False)
+        df = df[mask]
+        self._register_repos(df['repo_name'].to_numpy(dtype=object))
+        excluded = df['author'].isin(self.excluded_authors)
+        if len(self.excluded_ids):
+            excluded |= df['author_id'].isin(self.excluded_ids)
+        df = df[~excluded]
+        self.rows += len(df)
+        if df.empty:
+            return self
+
+        codes = pd.Index(list(self.repo_index)).get_indexer(df['repo_name'].to_numpy(dtype=object))
+        authors = df['author'].to_numpy(dtype=object)
+        for code, author in zip(*_first_pairs(codes, authors)):
+            self.authors[code].setdefault(author, None)
+
+        dates = pd.to_datetime(df['date'], errors='coerce', utc=True)
+        valid = dates.notna().to_numpy()
+        seconds = np.zeros(len(df), dtype=np.int64)
+        seconds[valid] = ((dates[valid] - _EPOCH) // _SECOND).to_numpy(dtype=np.int64)
+        repos = len(self.repo_index)
+        for i in range(len(self.windows)):
+            inside = valid & (seconds >= self._starts[i]) & (seconds <= self._ends[i])
+            later = valid & (seconds > self._ends[i])
+            self.in_window[i] += np.bincount(codes[inside], minlength=repos)
+            self.after[i] += np.bincount(codes[later], minlength=repos)
+            for code, author in zip(*_first_pairs(codes[later], authors[later])):
+                self.authors_after[i][code].setdefault(author, None)
+        return self
+
+    def counts(self) -> pd.DataFrame:
+        repos = np.array(list(self.repo_index), dtype=object)
+        return pd.DataFrame({
+            'window': np.repeat([w.name for w in self.windows], len(repos)),
+            'start': np.repeat([w.start for w in self.windows], len(repos)),
+            'end': np.repeat([w.end for w in self.windows], len(repos)),
+            'repo_name': np.tile(repos, len(self.windows)),
+            'commits_in_window': self.in_window.ravel(),
+            'commits_after': self.after.ravel(),
+        })
+
+    def reports(self) -> Dict[str, pd.DataFrame]:
+        counts = self.counts()
+        counts['_window'] = np.repeat(np.arange(len(self.windows)), len(self.repo_index))
+        counts['_code'] = np.tile(np.arange(len(self.repo_index)), len(self.windows))
+        empty = counts[counts['commits_in_window'] == 0]
+        after = empty[empty['commits_after'] > 0]
+        return _report_frames(
+            empty, [_join_authors(list(self.authors[code])) for code in empty['_code']],
+            after, [_join_authors(list(self.authors_after[w][code])) for w, code in zip(after['_window'], after['_code'])]
+        )
+
+
+def _first_pairs(codes: np.ndarray, authors: np.ndarray):
+    """Pares (repositório, autor) distintos, na ordem da primeira ocorrência"""
+    pairs = pd.DataFrame({'code': codes, 'author': authors}).dropna().drop_duplicates()
+    return pairs['code'].to_numpy(), pairs['author'].to_numpy(dtype=object)
+
+
+def _report_frames(empty: pd.DataFrame, authors: List[str],
+                   after: pd.DataFrame, authors_after: List[str]) -> Dict[str, pd.DataFrame]:
+    no_commits = pd.DataFrame({
+        'Janela': empty['window'].to_numpy(),
+        'Início': empty['start'].to_numpy(),
+        'Fim': empty['end'].to_numpy(),
+        'Repositório': empty['repo_name'].to_numpy(),
+        'Commits na Janela?': 'Não',
+        'Authors': authors,
+    })
+    only_after = pd.DataFrame({
+        'Janela': after['window'].to_numpy(),
+        'Início': after['start'].to_numpy(),
+        'Fim': after['end'].to_numpy(),
+        'Repositório': after['repo_name'].to_numpy(),
+        'Commits após a Janela': after['commits_after'].to_numpy(),
+        'Authors': authors_after,
+    })
+    return {'no_commits_in_window': no_commits, 'commits_only_after_window': only_after}
+
+
+def window_reports(commits_df: pd.DataFrame, windows: List[Window], repo_type: str = 'Todos',
+                   excluded_authors: Optional[Sequence[str]] = None) -> Dict[str, pd.DataFrame]:
+    return WindowReportEngine(commits_df, repo_type, excluded_authors).reports(windows)
+
+
+def streaming_window_reports(datalake, snapshot_id: str, windows: List[Window], repo_type: str = 'Todos',
+                             excluded_authors: Optional[Sequence[str]] = None,
+                             batch_size: int = None) -> StreamingWindowReport:
+    """Agrega os relatórios lendo o snapshot em lotes (memória limitada)"""
+    if excluded_authors is None:
+        excluded_authors = Config.EXCLUDED_AUTHORS
+    # Primeira passada só pelas linhas com os nomes excluídos: os author_id deles no snapshot inteiro
+    excluded_ids = set()
+    if excluded_authors:
+        for batch in datalake.iter_snapshot_batches(snapshot_id, 'commits', batch_size,
+                                                    columns=['author', 'author_id'],
+                                                    filters=[('author', 'in', list(excluded_authors))]):
+            excluded_ids.update(excluded_author_ids(batch.to_pandas(), excluded_authors).tolist())
+    report = StreamingWindowReport(windows, repo_type, excluded_authors, sorted(excluded_ids))
+    for batch in datalake.iter_snapshot_batches(snapshot_id, 'commits', batch_size,
+                                                columns=['repo_name', 'author', 'date', 'author_id']):
+        report.update(batch)
+    logger.info(f"Streaming window report over {report.rows} commits of {snapshot_id}")
+    return report
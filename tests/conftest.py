@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Testes importam `src` a partir da raiz do projeto, como os scripts
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import Config  # noqa: E402
+from src.datalake import DataLake  # noqa: E402
+
+
+@pytest.fixture
+def datalake(tmp_path, monkeypatch):
+    """Datalake local vazio em um diretório temporário"""
+    for name, value in {'STORAGE_BACKEND': 'local', 'DATALAKE_PATH': str(tmp_path),
+                        'SNAPSHOTS_PATH': str(tmp_path / 'snapshots'),
+                        'SNAPSHOT_CACHE_PATH': str(tmp_path / 'cache')}.items():
+        monkeypatch.setattr(Config, name, value)
+    return DataLake()
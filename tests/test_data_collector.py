@@ -0,0 +1,73 @@
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from github_standin import GitHubStandIn  # noqa: E402
+from src.config import Config  # noqa: E402
+from src.data_collector import DataCollector  # noqa: E402
+
+PULLS = 30
+_PR_COMMITS = re.compile(r'/pulls/:id/commits$')
+
+
+def _requests(standin, pattern: str) -> int:
+    return sum(count for path, count in standin.requests_by_path.items() if re.search(pattern, path))
+
+
+# Ponto de parada da primeira coleta: o PyGithub constrói os PRs um a um durante a listagem;
+# o cliente async pede as páginas e depois constrói todos os PRs listados juntos
+STOP_CONDITIONS = {
+    'pygithub': lambda standin: _requests(standin, _PR_COMMITS.pattern) >= 5,
+    'async': lambda standin: _requests(standin, r'/pulls$') >= 1,
+}
+
+
+@pytest.fixture
+def standin():
+    with GitHubStandIn(repos=1, commits=40, pulls=PULLS) as server:
+        yield server
+
+
+def _collector(standin, tmp_path, monkeypatch, backend: str) -> DataCollector:
+    settings = {
+        'GITHUB_API_URL': standin.base_url, 'GITHUB_TOKEN': 'test-token', 'GITHUB_TOKENS': [],
+        'GITHUB_APP_ID': None, 'INTERNAL_REPOSITORIES': standin.full_names, 'PUBLIC_REPOSITORIES': [],
+        'REPOSITORY_PATTERNS': [], 'STORAGE_BACKEND': 'local', 'DATALAKE_PATH': str(tmp_path),
+        'SNAPSHOTS_PATH': str(tmp_path / 'snapshots'), 'SKIP_UNCHANGED_REPOS': True,
+        'INCREMENTAL_PULL_REQUESTS': True, 'COMMIT_DETAILS_ENABLED': False, 'COLLECTOR_MAX_CONCURRENCY': 1,
+        'COLLECTOR_BACKEND': backend, 'SHARD_COUNT': 1, 'SHARD_INDEX': 0, 'GITHUB_PAGE_SIZE': 10,
+    }
+    for name, value in settings.items():
+        monkeypatch.setattr(Config, name, value)
+    collector = DataCollector()
+    collector._ensure_github_client()
+    return collector
+
+
+@pytest.mark.parametrize('backend', ['pygithub', 'async'])
+def test_incomplete_pull_request_listing_is_not_used_as_incremental_base(standin, tmp_path, monkeypatch, backend):
+    collector = _collector(standin, tmp_path, monkeypatch, backend)
+    client = collector.github_client
+    repo_name = standin.full_names[0]
+    try:
+        # Primeira coleta interrompida depois de alguns PRs (os mais recentes)
+        stop = {'enabled': True}
+        client.set_stop_callback(lambda: stop['enabled'] and STOP_CONDITIONS[backend](standin))
+        (repository, commits, pull_requests), _ = collector._collect_repository(repo_name, None)
+        assert 0 < len(pull_requests) < PULLS
+        assert repository.updated_at is None
+
+        collector.datalake.create_snapshot([repository], commits, pull_requests)
+        previous = collector._load_previous_snapshot()
+
+        # A coleta seguinte lista tudo de novo em vez de parar no updated_at dos PRs parciais
+        stop['enabled'] = False
+        (repository, commits, pull_requests), _ = collector._collect_repository(repo_name, previous)
+        assert sorted(int(pr.number) for pr in pull_requests) == list(range(1, PULLS + 1))
+        assert repository.updated_at is not None
+    finally:
+        getattr(client, 'close', lambda: None)()
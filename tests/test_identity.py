@@ -0,0 +1,54 @@
+import time
+
+import pandas as pd
+
+from src.identity import AuthorIdentityIndex, author_aliases, resolve_author_ids
+
+
+def test_merged_ids_resolve_to_the_surviving_id():
+    index = AuthorIdentityIndex()
+    index.add_rows(names=['Ana'], emails=['ana@example.com'])
+    index.add_rows(emails=['ana@aluno.edu'], logins=['ana-gh'])
+    assert index.author_id('e:ana@example.com') == 0
+    assert index.author_id('e:ana@aluno.edu') == 1
+
+    # PR com o login e o primeiro e-mail: os dois conjuntos se unem e fica o id 0
+    index.add_rows(emails=['ana@example.com'], logins=['ana-gh'])
+    assert index.author_id('e:ana@aluno.edu') == 0
+
+    identities = index.to_frame()
+    assert author_aliases(identities) == {1: 0}
+    # O alias sobrevive à releitura do índice e a uniões seguintes
+    reloaded = AuthorIdentityIndex(identities)
+    reloaded.add_rows(names=['Zé'], emails=['ze@example.com'])
+    assert author_aliases(reloaded.to_frame()) == {1: 0}
+    assert reloaded.author_id('e:ze@example.com') == 2
+
+    old = pd.DataFrame({'author': ['Ana', 'ana-gh', 'Bia'], 'author_id': pd.array([0, 1, 5], dtype='int32')})
+    resolved = resolve_author_ids(old, author_aliases(identities))
+    assert resolved['author_id'].tolist() == [0, 0, 5]
+    assert resolved['author_id'].dtype == 'int32'
+
+
+def _commits(rows) -> pd.DataFrame:
+    commits = pd.DataFrame(rows, columns=['author', 'email'])
+    commits['sha'] = [f"{i:040x}" for i in range(len(commits))]
+    commits['repo_name'] = 'Org/G01-INTERNO'
+    commits['date'] = '2025-05-06T10:00:00+00:00'
+    return commits
+
+
+def test_earlier_snapshots_read_the_surviving_id(datalake):
+    repos = pd.DataFrame({'repo_name': ['Org/G01-INTERNO']})
+    first = datalake.create_snapshot_from_frames(
+        repos, _commits([('Ana', 'ana@example.com'), ('ana-gh', '123+ana-gh@users.noreply.github.com')]), pd.DataFrame())
+    assert datalake.load_snapshot_data(first)['commits']['author_id'].nunique() == 2
+
+    # Ids de snapshot têm resolução de segundos
+    time.sleep(1.1)
+    prs = pd.DataFrame({'number': ['1'], 'author': ['ana-gh'], 'email': ['ana@example.com'],
+                        'repo_name': ['Org/G01-INTERNO']})
+    second = datalake.create_snapshot_from_frames(repos, _commits([('Ana', 'ana@example.com')]), prs)
+
+    for snapshot_id in (first, second):
+        assert datalake.load_snapshot_data(snapshot_id)['commits']['author_id'].unique().tolist() == [0]
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from src.datalake import DataLake
+from src.query import SnapshotQuery
+from src.window_report import Window, WindowReportEngine
+
+WINDOW = Window.parse('sprint=2025-05-05 00:00:00/2025-05-17 03:15:00')
+EXCLUDED = ['José Romualdo']
+
+
+def _commits() -> pd.DataFrame:
+    rows = [
+        # Mesmo autor com outro nome (mesmo e-mail): sai junto com 'José Romualdo'
+        ('Org/G01-INTERNO', 'José Romualdo', 'jose@example.com', '2025-05-06T10:00:00+00:00'),
+        ('Org/G01-INTERNO', 'jose.romualdo', 'jose@example.com', '2025-05-20T10:00:00+00:00'),
+        ('Org/G01-INTERNO', 'Ana', 'ana@example.com', '2025-05-21T10:00:00+00:00'),
+        ('Org/G02-PUBLICO', 'jose.romualdo', 'jose@example.com', '2025-05-08T10:00:00+00:00'),
+        ('Org/G02-PUBLICO', 'Caio', 'caio@example.com', '2025-05-09T10:00:00+00:00'),
+        ('Org/G03-INTERNO', 'José Romualdo', 'jose@example.com', '2025-05-10T10:00:00+00:00'),
+        ('Org/G03-INTERNO', 'Davi', 'davi@example.com', '2025-05-25T10:00:00+00:00'),
+    ]
+    commits = pd.DataFrame(rows, columns=['repo_name', 'author', 'email', 'date'])
+    commits['sha'] = [f"{i:040x}" for i in range(len(commits))]
+    commits['message'] = 'feat: tela'
+    commits['url'] = ''
+    return commits
+
+
+def _snapshot(datalake: DataLake) -> str:
+    repos = pd.DataFrame({'repo_name': ['Org/G01-INTERNO', 'Org/G02-PUBLICO', 'Org/G03-INTERNO']})
+    return datalake.create_snapshot_from_frames(repos, _commits(), pd.DataFrame())
+
+
+@pytest.mark.parametrize('with_author_ids', [True, False])
+@pytest.mark.parametrize('repo_type', ['Todos', 'INTERNO'])
+def test_window_summary_matches_engine(datalake, monkeypatch, with_author_ids, repo_type):
+    if not with_author_ids:
+        # Snapshot no formato antigo, sem a coluna author_id
+        monkeypatch.setattr(DataLake, '_assign_author_ids', lambda self, commits, prs: (commits, prs))
+    snapshot_id = _snapshot(datalake)
+    commits = datalake.load_snapshot_data(snapshot_id)['commits']
+    assert ('author_id' in commits.columns) == with_author_ids
+
+    columns = ['repo_name', 'commits_in_window', 'commits_after']
+    summary = SnapshotQuery(datalake).window_summary(snapshot_id, WINDOW.start, WINDOW.end,
+                                                     repo_type, EXCLUDED)
+    summary = summary[columns].set_index('repo_name').astype('int64').sort_index()
+    engine = WindowReportEngine(commits, repo_type, EXCLUDED).counts([WINDOW])
+    engine = engine[columns].set_index('repo_name').astype('int64').sort_index()
+
+    pd.testing.assert_frame_equal(summary, engine)
+    if with_author_ids:
+        # A variante 'jose.romualdo' também foi excluída
+        assert summary.loc['Org/G03-INTERNO', 'commits_in_window'] == 0
+        assert summary.loc['Org/G01-INTERNO', 'commits_after'] == 1
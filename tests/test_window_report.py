@@ -0,0 +1,44 @@
+import pandas as pd
+
+from src.window_report import StreamingWindowReport, Window, WindowReportEngine
+
+
+def _commits() -> pd.DataFrame:
+    rows = [
+        ('Org/G01-INTERNO', 'Ana', '2025-05-06T10:00:00+00:00'),
+        ('Org/G01-INTERNO', 'Ana', '2025-05-08T10:00:00+00:00'),
+        ('Org/G01-INTERNO', 'Bia', '2025-05-20T10:00:00+00:00'),
+        ('Org/G02-PUBLICO', 'Caio', '2025-05-07T10:00:00+00:00'),
+        ('Org/G02-PUBLICO', 'Caio', '2025-05-09T10:00:00+00:00'),
+        ('Org/G02-PUBLICO', 'Caio', '2025-05-10T10:00:00+00:00'),
+        ('Org/G03-INTERNO', 'Davi', '2025-05-25T10:00:00+00:00'),
+    ]
+    return pd.DataFrame(rows, columns=['repo_name', 'author', 'date'])
+
+
+def _streaming_counts(commits: pd.DataFrame, windows) -> pd.DataFrame:
+    return StreamingWindowReport(windows, excluded_authors=[]).update(commits).counts()
+
+
+def test_inverted_window_has_no_commits_in_window():
+    windows = [Window.parse('invertida=2025-05-12 00:00:00/2025-05-05 00:00:00')]
+    counts = WindowReportEngine(_commits(), excluded_authors=[]).counts(windows).set_index('repo_name')
+
+    assert (counts['commits_in_window'] == 0).all()
+    # Commits após o fim continuam contados
+    assert counts['commits_after'].to_dict() == {'Org/G01-INTERNO': 3, 'Org/G02-PUBLICO': 3, 'Org/G03-INTERNO': 1}
+
+
+def test_inverted_window_reports_match_streaming():
+    commits = _commits()
+    windows = [Window.parse('invertida=2025-05-12 00:00:00/2025-05-05 00:00:00'),
+               Window.parse('sprint=2025-05-05 00:00:00/2025-05-17 03:15:00')]
+    columns = ['window', 'repo_name', 'commits_in_window', 'commits_after']
+    engine = WindowReportEngine(commits, excluded_authors=[]).counts(windows)[columns]
+    streaming = _streaming_counts(commits, windows)[columns]
+
+    key = ['window', 'repo_name']
+    pd.testing.assert_frame_equal(engine.sort_values(key).reset_index(drop=True),
+                                  streaming.sort_values(key).reset_index(drop=True), check_dtype=False)
+    reports = WindowReportEngine(commits, excluded_authors=[]).reports(windows[:1])
+    assert len(reports['no_commits_in_window']) == 3